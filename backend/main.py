@@ -8,9 +8,10 @@ from pathlib import Path
 from typing import List, Dict, Any, Optional, Union
 from fastapi import FastAPI, Depends, HTTPException, Query, status, UploadFile, File, Request, BackgroundTasks, Form
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.security import HTTPBasic, HTTPBasicCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, load_only
 from pydantic import BaseModel, Field
 import logging
 import json
@@ -58,6 +59,11 @@ async def lifespan(app: FastAPI):
     try:
         logger.info("Starting FDA Pipeline API...")
         
+        # Sync (def) endpoints run in anyio's threadpool; its default of 40 threads caps
+        # concurrent blocking DB requests well below what the connection pool can serve
+        import anyio.to_thread
+        anyio.to_thread.current_default_thread_limiter().total_tokens = int(os.environ.get('THREADPOOL_MAX_WORKERS', 200))
+        
         # Create database tables
         create_tables()
         logger.info("Database tables created/verified")
@@ -119,6 +125,10 @@ async def lifespan(app: FastAPI):
     logger.info("Shutting down thread pool executor")
     executor.shutdown(wait=True)
     
+    # Write any search-tracking rows still buffered
+    from api.services.analytics_service import search_history_batcher
+    search_history_batcher.flush()
+    
     # Stop WebSocket health monitoring
     logger.info("Stopping WebSocket health monitor")
     await stop_websocket_health_monitoring()
@@ -174,8 +184,17 @@ app.add_middleware(
         "Authorization",
         "X-Requested-With"
     ],
+    # Cross-origin clients can only read the cursor header of paged listings if it is exposed
+    expose_headers=["X-Next-Cursor"],
 )
 
+# Compress large JSON payloads (details sections, search results); small responses are sent as-is
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
+# Tracing and per-route latency histograms (no-ops when the optional packages are missing)
+from utils.telemetry import setup_telemetry, timed_span
+setup_telemetry(app)
+
 # Create upload directory if it doesn't exist
 UPLOAD_DIR = Path("./uploads")
 UPLOAD_DIR.mkdir(exist_ok=True)
@@ -824,6 +843,7 @@ async def upload_file(
         db.add(source_file)
         db.commit()
         db.refresh(source_file)
+        FDAChatManagementService.invalidate_drug_names_cache()
         
         logger.info(f"File uploaded: {file.filename} by {current_user['username']}")
         
@@ -1052,12 +1072,13 @@ async def upload_source_file(
         
         # Add to collection if specified
         if collection_id:
-            collection = db.query(Collection).filter(Collection.id == collection_id).first()
+            collection = db.get(Collection, collection_id)
             if collection:
                 collection.documents.append(source_file)
         
         db.commit()
         db.refresh(source_file)
+        FDAChatManagementService.invalidate_drug_names_cache()
         
         logger.info(f"Source file uploaded: {source_file.file_name} by {current_user['username']}")
         
@@ -1155,7 +1176,7 @@ async def create_source_file(
         
         # Add to collection if specified
         if collection_id:
-            collection = db.query(Collection).filter(Collection.id == collection_id).first()
+            collection = db.get(Collection, collection_id)
             if not collection:
                 raise HTTPException(
                     status_code=404,
@@ -1165,6 +1186,7 @@ async def create_source_file(
         
         db.commit()
         db.refresh(source_file)
+        FDAChatManagementService.invalidate_drug_names_cache()
         
         logger.info(f"Source file created: {source_file.file_name} by {current_user['username']}")
         
@@ -1287,6 +1309,8 @@ async def update_source_file(
         
         db.commit()
         db.refresh(source_file)
+        if source_file_data.drug_name is not None:
+            FDAChatManagementService.invalidate_drug_names_cache()
         
         logger.info(f"Source file updated: {source_file.file_name} by {current_user['username']}")
         
@@ -1364,6 +1388,7 @@ async def delete_source_file(
         file_name = source_file.file_name
         db.delete(source_file)
         db.commit()
+        FDAChatManagementService.invalidate_drug_names_cache()
         
         logger.info(f"Source file deleted: {file_name} by {current_user['username']}")
         
@@ -2143,7 +2168,7 @@ async def generate_chat_response(message: str, drug_ids: List[str], collection_i
                 filter_dict = {"source_file_id": {"$in": [str(id) for id in source_file_ids]}}
                 
                 # Get collection name for context
-                collection = db.query(Collection).filter(Collection.id == collection_id).first()
+                collection = db.get(Collection, collection_id)
                 if collection:
                     context = f"Questions about documents in collection '{collection.name}'"
                     logger.info(f"Chat query with collection context: {context}")
@@ -2153,7 +2178,9 @@ async def generate_chat_response(message: str, drug_ids: List[str], collection_i
         elif drug_ids:
             try:
                 # Get drug information from database
-                drugs = db.query(FDAExtractionResults).filter(FDAExtractionResults.id.in_(drug_ids)).all()
+                drugs = db.query(FDAExtractionResults).options(
+                    load_only(FDAExtractionResults.drug_name)
+                ).filter(FDAExtractionResults.id.in_(drug_ids)).all()
                 if drugs:
                     drug_names = [drug.drug_name for drug in drugs]
                     context = f"Questions about {' and '.join(drug_names)}"
@@ -2171,13 +2198,14 @@ async def generate_chat_response(message: str, drug_ids: List[str], collection_i
         # Enhance the query with context if available
         enhanced_query = f"{context}: {message}" if context else message
         
-        response = qdrant_util.query_with_llm(
-            query=enhanced_query,
-            collection_name="fda_documents",
-            n_results=5,
-            filter_dict=filter_dict,
-            chat_history=None  # Could be enhanced to store chat history
-        )
+        with timed_span("qdrant.query_with_llm"):
+            response = qdrant_util.query_with_llm(
+                query=enhanced_query,
+                collection_name="fda_documents",
+                n_results=5,
+                filter_dict=filter_dict,
+                chat_history=None  # Could be enhanced to store chat history
+            )
         
         logger.info(f"ChromaDB response generated: {len(response)} characters")
         return response
@@ -2457,7 +2485,7 @@ async def search_documents(
         offset = (request.page - 1) * request.page_size
         
         # Perform search with user_id for history tracking
-        result = FDAChatManagementService.search_fda_documents(
+        result = await FDAChatManagementService.search_fda_documents(
             search_query=request.query,
             user_id=current_user["user_id"],
             drug_name=request.drug_name,
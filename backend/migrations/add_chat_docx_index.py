@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+"""
+Migration script to index the docXChat flag of chat history
+This migration adds:
+1. docx_chat virtual generated column on ChatHistory
+   = JSON_UNQUOTE(JSON_EXTRACT(CASE WHEN JSON_VALID(request_details) THEN request_details END,
+                               '$.docXChat'))
+2. idx_chathistory_user_docx_created on ChatHistory(user_id, docx_chat, created_at)
+
+The chat history, sessions and favorites lists filter on the docXChat flag inside the
+request_details JSON text, which parses the JSON of every row of the user. MySQL matches
+the filter expression built by database.docx_chat_condition to this generated column, so with
+the index the filter becomes an index range scan. The column is VIRTUAL (computed on read,
+nothing stored) and uses utf8mb4_bin, the collation JSON_UNQUOTE returns, which the
+optimizer requires to match the expression. The JSON_VALID guard (see database.json_field)
+keeps rows whose request_details is not valid JSON from failing the index build and inserts;
+a database migrated with the unguarded expression needs --rollback before rerunning.
+"""
+
+import os
+import sys
+from sqlalchemy import create_engine, text
+
+# Add parent directory to path to import settings
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.config.settings import settings
+
+TABLE = "ChatHistory"
+COLUMN_NAME = "docx_chat"
+INDEX_NAME = "idx_chathistory_user_docx_created"
+
+def column_exists(connection, table, column_name):
+    """Check whether a column exists on a table in the current schema"""
+    result = connection.execute(text(
+        """SELECT COUNT(*) FROM information_schema.columns
+        WHERE table_schema = DATABASE()
+        AND table_name = :table
+        AND column_name = :column_name"""
+    ), {"table": table, "column_name": column_name})
+    return result.scalar() > 0
+
+def index_exists(connection, table, index_name):
+    """Check whether an index exists on a table in the current schema"""
+    result = connection.execute(text(
+        """SELECT COUNT(*) FROM information_schema.statistics
+        WHERE table_schema = DATABASE()
+        AND table_name = :table
+        AND index_name = :index_name"""
+    ), {"table": table, "index_name": index_name})
+    return result.scalar() > 0
+
+def migrate():
+    """Add the docXChat generated column and index"""
+
+    # Get database URL from settings
+    DATABASE_URL = settings.DATABASE_URL
+
+    try:
+        engine = create_engine(DATABASE_URL)
+
+        with engine.connect() as connection:
+            print("Starting docXChat index migration...")
+
+            if column_exists(connection, TABLE, COLUMN_NAME):
+                print(f"   - {COLUMN_NAME} already exists on {TABLE}")
+            else:
+                # Adding a VIRTUAL column only changes table metadata (ALGORITHM=INSTANT)
+                connection.execute(text(
+                    f"""ALTER TABLE {TABLE} ADD COLUMN {COLUMN_NAME} VARCHAR(8)
+                    CHARACTER SET utf8mb4 COLLATE utf8mb4_bin
+                    GENERATED ALWAYS AS (JSON_UNQUOTE(JSON_EXTRACT(CASE WHEN JSON_VALID(request_details) THEN request_details END, '$.docXChat'))) VIRTUAL"""
+                ))
+                print(f"   - Added {COLUMN_NAME} on {TABLE}")
+
+            if index_exists(connection, TABLE, INDEX_NAME):
+                print(f"   - {INDEX_NAME} already exists on {TABLE}")
+            else:
+                # Secondary indexes on virtual columns are built online (ALGORITHM=INPLACE, LOCK=NONE)
+                connection.execute(text(
+                    f"ALTER TABLE {TABLE} ADD INDEX {INDEX_NAME} (user_id, {COLUMN_NAME}, created_at), "
+                    "ALGORITHM=INPLACE, LOCK=NONE"
+                ))
+                print(f"   - Added {INDEX_NAME} on {TABLE}(user_id, {COLUMN_NAME}, created_at)")
+
+            connection.commit()
+            print("\nMigration completed successfully!")
+            print(f"Verify with: EXPLAIN SELECT id FROM {TABLE} WHERE user_id = 1 AND "
+                  f"JSON_UNQUOTE(JSON_EXTRACT(CASE WHEN JSON_VALID(request_details) THEN request_details END, '$.docXChat')) = 'true' "
+                  f"-- key should be {INDEX_NAME}")
+            return True
+
+    except Exception as e:
+        print(f"\nMigration error: {e}")
+        return False
+
+def rollback():
+    """Drop the docXChat index and generated column"""
+
+    DATABASE_URL = settings.DATABASE_URL
+
+    try:
+        engine = create_engine(DATABASE_URL)
+
+        with engine.connect() as connection:
+            print("Rolling back docXChat index migration...")
+
+            if index_exists(connection, TABLE, INDEX_NAME):
+                connection.execute(text(f"ALTER TABLE {TABLE} DROP INDEX {INDEX_NAME}"))
+                print(f"   - Dropped {INDEX_NAME} from {TABLE}")
+
+            if column_exists(connection, TABLE, COLUMN_NAME):
+                connection.execute(text(f"ALTER TABLE {TABLE} DROP COLUMN {COLUMN_NAME}"))
+                print(f"   - Dropped {COLUMN_NAME} from {TABLE}")
+
+            connection.commit()
+            print("\nRollback completed successfully!")
+            return True
+
+    except Exception as e:
+        print(f"\nRollback error: {e}")
+        return False
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='docXChat index migration')
+    parser.add_argument('--rollback', action='store_true', help='Rollback the migration')
+    args = parser.parse_args()
+
+    if args.rollback:
+        success = rollback()
+    else:
+        success = migrate()
+
+    sys.exit(0 if success else 1)
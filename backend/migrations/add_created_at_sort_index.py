@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+"""
+Migration script to add a descending created_at index for newest-first listings
+This migration adds:
+1. idx_fda_created_at_desc on FDAExtractionResults(created_at DESC)
+
+dual_search orders by created_at DESC with a LIMIT. Without an index MySQL sorts the
+whole filtered set (Using filesort); with it the query walks the index in order and
+stops after LIMIT rows.
+
+Run this script ahead of a deploy; the API does not build missing indexes at startup
+(unless ENSURE_INDEXES_ON_STARTUP is set).
+"""
+
+import os
+import sys
+from sqlalchemy import create_engine, text
+
+# Add parent directory to path to import settings
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.config.settings import settings
+
+TABLE = "FDAExtractionResults"
+INDEX_NAME = "idx_fda_created_at_desc"
+
+def index_exists(connection, table, index_name):
+    """Check whether an index exists on a table in the current schema"""
+    result = connection.execute(text(
+        """SELECT COUNT(*) FROM information_schema.statistics
+        WHERE table_schema = DATABASE()
+        AND table_name = :table
+        AND index_name = :index_name"""
+    ), {"table": table, "index_name": index_name})
+    return result.scalar() > 0
+
+def migrate():
+    """Add the created_at DESC index"""
+
+    # Get database URL from settings
+    DATABASE_URL = settings.DATABASE_URL
+
+    try:
+        engine = create_engine(DATABASE_URL)
+
+        with engine.connect() as connection:
+            print("Starting created_at index migration...")
+
+            if index_exists(connection, TABLE, INDEX_NAME):
+                print(f"   - {INDEX_NAME} already exists on {TABLE}")
+            else:
+                # Secondary B-tree indexes are built online (ALGORITHM=INPLACE, LOCK=NONE)
+                connection.execute(text(
+                    f"ALTER TABLE {TABLE} ADD INDEX {INDEX_NAME} (created_at DESC), ALGORITHM=INPLACE, LOCK=NONE"
+                ))
+                print(f"   - Added {INDEX_NAME} on {TABLE}(created_at DESC)")
+
+            connection.commit()
+            print("\nMigration completed successfully!")
+            print(f"Verify with: EXPLAIN SELECT id FROM {TABLE} ORDER BY created_at DESC LIMIT 50 "
+                  f"-- key should be {INDEX_NAME} with no 'Using filesort'")
+            return True
+
+    except Exception as e:
+        print(f"\nMigration error: {e}")
+        return False
+
+def rollback():
+    """Drop the created_at DESC index"""
+
+    DATABASE_URL = settings.DATABASE_URL
+
+    try:
+        engine = create_engine(DATABASE_URL)
+
+        with engine.connect() as connection:
+            print("Rolling back created_at index migration...")
+
+            if index_exists(connection, TABLE, INDEX_NAME):
+                connection.execute(text(f"ALTER TABLE {TABLE} DROP INDEX {INDEX_NAME}"))
+                print(f"   - Dropped {INDEX_NAME} from {TABLE}")
+
+            connection.commit()
+            print("\nRollback completed successfully!")
+            return True
+
+    except Exception as e:
+        print(f"\nRollback error: {e}")
+        return False
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='created_at sort index migration')
+    parser.add_argument('--rollback', action='store_true', help='Rollback the migration')
+    args = parser.parse_args()
+
+    if args.rollback:
+        success = rollback()
+    else:
+        success = migrate()
+
+    sys.exit(0 if success else 1)
@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+"""
+Migration script to add ngram FULLTEXT indexes for the remaining substring searches
+This migration adds:
+1. ft_fda_manufacturer on FDAExtractionResults.manufacturer (WITH PARSER ngram)
+2. ft_metadata_config_search on MetadataConfiguration(metadata_name, description) (WITH PARSER ngram)
+
+The dual search manufacturer filter and the metadata configuration search use
+`LIKE '%term%'`, which scans the table. As with add_fulltext_name_indexes.py, the
+filters narrow candidates through MATCH ... AGAINST first (see
+database.database.substring_filter and substring_filter_any). The configuration
+search matches either column, so its index spans both: MATCH() must name the exact
+column list of one FULLTEXT index.
+
+The indexes are built with innodb_ft_enable_stopword=OFF. Indexes built before that
+must be dropped (--rollback) and rebuilt. Set FULLTEXT_SUBSTRING_SEARCH=true once the
+MATCH-narrowed results are verified against plain LIKE.
+
+Run this script ahead of a deploy; the API does not build missing indexes at startup
+(unless ENSURE_INDEXES_ON_STARTUP is set).
+"""
+
+import os
+import sys
+from sqlalchemy import create_engine, text
+
+# Add parent directory to path to import settings
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.config.settings import settings
+
+# (table, index name, column list)
+FULLTEXT_INDEXES = [
+    ("FDAExtractionResults", "ft_fda_manufacturer", "manufacturer"),
+    ("MetadataConfiguration", "ft_metadata_config_search", "metadata_name, description"),
+]
+
+def index_exists(connection, table, index_name):
+    """Check whether an index exists on a table in the current schema"""
+    result = connection.execute(text(
+        """SELECT COUNT(*) FROM information_schema.statistics
+        WHERE table_schema = DATABASE()
+        AND table_name = :table
+        AND index_name = :index_name"""
+    ), {"table": table, "index_name": index_name})
+    return result.scalar() > 0
+
+def migrate():
+    """Add ngram FULLTEXT indexes"""
+
+    # Get database URL from settings
+    DATABASE_URL = settings.DATABASE_URL
+
+    try:
+        engine = create_engine(DATABASE_URL)
+
+        with engine.connect() as connection:
+            print("Starting FULLTEXT search index migration...")
+
+            # The ngram parser drops every token that contains a stopword ('a' and 'i' are in
+            # the default list), which would leave the index missing many bigrams. The setting
+            # is read when the index is built, so disable it for this session
+            connection.execute(text("SET SESSION innodb_ft_enable_stopword = OFF"))
+
+            for table, index_name, columns in FULLTEXT_INDEXES:
+                if index_exists(connection, table, index_name):
+                    print(f"   - {index_name} already exists on {table}")
+                    continue
+
+                # InnoDB builds FULLTEXT indexes in place (ALGORITHM=INPLACE), so reads keep working
+                connection.execute(text(
+                    f"""ALTER TABLE {table}
+                    ADD FULLTEXT INDEX {index_name} ({columns}) WITH PARSER ngram"""
+                ))
+                print(f"   - Added {index_name} on {table}({columns})")
+
+            connection.commit()
+            print("\nMigration completed successfully!")
+            print("Verify with: EXPLAIN SELECT id FROM FDAExtractionResults "
+                  "WHERE MATCH(manufacturer) AGAINST('\"term\"' IN BOOLEAN MODE) -- type should be 'fulltext'")
+            return True
+
+    except Exception as e:
+        print(f"\nMigration error: {e}")
+        return False
+
+def rollback():
+    """Drop the ngram FULLTEXT indexes"""
+
+    DATABASE_URL = settings.DATABASE_URL
+
+    try:
+        engine = create_engine(DATABASE_URL)
+
+        with engine.connect() as connection:
+            print("Rolling back FULLTEXT search index migration...")
+
+            for table, index_name, _ in FULLTEXT_INDEXES:
+                if index_exists(connection, table, index_name):
+                    connection.execute(text(f"ALTER TABLE {table} DROP INDEX {index_name}"))
+                    print(f"   - Dropped {index_name} from {table}")
+
+            connection.commit()
+            print("\nRollback completed successfully!")
+            return True
+
+    except Exception as e:
+        print(f"\nRollback error: {e}")
+        return False
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='FULLTEXT search index migration')
+    parser.add_argument('--rollback', action='store_true', help='Rollback the migration')
+    args = parser.parse_args()
+
+    if args.rollback:
+        success = rollback()
+    else:
+        success = migrate()
+
+    sys.exit(0 if success else 1)
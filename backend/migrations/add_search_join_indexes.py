@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+"""
+Migration script to add indexes for document search joins and filters
+This migration adds:
+1. idx_assoc_coll_status_doc on collection_document_association(collection_id, indexing_status, document_id)
+2. idx_sourcefiles_drug_name on SourceFiles(drug_name(255))
+3. idx_sourcefiles_file_name on SourceFiles(file_name(255))
+
+Collection-scoped searches join SourceFiles to collection_document_association filtered
+by collection and indexing status, and vector hits are matched back to SourceFiles by
+file name. Without these indexes each of those reads scans the table.
+
+The ngram FULLTEXT index for substring drug name search is added by
+add_fulltext_name_indexes.py. Run this script ahead of a deploy; the API does not build
+missing indexes at startup (unless ENSURE_INDEXES_ON_STARTUP is set).
+"""
+
+import os
+import sys
+from sqlalchemy import create_engine, text
+
+# Add parent directory to path to import settings
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.config.settings import settings
+
+# (table, index name, column list)
+INDEXES = [
+    ("collection_document_association", "idx_assoc_coll_status_doc", "collection_id, indexing_status, document_id"),
+    ("SourceFiles", "idx_sourcefiles_drug_name", "drug_name(255)"),
+    ("SourceFiles", "idx_sourcefiles_file_name", "file_name(255)"),
+]
+
+def index_exists(connection, table, index_name):
+    """Check whether an index exists on a table in the current schema"""
+    result = connection.execute(text(
+        """SELECT COUNT(*) FROM information_schema.statistics
+        WHERE table_schema = DATABASE()
+        AND table_name = :table
+        AND index_name = :index_name"""
+    ), {"table": table, "index_name": index_name})
+    return result.scalar() > 0
+
+def migrate():
+    """Add the search join indexes"""
+
+    # Get database URL from settings
+    DATABASE_URL = settings.DATABASE_URL
+
+    try:
+        engine = create_engine(DATABASE_URL)
+
+        with engine.connect() as connection:
+            print("Starting search join index migration...")
+
+            for table, index_name, columns in INDEXES:
+                if index_exists(connection, table, index_name):
+                    print(f"   - {index_name} already exists on {table}")
+                    continue
+
+                # Secondary B-tree indexes are built online (ALGORITHM=INPLACE, LOCK=NONE)
+                connection.execute(text(
+                    f"ALTER TABLE {table} ADD INDEX {index_name} ({columns}), ALGORITHM=INPLACE, LOCK=NONE"
+                ))
+                print(f"   - Added {index_name} on {table}({columns})")
+
+            connection.commit()
+            print("\nMigration completed successfully!")
+            return True
+
+    except Exception as e:
+        print(f"\nMigration error: {e}")
+        return False
+
+def rollback():
+    """Drop the search join indexes"""
+
+    DATABASE_URL = settings.DATABASE_URL
+
+    try:
+        engine = create_engine(DATABASE_URL)
+
+        with engine.connect() as connection:
+            print("Rolling back search join index migration...")
+
+            for table, index_name, _ in INDEXES:
+                if index_exists(connection, table, index_name):
+                    connection.execute(text(f"ALTER TABLE {table} DROP INDEX {index_name}"))
+                    print(f"   - Dropped {index_name} from {table}")
+
+            connection.commit()
+            print("\nRollback completed successfully!")
+            return True
+
+    except Exception as e:
+        print(f"\nRollback error: {e}")
+        return False
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Search join index migration')
+    parser.add_argument('--rollback', action='store_true', help='Rollback the migration')
+    args = parser.parse_args()
+
+    if args.rollback:
+        success = rollback()
+    else:
+        success = migrate()
+
+    sys.exit(0 if success else 1)
@@ -431,6 +431,7 @@ class CollectionIndexer:
                         points_selector=PointIdsList(points=doc_ids_to_delete),
                         wait=True
                     )
+                    self.qdrant_util.record_collection_write(coll_name)
                     deleted_count += 1
                     logger.info(f"Deleted vectors from collection {coll_name}")
                 except Exception as e:
@@ -940,6 +941,7 @@ class CollectionIndexer:
                                 points=new_points,
                                 wait=True
                             )
+                            self.qdrant_util.record_collection_write(target_collection_name)
                         
                         logger.info(f"Copied {len(new_ids)} vectors for document {doc.id} from collection {existing_collection['collection_name']}")
                         
@@ -1256,6 +1258,7 @@ class CollectionIndexer:
                         points=points,
                         wait=True
                     )
+                    self.qdrant_util.record_collection_write(collection_name)
                     logger.info(f"Added batch {batch_idx + 1}/{total_batches} ({len(batch)} documents) to Qdrant")
                     
                     # Update processed documents count and send progress
@@ -1973,6 +1976,7 @@ Summary:"""
                 points_selector=PointIdsList(points=doc_ids),
                 wait=True
             )
+            self.qdrant_util.record_collection_write(collection_name)
             
             logger.info(f"Cleaned up {len(doc_ids)} vectors from Qdrant collection: {collection_name}")
             
@@ -2099,6 +2103,7 @@ Summary:"""
                         points=points,
                         wait=True
                     )
+                    self.qdrant_util.record_collection_write(collection_name)
                     total_added += len(points)
                     logger.info(f"Added batch of {len(points)} embeddings to Qdrant")
                 except Exception as e:
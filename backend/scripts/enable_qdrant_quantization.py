@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Script to enable vector quantization on existing Qdrant collections
+
+New collections get quantization from QDRANT_QUANTIZATION when they are created;
+this applies the same config to collections created before it was set. Qdrant
+builds the quantized vectors in the background, searches keep working meanwhile.
+"""
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.utils.qdrant_singleton import get_qdrant_client
+from src.utils.qdrant_util import QdrantUtil
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def enable_quantization(collection_name: str, quantization_config) -> bool:
+    """Apply the quantization config to one collection"""
+    try:
+        client = get_qdrant_client()
+
+        logger.info(f"Enabling quantization for collection: {collection_name}")
+        client.update_collection(
+            collection_name=collection_name,
+            quantization_config=quantization_config
+        )
+        logger.info(f"Successfully enabled quantization for {collection_name}")
+        return True
+
+    except Exception as e:
+        logger.error(f"Failed to enable quantization for {collection_name}: {e}")
+        return False
+
+def main():
+    """Enable quantization for all collections"""
+    quantization_config = QdrantUtil.quantization_config()
+    if quantization_config is None:
+        logger.info("QDRANT_QUANTIZATION is 'none', nothing to do")
+        return
+
+    client = get_qdrant_client()
+    collections = client.get_collections()
+
+    for collection in collections.collections:
+        enable_quantization(collection.name, quantization_config)
+
+    logger.info("Quantization update completed")
+
+if __name__ == "__main__":
+    main()
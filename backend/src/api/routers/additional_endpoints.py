@@ -2,7 +2,7 @@
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 from fastapi.responses import StreamingResponse, FileResponse
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, load_only
 from sqlalchemy import distinct
 from typing import List, Optional, Dict, Any
 from pydantic import BaseModel
@@ -558,8 +558,15 @@ async def list_available_documents(
         # Get all source files
         source_files = db.query(SourceFiles).all()
         
-        # Get all drugs
-        drugs = db.query(FDAExtractionResults).all()
+        # Get all drugs (only the listed columns, not the full_metadata JSON)
+        drugs = db.query(FDAExtractionResults).options(
+            load_only(
+                FDAExtractionResults.id,
+                FDAExtractionResults.drug_name,
+                FDAExtractionResults.source_file_id,
+                FDAExtractionResults.file_name
+            )
+        ).all()
         
         return {
             "source_files": [
@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
 from fastapi.encoders import jsonable_encoder
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
 from typing import List, Optional, Dict, Any, Tuple
 from pydantic import BaseModel, ConfigDict, validator
@@ -439,7 +440,7 @@ async def _initialize_chat_and_validate(
             logger.info("No source_file_ids provided, using default fda_document collection")
     else:
         # Verify collection exists
-        collection = db.query(Collection).filter(Collection.id == request.collection_id).first()
+        collection = db.get(Collection, request.collection_id)
         if not collection:
             raise HTTPException(status_code=404, detail=f"Collection with id {request.collection_id} not found")
         
@@ -1270,7 +1271,7 @@ Response (in English):"""
         
         raise HTTPException(status_code=500, detail=error_message)
 
-@router.get("/history/{user_id}")
+@router.get("/history/{user_id}", response_class=ORJSONResponse)
 async def get_chat_history(
     user_id: int,
     docx_chat_filter: Optional[bool] = None,
@@ -1279,11 +1280,12 @@ async def get_chat_history(
     """Get chat history for a user with optional docXChat filtering."""
     try:
         history = FDAChatManagementService.retrieve_chat_history(user_id, db, docx_chat_filter)
-        return history
+        # Returning the response directly skips jsonable_encoder's walk over the nested search results
+        return ORJSONResponse(history)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.get("/sessions/{user_id}")
+@router.get("/sessions/{user_id}", response_class=ORJSONResponse)
 async def get_chat_sessions(
     user_id: int,
     docx_chat_filter: Optional[bool] = None,
@@ -1292,11 +1294,11 @@ async def get_chat_sessions(
     """Get chat sessions grouped by session_id for a user with optional docXChat filtering."""
     try:
         sessions = FDAChatManagementService.retrieve_chat_sessions(user_id, db, docx_chat_filter)
-        return sessions
+        return ORJSONResponse(sessions)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.get("/session/{session_id}")
+@router.get("/session/{session_id}", response_class=ORJSONResponse)
 async def get_session_details(
     session_id: str,
     user_id: int = Query(..., description="User ID"),
@@ -1330,10 +1332,10 @@ async def get_session_details(
                 'is_favorite': detail['is_favorite']
             })
         
-        return {
+        return ORJSONResponse({
             'session_id': session_id,
             'chats': chats
-        }
+        })
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -1377,7 +1379,7 @@ async def remove_from_favorites(
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.get("/favorites/{user_id}")
+@router.get("/favorites/{user_id}", response_class=ORJSONResponse)
 async def get_favorite_chats(
     user_id: int,
     docx_chat_filter: Optional[bool] = None,
@@ -1386,7 +1388,7 @@ async def get_favorite_chats(
     """Get favorite chats for a user with optional docXChat filtering."""
     try:
         favorites = FDAChatManagementService.get_favorite_chats(user_id, db, docx_chat_filter)
-        return favorites
+        return ORJSONResponse(favorites)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
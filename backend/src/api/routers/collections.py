@@ -22,6 +22,7 @@ from api.routers.auth import get_current_user
 from api.services.collection_indexing_service import get_indexing_service
 from api.services.websocket_manager import get_connection_manager, ConnectionManager, MessageType
 from api.services.background_task_handler import get_background_handler
+from api.services.chat_management_service import FDAChatManagementService
 
 logger = logging.getLogger(__name__)
 
@@ -394,7 +395,7 @@ async def update_collection(
     current_user: dict = Depends(get_current_user)
 ):
     """Update a collection"""
-    collection = db.query(Collection).filter(Collection.id == collection_id).first()
+    collection = db.get(Collection, collection_id)
     
     if not collection:
         raise HTTPException(
@@ -531,6 +532,7 @@ async def delete_collection(
         # 5. Delete the collection (this will cascade delete associations)
         db.delete(collection)
         db.commit()
+        FDAChatManagementService.invalidate_vector_db_collection_name(collection_id)
         
         return {
             "message": f"Collection '{collection_name}' deleted successfully",
@@ -556,7 +558,7 @@ async def add_documents_to_collection(
     current_user: dict = Depends(get_current_user)
 ):
     """Add documents to a collection"""
-    collection = db.query(Collection).filter(Collection.id == collection_id).first()
+    collection = db.get(Collection, collection_id)
     
     if not collection:
         raise HTTPException(
@@ -602,7 +604,7 @@ async def bulk_upload_to_collection(
     from datetime import datetime
     
     # Verify collection exists
-    collection = db.query(Collection).filter(Collection.id == collection_id).first()
+    collection = db.get(Collection, collection_id)
     if not collection:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -731,7 +733,7 @@ async def remove_documents_from_collection(
     current_user: dict = Depends(get_current_user)
 ):
     """Remove documents from a collection"""
-    collection = db.query(Collection).filter(Collection.id == collection_id).first()
+    collection = db.get(Collection, collection_id)
     
     if not collection:
         raise HTTPException(
@@ -920,7 +922,7 @@ async def get_indexing_status(
     """
     try:
         # Validate collection exists
-        collection = db.query(Collection).filter(Collection.id == collection_id).first()
+        collection = db.get(Collection, collection_id)
         if not collection:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -975,7 +977,7 @@ async def get_indexing_job_status(
     """
     try:
         # Validate collection exists and user has access
-        collection = db.query(Collection).filter(Collection.id == collection_id).first()
+        collection = db.get(Collection, collection_id)
         if not collection:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -1065,7 +1067,7 @@ async def get_collection_drug_names(
     """
     try:
         # Validate collection exists
-        collection = db.query(Collection).filter(Collection.id == collection_id).first()
+        collection = db.get(Collection, collection_id)
         if not collection:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -1170,7 +1172,7 @@ async def get_collection_vector_details(
     """
     try:
         # Validate collection exists
-        collection = db.query(Collection).filter(Collection.id == collection_id).first()
+        collection = db.get(Collection, collection_id)
         if not collection:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -1329,7 +1331,7 @@ async def reindex_documents(
     """
     try:
         # Validate collection exists
-        collection = db.query(Collection).filter(Collection.id == collection_id).first()
+        collection = db.get(Collection, collection_id)
         if not collection:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -1420,7 +1422,7 @@ async def remove_document_from_index(
     """
     try:
         # Validate collection exists
-        collection = db.query(Collection).filter(Collection.id == collection_id).first()
+        collection = db.get(Collection, collection_id)
         if not collection:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -1575,7 +1577,7 @@ async def extract_metadata(
     """
     try:
         # Validate collection exists
-        collection = db.query(Collection).filter(Collection.id == collection_id).first()
+        collection = db.get(Collection, collection_id)
         if not collection:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -1710,7 +1712,7 @@ async def get_extracted_metadata(
     """
     try:
         # Validate collection exists
-        collection = db.query(Collection).filter(Collection.id == collection_id).first()
+        collection = db.get(Collection, collection_id)
         if not collection:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -1,7 +1,7 @@
 """Dashboard analytics endpoints."""
 
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, load_only
 from sqlalchemy import func, distinct
 from typing import List, Dict, Any
 from datetime import datetime, timedelta
@@ -66,7 +66,9 @@ async def get_recent_activity(
         
         # If no activities, create synthetic ones
         if not recent_activities:
-            drugs = db.query(FDAExtractionResults).limit(5).all()
+            drugs = db.query(FDAExtractionResults).options(
+                load_only(FDAExtractionResults.id, FDAExtractionResults.drug_name)
+            ).limit(5).all()
             activity_types = ['search', 'view', 'chat']
             
             for idx, drug in enumerate(drugs):
@@ -155,7 +157,9 @@ async def get_trending_drugs(
         
         # If no trending data, use fallback
         if not trending_drugs:
-            drugs = db.query(FDAExtractionResults).limit(limit).all()
+            drugs = db.query(FDAExtractionResults).options(
+                load_only(FDAExtractionResults.drug_name)
+            ).limit(limit).all()
             for idx, drug in enumerate(drugs):
                 trending_drugs.append({
                     "drug_name": drug.drug_name,
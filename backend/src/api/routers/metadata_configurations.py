@@ -2,7 +2,7 @@
 API endpoints for metadata configuration management within groups.
 Phase 2: Configuration CRUD operations with group context.
 """
-from fastapi import APIRouter, Depends, HTTPException, status, Query, BackgroundTasks, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, status, Query, BackgroundTasks, UploadFile, File, Response
 from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from sqlalchemy import or_, and_
@@ -96,12 +96,14 @@ class CloneConfigurationRequest(BaseModel):
 
 @router.get("/", response_model=List[MetadataConfigurationResponse])
 async def list_configurations(
+    response: Response,
     group_id: Optional[int] = Query(None, description="Filter by group"),
     active_only: bool = Query(True, description="Show only active configurations"),
     search: Optional[str] = Query(None, description="Search in name and description"),
     data_type: Optional[str] = Query(None, description="Filter by data type"),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page; replaces skip"),
     db: Session = Depends(get_db),
     current_user = Depends(get_current_user)
 ):
@@ -110,7 +112,15 @@ async def list_configurations(
     - Can filter by group, active status, data type
     - Supports search in name and description
     - Returns configurations with their group assignments
+    - A full page sets the X-Next-Cursor header; pass it as cursor for the next page
     """
+    after_name, after_id = None, None
+    if cursor:
+        try:
+            after_name, after_id = MetadataConfigurationService.decode_cursor(cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
     try:
         configs = MetadataConfigurationService.list_configurations(
             db=db,
@@ -119,9 +129,14 @@ async def list_configurations(
             search=search,
             data_type=data_type,
             skip=skip,
-            limit=limit
+            limit=limit,
+            after_name=after_name,
+            after_id=after_id
         )
         
+        if len(configs) == limit:
+            response.headers["X-Next-Cursor"] = MetadataConfigurationService.encode_cursor(configs[-1])
+        
         # Format response
         return [
             MetadataConfigurationResponse(
@@ -653,7 +653,7 @@ async def query_agentic(
 
         from database.database import Collection, collection_document_association    
             # Verify collection exists
-        collection = db.query(Collection).filter(Collection.id == request.collection_id).first()
+        collection = db.get(Collection, request.collection_id)
         if not collection:
             raise HTTPException(status_code=404, detail=f"Collection with id {request.collection_id} not found")
             
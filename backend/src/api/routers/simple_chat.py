@@ -10,6 +10,7 @@ from datetime import datetime
 from database.database import get_db_session, FDAExtractionResults
 from api.routers.simple_auth import get_current_user
 from utils.qdrant_util import QdrantUtil
+from utils.telemetry import timed_span
 
 logger = logging.getLogger(__name__)
 
@@ -57,11 +58,12 @@ async def simple_chat(
         
         # Search for relevant information
         try:
-            results = vector_db.query_with_llm(
-                query=request.message,
-                collection_name="fda_documents",
-                n_results=3
-            )
+            with timed_span("qdrant.query_with_llm"):
+                results = vector_db.query_with_llm(
+                    query=request.message,
+                    collection_name="fda_documents",
+                    n_results=3
+                )
             
             response_content = results if results else f"I couldn't find specific information about '{request.message}'."
         except Exception as e:
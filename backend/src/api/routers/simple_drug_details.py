@@ -1,15 +1,50 @@
 """Simple drug details router."""
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+import hashlib
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import func
+from sqlalchemy.orm import Session, joinedload
 from database.database import get_db_session, FDAExtractionResults, DrugSections, SourceFiles
 from api.routers.simple_auth import get_current_user
-
-router = APIRouter(prefix="/api/drugs", tags=["drug_details"])
+from utils.section_titles import section_display_title
 
 # Import JSON type
 from sqlalchemy import JSON
 
+def _sections_by_type(sections) -> dict:
+    """Index sections by type in one pass, keeping the first (lowest order) section of each type."""
+    by_type = {}
+    for section in sections:
+        by_type.setdefault(section.section_type, section)
+    return by_type
+
+# Details rarely change after ingestion; let browsers/CDNs revalidate with If-None-Match
+_CACHE_CONTROL = "private, max-age=60, stale-while-revalidate=300"
+
+def _details_etag(db: Session, section_model, source_file_id: int, *version_parts) -> str:
+    """Compute a strong ETag from the row versions and the section set of a source file.
+
+    Sections are replaced wholesale on reprocessing, so their count, max id and
+    max created_at identify the current set without loading any content.
+    """
+    count, max_id, max_created = db.query(
+        func.count(section_model.id),
+        func.max(section_model.id),
+        func.max(section_model.created_at)
+    ).filter(section_model.source_file_id == source_file_id).one()
+    stamp = ":".join(str(part) for part in (*version_parts, count, max_id, max_created))
+    return '"' + hashlib.blake2b(stamp.encode(), digest_size=16).hexdigest() + '"'
+
+def _not_modified(request: Request, response: Response, etag: str) -> bool:
+    """Set the caching headers and report whether the client copy is still fresh."""
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = _CACHE_CONTROL
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    return if_none_match.strip() == "*" or etag in (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+
 def get_db():
     """Dependency to get database session."""
     db = get_db_session()
@@ -18,127 +53,155 @@ def get_db():
     finally:
         db.close()
 
-@router.get("/{drug_id}/details")
-async def get_drug_details(
-    drug_id: int,
-    db: Session = Depends(get_db)
-):
-    """Get comprehensive drug details with sections."""
-    try:
-        # First try to find by FDAExtractionResults ID
-        drug = db.query(FDAExtractionResults).filter(
-            FDAExtractionResults.id == drug_id
-        ).first()
-        
-        # If not found, try to find by source_file_id
-        if not drug:
-            drug = db.query(FDAExtractionResults).filter(
-                FDAExtractionResults.source_file_id == drug_id
-            ).first()
-        
-        if not drug:
-            # If still not found, create a minimal response from SourceFiles
-            source_file = db.query(SourceFiles).filter(
-                SourceFiles.id == drug_id
+def make_details_router(section_model, name_attr: str, prefix: str, tag: str) -> APIRouter:
+    """Build a details router for one section table.
+
+    ``name_attr`` is the name column on the extraction results and section rows, and the
+    key it is exposed under in ``basic_info``.
+    """
+    label = name_attr.split("_")[0].title()
+    router = APIRouter(prefix=prefix, tags=[tag], default_response_class=ORJSONResponse)
+
+    @router.get("/{item_id}/details")
+    def get_details(
+        item_id: int,
+        request: Request,
+        response: Response,
+        db: Session = Depends(get_db)
+    ):
+        """Get comprehensive details with sections."""
+        try:
+            # First try to find by FDAExtractionResults ID
+            drug = db.query(FDAExtractionResults).options(
+                joinedload(FDAExtractionResults.source_file)
+            ).filter(
+                FDAExtractionResults.id == item_id
             ).first()
             
-            if source_file:
-                # Get sections directly using source_file_id
-                sections = db.query(DrugSections).filter(
-                    DrugSections.source_file_id == drug_id
-                ).order_by(DrugSections.section_order).all()
-                
-                # Extract drug name from sections or filename
-                drug_name = None
-                if sections:
-                    drug_name = sections[0].drug_name
-                if not drug_name:
-                    drug_name = source_file.file_name.replace(".pdf", "").replace("_", " ").upper()
-                    if "lbl" in drug_name.lower():
-                        drug_name = drug_name.split("LBL")[0].strip()
-                
-                # Get indication from sections
-                indication_section = next((s for s in sections if s.section_type in ["indication", "indications"]), None)
+            # If not found, try to find by source_file_id
+            if not drug:
+                drug = db.query(FDAExtractionResults).options(
+                    joinedload(FDAExtractionResults.source_file)
+                ).filter(
+                    FDAExtractionResults.source_file_id == item_id
+                ).first()
+            
+            if not drug:
+                # If still not found, create a minimal response from SourceFiles
+                source_file = db.query(SourceFiles).filter(
+                    SourceFiles.id == item_id
+                ).first()
                 
-                return {
-                    "basic_info": {
-                        "id": source_file.id,
-                        "drug_name": drug_name,
-                        "therapeutic_area": indication_section.section_content[:200] + "..." if indication_section and len(indication_section.section_content) > 200 else (indication_section.section_content if indication_section else "Not specified"),
-                        "approval_status": "Approved",
-                        "country": "United States",
-                        "applicant": "Pharmaceutical Company",
-                        "active_substance": "Not specified",
-                        "regulatory": "FDA"
-                    },
-                    "timeline": {
-                        "submission_date": None,
-                        "pdufa_date": None,
-                        "approval_date": source_file.created_at.strftime("%Y-%m-%d") if source_file.created_at else None
-                    },
-                    "sections": [
-                        {
-                            "id": section.id,
-                            "type": section.section_type,
-                            "title": section.section_title or f"{section.section_type.replace('_', ' ').title()}",
-                            "content": section.section_content or "No content available",
-                            "order": section.section_order or 0
-                        } for section in sections
-                    ],
-                    "file_url": source_file.file_url,
-                    "metadata": {},
-                    "page_info": {
-                        "total_pages": 0,
-                        "page_numbers": [],
-                        "total_chunks": len(sections),
-                        "total_tokens": 0
+                if source_file:
+                    etag = _details_etag(db, section_model, source_file.id, "file", source_file.id, source_file.updated_at)
+                    if _not_modified(request, response, etag):
+                        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": _CACHE_CONTROL})
+                    
+                    # Get sections directly using source_file_id
+                    sections = db.query(section_model).filter(
+                        section_model.source_file_id == item_id
+                    ).order_by(section_model.section_order).all()
+                    
+                    # Extract name from sections or filename
+                    name = None
+                    if sections:
+                        name = getattr(sections[0], name_attr)
+                    if not name:
+                        name = source_file.file_name.replace(".pdf", "").replace("_", " ").upper()
+                        if "lbl" in name.lower():
+                            name = name.split("LBL")[0].strip()
+                    
+                    # Get indication from sections
+                    by_type = _sections_by_type(sections)
+                    indication_section = by_type.get("indication") or by_type.get("indications")
+                    
+                    return {
+                        "basic_info": {
+                            "id": source_file.id,
+                            name_attr: name,
+                            "therapeutic_area": indication_section.section_content[:200] + "..." if indication_section and len(indication_section.section_content) > 200 else (indication_section.section_content if indication_section else "Not specified"),
+                            "approval_status": "Approved",
+                            "country": "United States",
+                            "applicant": "Pharmaceutical Company",
+                            "active_substance": "Not specified",
+                            "regulatory": "FDA"
+                        },
+                        "timeline": {
+                            "submission_date": None,
+                            "pdufa_date": None,
+                            "approval_date": source_file.created_at.date() if source_file.created_at else None
+                        },
+                        "sections": [
+                            {
+                                "id": section.id,
+                                "type": section.section_type,
+                                "title": section.section_title or section_display_title(section.section_type),
+                                "content": section.section_content or "No content available",
+                                "order": section.section_order or 0
+                            } for section in sections
+                        ],
+                        "file_url": source_file.file_url,
+                        "metadata": {},
+                        "page_info": {
+                            "total_pages": 0,
+                            "page_numbers": [],
+                            "total_chunks": len(sections),
+                            "total_tokens": 0
+                        }
                     }
-                }
-            else:
-                raise HTTPException(status_code=404, detail="Drug not found")
-        
-        # Get structured sections
-        sections = db.query(DrugSections).filter(
-            DrugSections.source_file_id == drug.source_file_id
-        ).order_by(DrugSections.section_order).all()
-        
-        # Get indication from DrugSections
-        indication_section = next((s for s in sections if s.section_type == "indication"), None)
-        
-        # Get source file info
-        source_file = db.query(SourceFiles).filter(
-            SourceFiles.id == drug.source_file_id
-        ).first()
-        
-        return {
-            "basic_info": {
-                "id": drug.id,
-                "drug_name": drug.drug_name,
-                "therapeutic_area": indication_section.section_content if indication_section else "Not specified",
-                "approval_status": "Approved",
-                "country": "United States",
-                "applicant": drug.manufacturer or "Not specified",
-                "active_substance": drug.active_ingredients or "Not specified",
-                "regulatory": f"FDA {drug.submission_number}" if drug.submission_number else "FDA"
-            },
-            "timeline": {
-                "submission_date": None,
-                "pdufa_date": None,
-                "approval_date": drug.approval_date
-            },
-            "sections": [
-                {
-                    "id": section.id,
-                    "type": section.section_type,
-                    "title": section.section_title or f"{section.section_type.replace('_', ' ').title()}",
-                    "content": section.section_content or "No content available",
-                    "order": section.section_order or 0
-                } for section in sections
-            ],
-            "file_url": source_file.file_url if source_file else None,
-            "metadata": drug.full_metadata or {}
-        }
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e)) 
\ No newline at end of file
+                else:
+                    raise HTTPException(status_code=404, detail=f"{label} not found")
+            
+            etag = _details_etag(db, section_model, drug.source_file_id, "drug", drug.id, drug.updated_at)
+            if _not_modified(request, response, etag):
+                return Response(status_code=304, headers={"ETag": etag, "Cache-Control": _CACHE_CONTROL})
+            
+            # Get structured sections
+            sections = db.query(section_model).filter(
+                section_model.source_file_id == drug.source_file_id
+            ).order_by(section_model.section_order).all()
+            
+            # Get indication from sections
+            indication_section = _sections_by_type(sections).get("indication")
+            
+            # Source file was joined in with the drug lookup
+            source_file = drug.source_file
+            
+            return {
+                "basic_info": {
+                    "id": drug.id,
+                    name_attr: getattr(drug, name_attr),
+                    "therapeutic_area": indication_section.section_content if indication_section else "Not specified",
+                    "approval_status": "Approved",
+                    "country": "United States",
+                    "applicant": drug.manufacturer or "Not specified",
+                    "active_substance": drug.active_ingredients or "Not specified",
+                    "regulatory": f"FDA {drug.submission_number}" if drug.submission_number else "FDA"
+                },
+                "timeline": {
+                    "submission_date": None,
+                    "pdufa_date": None,
+                    "approval_date": drug.approval_date
+                },
+                "sections": [
+                    {
+                        "id": section.id,
+                        "type": section.section_type,
+                        "title": section.section_title or section_display_title(section.section_type),
+                        "content": section.section_content or "No content available",
+                        "order": section.section_order or 0
+                    } for section in sections
+                ],
+                "file_url": source_file.file_url if source_file else None,
+                "metadata": drug.full_metadata or {}
+            }
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
+    return router
+
+drug_router = make_details_router(DrugSections, "drug_name", "/api/drugs", "drug_details")
+
+router = drug_router
@@ -1,11 +1,18 @@
 """Test router for debugging drug details functionality."""
 
-from fastapi import APIRouter, Depends, HTTPException
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
 from database.database import get_db_session, FDAExtractionResults, DrugSections, SourceFiles
 
 router = APIRouter(prefix="/api/test", tags=["test"])
 
+# Health probes hit this once per second per pod; serve a prebuilt response instead of re-serializing a dict
+_HEALTH_RESPONSE = Response(
+    content=orjson.dumps({"status": "ok", "message": "Test router is working"}),
+    media_type="application/json"
+)
+
 def get_db():
     """Dependency to get database session."""
     db = get_db_session()
@@ -15,7 +22,7 @@ def get_db():
         db.close()
 
 @router.get("/drug/{drug_id}")
-async def test_drug_details(drug_id: int, db: Session = Depends(get_db)):
+def test_drug_details(drug_id: int, db: Session = Depends(get_db)):
     """Simple test for drug details."""
     try:
         # Get basic drug info
@@ -52,4 +59,4 @@ async def test_drug_details(drug_id: int, db: Session = Depends(get_db)):
 @router.get("/health")
 async def test_health():
     """Simple health check."""
-    return {"status": "ok", "message": "Test router is working"} 
\ No newline at end of file
+    return _HEALTH_RESPONSE 
\ No newline at end of file
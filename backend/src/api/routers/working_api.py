@@ -1,18 +1,24 @@
 """Complete working API router for FDA drug information system."""
 
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.orm import Session, joinedload, selectinload
 from typing import List, Optional, Dict, Any
-from pydantic import BaseModel
-import time
+from pydantic import BaseModel, Field
+import hashlib
 import logging
+import orjson
 
-from database.database import get_db_session, FDAExtractionResults, DrugSections, SourceFiles
+from database.database import get_db_session, substring_filter, estimated_row_count, FDAExtractionResults, DrugSections, SourceFiles, DASHBOARD_COUNTS_CACHE_KEY
 from api.routers.simple_auth import get_current_user
+from utils.section_titles import section_display_title
+from utils.telemetry import timed_span
+from utils.cache import get_cache
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter(prefix="/api/v1", tags=["fda_api_v1"])
+# orjson serializes the large result lists several times faster than stdlib json
+router = APIRouter(prefix="/api/v1", tags=["fda_api_v1"], default_response_class=ORJSONResponse)
 
 # Pydantic models
 class DualSearchRequest(BaseModel):
@@ -20,6 +26,42 @@ class DualSearchRequest(BaseModel):
     therapeutic_area: Optional[str] = None
     filters: Optional[Dict[str, Any]] = None
 
+class BulkDetailsRequest(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=100)
+
+# Columns consumed when formatting dual search results; avoids hydrating full ORM rows.
+# Rows are unpacked positionally in dual_search, so keep the order in sync.
+_DUAL_SEARCH_COLUMNS = (
+    FDAExtractionResults.id,
+    FDAExtractionResults.source_file_id,
+    FDAExtractionResults.drug_name,
+    FDAExtractionResults.manufacturer,
+    FDAExtractionResults.approval_date,
+    FDAExtractionResults.active_ingredients,
+    FDAExtractionResults.submission_number,
+    FDAExtractionResults.document_type,
+)
+
+# Dashboard totals only move on ingestion, so a short TTL keeps them fresh enough
+DASHBOARD_COUNTS_TTL_SECONDS = 60
+
+# Identical searches (dashboards, typeahead) repeat within seconds; new extractions show up after at most this long
+DUAL_SEARCH_TTL_SECONDS = 30
+
+def _dual_search_cache_key(request: DualSearchRequest, limit: int, offset: int) -> str:
+    """Cache key for a normalized dual search; stable across processes, unlike hash()."""
+    criteria = orjson.dumps(
+        [
+            (request.brand_name or "").strip().lower(),
+            (request.therapeutic_area or "").strip().lower(),
+            request.filters,
+            limit,
+            offset
+        ],
+        option=orjson.OPT_SORT_KEYS
+    )
+    return f"dual:{hashlib.blake2b(criteria, digest_size=16).hexdigest()}"
+
 def get_db():
     """Dependency to get database session."""
     db = get_db_session()
@@ -30,136 +72,186 @@ def get_db():
 
 # Search endpoints
 @router.post("/search/dual")
-async def dual_search(
+def dual_search(
     request: DualSearchRequest,
+    limit: int = Query(50, ge=1, le=200, description="Number of results to return"),
+    offset: int = Query(0, ge=0, description="Offset for pagination"),
     current_user: dict = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Dual search by brand name and therapeutic area."""
     try:
-        start_time = time.time()
+        cache = get_cache()
+        cache_key = _dual_search_cache_key(request, limit, offset)
+        search_criteria = {
+            "brand_name": request.brand_name,
+            "therapeutic_area": request.therapeutic_area,
+            "filters": request.filters
+        }
+        cached = cache.get(cache_key)
+        if cached is not None:
+            # The key is normalized, so echo this request's own criteria
+            return {**cached, "search_criteria": search_criteria}
         
-        query = db.query(FDAExtractionResults)
+        query = db.query(*_DUAL_SEARCH_COLUMNS)
         filter_conditions = []
         
         # Brand name search
         if request.brand_name:
             filter_conditions.append(
-                FDAExtractionResults.drug_name.ilike(f"%{request.brand_name}%")
+                substring_filter(db, FDAExtractionResults.drug_name, request.brand_name)
             )
         
         # Execute search
         if filter_conditions:
-            from sqlalchemy import and_
-            query = query.filter(and_(*filter_conditions))
+            query = query.filter(*filter_conditions)
         
-        results = query.order_by(FDAExtractionResults.created_at.desc()).all()
-        execution_time = int((time.time() - start_time) * 1000)
+        with timed_span("db.dual_search") as timer:
+            # Fetch one extra row to know whether another page exists without counting
+            results = query.order_by(FDAExtractionResults.created_at.desc()).offset(offset).limit(limit + 1).all()
+            has_more = len(results) > limit
+            results = results[:limit]
+            # Only the first page pays for the total; later pages reuse it client-side
+            total_count = query.order_by(None).count() if offset == 0 else None
+        execution_time = timer.elapsed_ms
         
-        # Format results
-        formatted_results = []
-        for result in results:
-            formatted_results.append({
-                "id": result.id,
-                "source_file_id": result.source_file_id,
-                "drug_name": result.drug_name or "Unknown",
+        # Format results; rows are column tuples, unpacked once instead of per-attribute lookups
+        formatted_results = [
+            {
+                "id": row_id,
+                "source_file_id": source_file_id,
+                "drug_name": drug_name or "Unknown",
                 "therapeutic_area": "Not specified",
-                "manufacturer": result.manufacturer or "Unknown",
+                "manufacturer": manufacturer or "Unknown",
                 "approval_status": "Approved",
-                "approval_date": result.approval_date,
+                "approval_date": approval_date,
                 "country": "United States",
-                "active_ingredients": result.active_ingredients or [],
-                "regulatory_info": f"FDA {result.submission_number}" if result.submission_number else "FDA",
-                "document_type": result.document_type or "Unknown",
+                "active_ingredients": active_ingredients or [],
+                "regulatory_info": f"FDA {submission_number}" if submission_number else "FDA",
+                "document_type": document_type or "Unknown",
                 "relevance_score": 1.0
-            })
+            }
+            for (row_id, source_file_id, drug_name, manufacturer, approval_date,
+                 active_ingredients, submission_number, document_type) in results
+        ]
         
-        return {
+        response = {
             "results": formatted_results,
-            "total_count": len(formatted_results),
+            "total_count": total_count,
+            "limit": limit,
+            "offset": offset,
+            "has_more": has_more,
             "execution_time_ms": execution_time,
-            "search_criteria": {
-                "brand_name": request.brand_name,
-                "therapeutic_area": request.therapeutic_area,
-                "filters": request.filters
-            }
+            "search_criteria": search_criteria
         }
+        cache.set(cache_key, response, DUAL_SEARCH_TTL_SECONDS)
+        return response
     except Exception as e:
         logger.error(f"Error in dual search: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/drugs/{drug_id}/details")
-async def get_drug_details(
+def get_drug_details(
     drug_id: int,
     db: Session = Depends(get_db)
 ):
     """Get comprehensive drug details with sections."""
     try:
-        # Get basic drug info
-        drug = db.query(FDAExtractionResults).filter(
+        # Get basic drug info with its source file (joined) and ordered sections (one selectin query)
+        drug = db.query(FDAExtractionResults).options(
+            joinedload(FDAExtractionResults.source_file),
+            selectinload(FDAExtractionResults.sections)
+        ).filter(
             FDAExtractionResults.id == drug_id
         ).first()
         if not drug:
             raise HTTPException(status_code=404, detail="Drug not found")
         
-        # Get structured sections
-        sections = db.query(DrugSections).filter(
-            DrugSections.source_file_id == drug.source_file_id
-        ).order_by(DrugSections.section_order).all()
-        
-        # Get source file info
-        source_file = db.query(SourceFiles).filter(
-            SourceFiles.id == drug.source_file_id
-        ).first()
-        
-        return {
-            "basic_info": {
-                "id": drug.id,
-                "drug_name": drug.drug_name,
-                "therapeutic_area": "Not specified",
-                "approval_status": "Approved",
-                "country": "United States",
-                "applicant": drug.manufacturer or "Not specified",
-                "active_substance": drug.active_ingredients or "Not specified",
-                "regulatory": f"FDA {drug.submission_number}" if drug.submission_number else "FDA"
-            },
-            "timeline": {
-                "submission_date": None,
-                "pdufa_date": None,
-                "approval_date": drug.approval_date
-            },
-            "sections": [
-                {
-                    "id": section.id,
-                    "type": section.section_type,
-                    "title": section.section_title or f"{section.section_type.replace('_', ' ').title()}",
-                    "content": section.section_content or "No content available",
-                    "order": section.section_order or 0
-                } for section in sections
-            ],
-            "file_url": source_file.file_url if source_file else None,
-            "metadata": drug.full_metadata or {}
-        }
+        return _format_drug_details(drug)
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"Error getting drug details: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/drugs/details")
+def get_drug_details_bulk(
+    request: BulkDetailsRequest,
+    db: Session = Depends(get_db)
+):
+    """Get details for many drugs in one round trip: one IN query (source files joined) plus one sections query."""
+    try:
+        drugs = db.query(FDAExtractionResults).options(
+            joinedload(FDAExtractionResults.source_file),
+            selectinload(FDAExtractionResults.sections)
+        ).filter(
+            FDAExtractionResults.id.in_(request.ids)
+        ).all()
+        drugs_by_id = {drug.id: drug for drug in drugs}
+        
+        # Keep the requested order
+        return {
+            "drugs": [_format_drug_details(drugs_by_id[drug_id]) for drug_id in request.ids if drug_id in drugs_by_id],
+            "not_found": [drug_id for drug_id in request.ids if drug_id not in drugs_by_id]
+        }
+    except Exception as e:
+        logger.error(f"Error getting bulk drug details: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+def _format_drug_details(drug: FDAExtractionResults) -> Dict[str, Any]:
+    """Build the details payload from a drug with its sections and source file loaded."""
+    sections = drug.sections
+    source_file = drug.source_file
+    
+    return {
+        "basic_info": {
+            "id": drug.id,
+            "drug_name": drug.drug_name,
+            "therapeutic_area": "Not specified",
+            "approval_status": "Approved",
+            "country": "United States",
+            "applicant": drug.manufacturer or "Not specified",
+            "active_substance": drug.active_ingredients or "Not specified",
+            "regulatory": f"FDA {drug.submission_number}" if drug.submission_number else "FDA"
+        },
+        "timeline": {
+            "submission_date": None,
+            "pdufa_date": None,
+            "approval_date": drug.approval_date
+        },
+        "sections": [
+            {
+                "id": section.id,
+                "type": section.section_type,
+                "title": section.section_title or section_display_title(section.section_type),
+                "content": section.section_content or "No content available",
+                "order": section.section_order or 0
+            } for section in sections
+        ],
+        "file_url": source_file.file_url if source_file else None,
+        "metadata": drug.full_metadata or {}
+    }
+
 @router.get("/analytics/dashboard")
-async def get_dashboard_data(
+def get_dashboard_data(
     current_user: dict = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Get comprehensive dashboard data for user."""
     try:
-        # Get basic stats
-        total_drugs = db.query(FDAExtractionResults).count()
-        total_sections = db.query(DrugSections).count()
+        # Get basic stats, served from cache between ingestions
+        cache = get_cache()
+        counts = cache.get(DASHBOARD_COUNTS_CACHE_KEY)
+        if counts is None:
+            counts = {
+                "total_drugs": estimated_row_count(db, FDAExtractionResults),
+                "total_sections": estimated_row_count(db, DrugSections)
+            }
+            cache.set(DASHBOARD_COUNTS_CACHE_KEY, counts, DASHBOARD_COUNTS_TTL_SECONDS)
         
         return {
-            "total_drugs": total_drugs,
-            "total_sections": total_sections,
+            "total_drugs": counts["total_drugs"],
+            "total_sections": counts["total_sections"],
             "total_searches": 0,
             "recent_activity": [],
             "manufacturer_stats": [],
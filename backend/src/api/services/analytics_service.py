@@ -1,15 +1,90 @@
 """Analytics service for tracking user interactions."""
 
 import logging
+import threading
+from collections import deque
 from typing import Dict, Any, Optional
-from datetime import datetime
 from sqlalchemy.orm import Session
 
-from database.database import SearchHistory
+from database.database import SearchHistory, get_db_session
 
 logger = logging.getLogger(__name__)
 
 
+class SearchHistoryBatcher:
+    """
+    Buffers SearchHistory rows in memory and writes them with one bulk insert per batch.
+
+    A daemon thread flushes every ``flush_interval`` seconds, or as soon as
+    ``batch_size`` rows are pending, so tracking never costs the request a commit.
+    The buffer is thread-safe and not tied to an event loop, so it also works from
+    background tasks that run their own loop. It holds at most ``max_pending`` rows;
+    if writes fall behind (e.g. the database is down) new rows are dropped rather
+    than growing memory or slowing requests down.
+    """
+
+    def __init__(self, batch_size: int = 200, flush_interval: float = 1.0, max_pending: int = 10000):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._buffer = deque()
+        self._dropped = 0
+        self._wakeup = threading.Event()
+        self._flush_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._thread = None
+
+    def add(self, record: Dict[str, Any]) -> None:
+        """Queue a row (column name -> value) for the next flush; dropped if the buffer is full."""
+        if len(self._buffer) >= self.max_pending:
+            self._dropped += 1
+            return
+        self._buffer.append(record)
+        self._ensure_started()
+        if len(self._buffer) >= self.batch_size:
+            self._wakeup.set()
+
+    def flush(self) -> None:
+        """Write all pending rows, batch_size rows per INSERT."""
+        with self._flush_lock:
+            if self._dropped:
+                logger.warning("Dropped %d search history rows while the buffer was full", self._dropped)
+                self._dropped = 0
+            while self._buffer:
+                batch = []
+                while self._buffer and len(batch) < self.batch_size:
+                    batch.append(self._buffer.popleft())
+                self._write(batch)
+
+    def _write(self, batch) -> None:
+        db = get_db_session()
+        try:
+            db.bulk_insert_mappings(SearchHistory, batch)
+            db.commit()
+        except Exception as e:
+            logger.error("Error writing %d search history rows: %s", len(batch), e)
+            db.rollback()
+        finally:
+            db.close()
+
+    def _ensure_started(self) -> None:
+        if self._thread is None:
+            with self._start_lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="search-history-batcher", daemon=True)
+                    self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+
+# Shared batcher; flushed on application shutdown
+search_history_batcher = SearchHistoryBatcher()
+
+
 class AnalyticsService:
     """Service for tracking and analytics operations."""
     
@@ -23,12 +98,14 @@ class AnalyticsService:
         results_count: int = 0,
         session_id: Optional[str] = None,
         execution_time_ms: Optional[int] = None
-    ) -> SearchHistory:
+    ) -> None:
         """
         Track a search operation in the database.
         
+        The row is queued on search_history_batcher and written with the next batch.
+        
         Args:
-            db: Database session
+            db: Database session (unused; the batcher writes on its own session)
             username: Username performing the search
             search_query: The search query text
             search_type: Type of search (general, entitie_specific, chat, view)
@@ -36,33 +113,18 @@ class AnalyticsService:
             results_count: Number of results returned
             session_id: Session identifier
             execution_time_ms: Time taken to execute the search
-            
-        Returns:
-            SearchHistory record
         """
-        try:
-            search_record = SearchHistory(
-                username=username,
-                search_query=search_query,
-                search_type=search_type,
-                filters_applied=filters or {},
-                results_count=results_count,
-                search_timestamp=datetime.now(),
-                session_id=session_id,
-                execution_time_ms=execution_time_ms
-            )
-            
-            db.add(search_record)
-            db.commit()
-            db.refresh(search_record)
-            
-            logger.info(f"Tracked search: {search_type} - {search_query}")
-            return search_record
-            
-        except Exception as e:
-            logger.error(f"Error tracking search: {e}")
-            db.rollback()
-            raise
+        search_history_batcher.add({
+            "username": username,
+            "search_query": search_query,
+            "search_type": search_type,
+            "filters_applied": filters or {},
+            "results_count": results_count,
+            "session_id": session_id,
+            "execution_time_ms": execution_time_ms
+        })
+        
+        logger.info("Tracked search: %s - %s", search_type, search_query)
     
     @staticmethod
     async def track_entitie_view(
@@ -71,7 +133,7 @@ class AnalyticsService:
         entity_name: str,
         entity_id: Optional[int] = None,
         session_id: Optional[str] = None
-    ) -> SearchHistory:
+    ) -> None:
         """
         Track when a user views a entity document.
         
@@ -81,15 +143,12 @@ class AnalyticsService:
             entity_name: Name of the entity being viewed
             entity_id: ID of the entity if available
             session_id: Session identifier
-            
-        Returns:
-            SearchHistory record
         """
         filters = {"entity_name": entity_name}
         if entity_id:
             filters["entity_id"] = entity_id
             
-        return await AnalyticsService.track_search(
+        await AnalyticsService.track_search(
             db=db,
             username=username,
             search_query=entity_name,
@@ -106,7 +165,7 @@ class AnalyticsService:
         chat_query: str,
         entitie_context: Optional[str] = None,
         session_id: Optional[str] = None
-    ) -> SearchHistory:
+    ) -> None:
         """
         Track chat interactions.
         
@@ -116,15 +175,12 @@ class AnalyticsService:
             chat_query: The chat query/message
             entitie_context: Entity context if chat is about a specific entity
             session_id: Session identifier
-            
-        Returns:
-            SearchHistory record
         """
         filters = {}
         if entitie_context:
             filters["entitie_context"] = entitie_context
             
-        return await AnalyticsService.track_search(
+        await AnalyticsService.track_search(
             db=db,
             username=username,
             search_query=chat_query,
@@ -144,7 +200,7 @@ class AnalyticsService:
         results_count: int = 0,
         session_id: Optional[str] = None,
         execution_time_ms: Optional[int] = None
-    ) -> SearchHistory:
+    ) -> None:
         """
         Track searches within a collection.
         
@@ -157,16 +213,13 @@ class AnalyticsService:
             results_count: Number of results returned
             session_id: Session identifier
             execution_time_ms: Time taken to execute the search
-            
-        Returns:
-            SearchHistory record
         """
         filters = {
             "collection_id": collection_id,
             "collection_name": collection_name
         }
         
-        return await AnalyticsService.track_search(
+        await AnalyticsService.track_search(
             db=db,
             username=username,
             search_query=search_query,
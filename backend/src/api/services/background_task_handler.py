@@ -6,10 +6,9 @@ Handles async processing with proper database session management
 import asyncio
 import logging
 import threading
-from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
 from typing import Dict, List, Optional, Any
-from sqlalchemy.orm import Session, sessionmaker, scoped_session
+from sqlalchemy.orm import Session, sessionmaker
 
 from database.database import engine, SessionLocal
 from api.services.collection_indexing_service import CollectionIndexingService
@@ -22,15 +21,14 @@ class BackgroundTaskHandler:
     
     def __init__(self):
         """Initialize the background task handler."""
-        self.executor = ThreadPoolExecutor(max_workers=5, thread_name_prefix="indexing_worker")
         self.active_tasks: Dict[str, asyncio.Task] = {}
-        # Create a scoped session factory for thread-safe operations
-        self.Session = scoped_session(sessionmaker(bind=engine))
+        # Each job gets its own session, so a plain factory is enough (no thread-local registry)
+        self.SessionFactory = sessionmaker(bind=engine, expire_on_commit=False)
         
     @contextmanager
     def get_thread_safe_session(self):
         """Create a thread-safe database session."""
-        session = self.Session()
+        session = self.SessionFactory()
         try:
             yield session
             session.commit()
@@ -39,8 +37,6 @@ class BackgroundTaskHandler:
             raise
         finally:
             session.close()
-            # Remove session from registry to prevent cross-thread usage
-            self.Session.remove()
     
     async def start_indexing_job_async(
         self,
@@ -149,16 +145,10 @@ class BackgroundTaskHandler:
         return False
     
     def shutdown(self):
-        """Shutdown the executor and cancel all tasks."""
+        """Cancel all tasks."""
         # Cancel all active tasks
         for task in self.active_tasks.values():
             task.cancel()
-        
-        # Shutdown executor
-        self.executor.shutdown(wait=True)
-        
-        # Clean up session registry
-        self.Session.remove()
 
 
 # Global instance
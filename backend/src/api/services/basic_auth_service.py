@@ -1,36 +1,61 @@
 from fastapi import HTTPException, status, Depends
 from fastapi.security import HTTPBasic, HTTPBasicCredentials
-import secrets
-from typing import Dict, Any
+import hashlib
+import hmac
+import os
+import threading
+from collections import OrderedDict, namedtuple
+from types import MappingProxyType
+from typing import Dict, Any, Tuple
+
+from services.password_utils import hash_password, verify_password
+
+# Number of (username, password digest) verification results kept in memory
+VERIFY_CACHE_SIZE = 1024
+
+# Random per-process secret for the verification cache keys. An unsalted hash of each password
+# would be a fast, offline-crackable copy of every recently used credential; the keyed digests
+# can't be matched against precomputed tables and never outlive the process that made them.
+_VERIFY_CACHE_KEY = os.urandom(32)
+
+UserRecord = namedtuple("UserRecord", "id username name role password_hash")
+
+# Simple user store (replace with database in production). Built once per process, read-only,
+# and holding only bcrypt hashes; the plaintext passwords never leave this expression.
+_USERS = MappingProxyType({
+    username: UserRecord(user_id, username, name, role, hash_password(password))
+    for user_id, username, name, role, password in (
+        ("1", "admin", "Administrator", "admin", "admin123"),  # Change this in production
+        ("2", "user1", "User One", "user", "user123"),  # Change this in production
+        ("3", "demo", "Demo User", "user", "demo123"),
+    )
+})
 
 class BasicAuthService:
     def __init__(self):
         self.security = HTTPBasic()
+        self.users = _USERS
+        
+        # LRU of bcrypt results keyed by (username, HMAC-SHA256(password)) so repeat
+        # requests with the same credentials skip the ~50 ms checkpw call
+        self._verify_cache: "OrderedDict[Tuple[str, bytes], bool]" = OrderedDict()
+        self._verify_lock = threading.Lock()
+    
+    def _verify(self, user: UserRecord, password: str) -> bool:
+        """Verify a password against the stored bcrypt hash, caching the result."""
+        key = (user.username, hmac.new(_VERIFY_CACHE_KEY, password.encode('utf-8'), hashlib.sha256).digest())
+        with self._verify_lock:
+            if key in self._verify_cache:
+                self._verify_cache.move_to_end(key)
+                return self._verify_cache[key]
+        
+        valid = verify_password(password, user.password_hash)
         
-        # Simple user store (replace with database in production)
-        self.users = {
-            "admin": {
-                "id": "1",
-                "username": "admin",
-                "name": "Administrator", 
-                "role": "admin",
-                "password": "admin123"  # Change this in production
-            },
-            "user1": {
-                "id": "2", 
-                "username": "user1",
-                "name": "User One",
-                "role": "user",
-                "password": "user123"  # Change this in production
-            },
-            "demo": {
-                "id": "3",
-                "username": "demo",
-                "name": "Demo User",
-                "role": "user", 
-                "password": "demo123"
-            }
-        }
+        with self._verify_lock:
+            self._verify_cache[key] = valid
+            if len(self._verify_cache) > VERIFY_CACHE_SIZE:
+                self._verify_cache.popitem(last=False)
+        return valid
     
     def authenticate_user(self, credentials: HTTPBasicCredentials) -> Dict[str, Any]:
         """Authenticate user with basic auth."""
@@ -38,11 +63,9 @@ class BasicAuthService:
         password = credentials.password
         
         # Check if user exists and password matches
-        if username in self.users:
-            stored_password = self.users[username]["password"]
-            # Use secrets.compare_digest for timing attack protection
-            if secrets.compare_digest(password, stored_password):
-                return self.users[username]
+        user = self.users.get(username)
+        if user is not None and self._verify(user, password):
+            return {"id": user.id, "username": user.username, "name": user.name, "role": user.role}
         
         # Authentication failed
         raise HTTPException(
@@ -1,20 +1,419 @@
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Tuple, Iterable
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, desc, func, distinct
-from database.database import FDAExtractionResults, ChatHistory, SourceFiles, DrugSections, SearchHistory, Collection, collection_document_association
+from sqlalchemy import and_, or_, desc, func, distinct, case, update, select, bindparam
+from database.database import FDAExtractionResults, ChatHistory, SourceFiles, DrugSections, SearchHistory, Collection, collection_document_association, substring_filter, docx_chat_condition, docx_chat_dialect_condition, json_field
 from utils.qdrant_util import QdrantUtil
 from utils.llm_util import get_embeddings_model
 from api.services.analytics_service import AnalyticsService
 import collections
+import functools
 import re
+import numpy as np
 import json
 import ast
+import orjson
 import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from starlette.concurrency import run_in_threadpool
+from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
 from config.settings import settings
+from utils.cache import get_cache
 
 logger = logging.getLogger(__name__)
 
+# Collections are renamed essentially never, so resolving the vector DB name can skip the database
+COLLECTION_NAME_CACHE_KEY = "collection:{collection_id}:vector_db_name"
+COLLECTION_NAME_TTL_SECONDS = 60
+
+# Drug names only change when documents are added, renamed or removed. Cached lists are keyed
+# by a version that those paths bump, the TTL covers names set later by extraction.
+DRUG_NAMES_CACHE_KEY = "drug_names:v{version}:{collection_id}"
+DRUG_NAMES_VERSION_KEY = "drug_names:version"
+DRUG_NAMES_TTL_SECONDS = 120
+DRUG_NAMES_VERSION_TTL_SECONDS = 86400
+
+# SourceFiles columns that search results are built from. Selecting just these returns light
+# rows (same attribute access) instead of ORM objects tracked in the session.
+_SOURCE_FILE_RESULT_COLUMNS = (
+    SourceFiles.id,
+    SourceFiles.file_name,
+    SourceFiles.file_url,
+    SourceFiles.drug_name,
+    SourceFiles.us_ma_date,
+)
+
+# request_details/response_details are JSON text columns parsed on every chat history row.
+# orjson is several times faster than stdlib json; the options keep json.dumps' handling
+# of int keys and accept the numpy scalars found in search results.
+_loads = orjson.loads
+
+
+def _dumps(obj: Any) -> str:
+    return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS).decode()
+
+
+def _first_unique(items: Iterable[str], limit: int = 5) -> List[str]:
+    """First `limit` distinct items in order, stopping as soon as enough are found."""
+    seen = set()
+    unique = []
+    for item in items:
+        if item not in seen:
+            seen.add(item)
+            unique.append(item)
+            if len(unique) == limit:
+                break
+    return unique
+
+
+# Chat list endpoints only show a few fields of the stored JSON. The database extracts them
+# into one small JSON object per row, so the full response and search results (the bulk of
+# response_details) are neither sent over the wire nor parsed. The UI shows 3 search results.
+# json_field reads rows whose text is not valid JSON as empty instead of failing the query.
+_DOCX_CHAT_DETAILS = func.json_object(
+    'docXChat', json_field(ChatHistory.request_details, '$.docXChat')
+).label('details')
+
+_CHAT_SUMMARY_COLUMNS = (
+    ChatHistory.id,
+    ChatHistory.session_id,
+    ChatHistory.user_query,
+    ChatHistory.created_at,
+    ChatHistory.is_favorite,
+    func.json_object(
+        'response', json_field(ChatHistory.response_details, '$.response'),
+        'source_info', json_field(ChatHistory.response_details, '$.source_info'),
+        'used_documents', json_field(ChatHistory.response_details, '$.used_documents'),
+        'search_results', func.json_array(
+            json_field(ChatHistory.response_details, '$.search_results[0]'),
+            json_field(ChatHistory.response_details, '$.search_results[1]'),
+            json_field(ChatHistory.response_details, '$.search_results[2]')
+        ),
+        'docXChat', json_field(ChatHistory.request_details, '$.docXChat')
+    ).label('details'),
+)
+
+CHAT_HISTORY_LIMIT = 50
+
+
+@functools.lru_cache(maxsize=None)
+def _chat_summary_statement(dialect_name: str, docx_chat_filter: Optional[bool], favorites_only: bool):
+    """
+    History/favorites select for one filter combination, with user_id as a bound parameter.
+
+    The statement is built once per combination and reused, so requests skip constructing
+    the query and hit SQLAlchemy's compiled cache with an already-built statement.
+    """
+    stmt = select(*_CHAT_SUMMARY_COLUMNS).where(ChatHistory.user_id == bindparam('user_id'))
+    if favorites_only:
+        stmt = stmt.where(ChatHistory.is_favorite == True)
+    if docx_chat_filter is not None:
+        stmt = stmt.where(docx_chat_dialect_condition(dialect_name, docx_chat_filter))
+    stmt = stmt.order_by(desc(ChatHistory.created_at))
+    if not favorites_only:
+        stmt = stmt.limit(CHAT_HISTORY_LIMIT)
+    return stmt
+
+
+# Conversation context for document queries, per session and document. Every chat write in
+# the session stores a new session version, which is part of the key, so a read that raced a
+# write can only cache under the retired version. It is only cached when the cache is shared
+# by all workers; a per-process copy could miss the previous exchange when follow-ups land on
+# another worker.
+CHAT_HISTORY_CACHE_KEY = "chat_history:{user_id}:{session_id}:v{version}:{source_file_id}"
+CHAT_HISTORY_VERSION_KEY = "chat_history:{user_id}:{session_id}:version"
+CHAT_HISTORY_TTL_SECONDS = 120
+CHAT_HISTORY_VERSION_TTL_SECONDS = 86400
+
+# Topics that need more chunks per document in multi-document queries
+_DETAILED_QUERY_RE = re.compile(r'side effect|adverse|safety|comparison|compare', re.IGNORECASE)
+
+# Keywords for history-based chat suggestions: words longer than 3 characters
+_KEYWORD_RE = re.compile(r'\b\w{4,}\b')
+_COMMON_WORDS = frozenset({'what', 'is', 'the', 'are', 'of', 'a', 'an', 'and', 'or', 'for', 'in', 'to'})
+
+DEFAULT_CHAT_SUGGESTIONS = (
+    "What are the side effects?",
+    "What is the recommended dosage?",
+    "What are the contraindications?",
+    "What are the drug interactions?",
+    "What is the mechanism of action?"
+)
+
+# Topping up short smart-suggestion lists
+GENERAL_FOLLOW_UPS = (
+    "Tell me more about the clinical development",
+    "What are the storage requirements?",
+    "Is there a REMS program?",
+    "What patient counseling is recommended?",
+    "Show the prescribing information highlights"
+)
+
+# Suggestion template -> history keywords that trigger it
+_SUGGESTION_KEYWORDS = {
+    "What are the side effects?": {'effect', 'effects', 'side'},
+    "What is the recommended dosage?": {'dose', 'dosage', 'dosing'},
+    "What are the drug interactions?": {'interaction', 'interactions'},
+    "What are the contraindications?": {'contraindication', 'contraindications'},
+    "What is the mechanism of action?": {'mechanism', 'action'},
+}
+_KEYWORD_SUGGESTIONS = {
+    keyword: template
+    for template, keywords in _SUGGESTION_KEYWORDS.items()
+    for keyword in keywords
+}
+
+# Topic detection on the last response. Terms match anywhere (substring, case-insensitive),
+# so "pregnan" covers pregnancy/pregnant and "compar" covers compare/comparison.
+_INDICATION_TOPIC_RE = re.compile(r'indication|treat|therapy|condition', re.IGNORECASE)
+_SAFETY_TOPIC_RE = re.compile(r'side effect|adverse|safety|toxicity', re.IGNORECASE)
+_COMPARISON_TOPIC_RE = re.compile(r'compar|differ|versus|vs', re.IGNORECASE)
+
+# Suggestions that do not name a drug, shared by every generate_smart_suggestions call
+_INITIAL_MANY_DRUGS_SUGGESTIONS = (
+    "Compare the indications of drugs in this collection",
+    "What are the safety differences among these medications?",
+    "Which drugs have similar mechanisms of action?",
+    "Show the most commonly prescribed drugs here",
+    "What are the newest drugs in this collection?"
+)
+_INITIAL_NO_DRUG_SUGGESTIONS = (
+    "Search for drugs by indication",
+    "Compare multiple drugs",
+    "Show recent FDA approvals",
+    "Explain drug safety monitoring"
+)
+_INDICATION_MANY_DRUGS_FOLLOW_UPS = (
+    "What clinical trials support these indications?",
+    "Are there off-label uses in this collection?",
+    "Which drugs are most effective for this condition?",
+    "Compare mechanisms of action by drug class"
+)
+_INDICATION_MULTI_DRUG_FOLLOW_UPS = (
+    "What clinical trials support these indications?",
+    "Are there off-label uses for these drugs?",
+    "How does efficacy compare between them?",
+    "Compare mechanisms of action"
+)
+_INDICATION_NO_DRUG_FOLLOW_UPS = (
+    "What clinical trials support this indication?",
+    "Are there any off-label uses?",
+    "How does efficacy compare to standard of care?",
+    "What is the mechanism of action for this indication?"
+)
+_SAFETY_NO_DRUG_FOLLOW_UPS = (
+    "What are the contraindications?",
+    "Are there any black box warnings?",
+    "What monitoring is required during treatment?",
+    "How do adverse events compare between drugs?",
+    "What are the drug-drug interactions?"
+)
+_COMPARISON_FOLLOW_UPS = (
+    "Which drug has fewer drug interactions?",
+    "Compare the onset of action",
+    "Which is more cost-effective?",
+    "Compare patient adherence rates",
+    "Which has better quality of life outcomes?"
+)
+
+# Follow-up suggestions for topics found in the last response: (topic regex, suggestions).
+# Topics whose suggestions name the selected drugs are built in generate_smart_suggestions.
+_TOPIC_FOLLOW_UPS = [
+    (re.compile(r'dose|dosing|administration|frequency', re.IGNORECASE), [
+        "Are there dose adjustments for renal/hepatic impairment?",
+        "What about pediatric or geriatric dosing?",
+        "Can doses be split or crushed?",
+        "What is the pharmacokinetic profile?",
+        "How should missed doses be handled?"
+    ]),
+    (re.compile(r'efficacy|effective|clinical trial|study|endpoint', re.IGNORECASE), [
+        "What were the primary and secondary endpoints?",
+        "What was the study population size?",
+        "What was the duration of the trials?",
+        "Were there any subgroup analyses?",
+        "What about long-term efficacy data?"
+    ]),
+    (re.compile(r'pregnan|nursing|breastfeed|pediatric|geriatric', re.IGNORECASE), [
+        "What are the reproductive toxicity findings?",
+        "Is there data on use during lactation?",
+        "What about use in pediatric populations?",
+        "Are there special considerations for elderly patients?"
+    ]),
+]
+
+# LangChain message type for each chat history role
+_ROLE_MESSAGE_TYPES = {"user": HumanMessage, "assistant": AIMessage}
+
+# Fixed instructions for LLM suggestions. Kept identical across requests and placed before
+# the conversation, so provider-side prompt caching can reuse the encoded prefix.
+_SUGGESTIONS_SYSTEM_MESSAGE = SystemMessage(content="""You are an FDA drug information expert. Based on the conversation history, 
+    generate 4-5 highly relevant follow-up questions that the user might want to ask next.
+    
+    Guidelines:
+    1. Questions should be specific to the topic being discussed
+    2. Build upon information already provided in the conversation
+    3. Explore aspects not yet covered in detail
+    4. Keep questions concise - max 10-12 words each
+    5. Focus on practical, clinically relevant information
+    6. If comparing multiple drugs, use general terms like "these drugs" instead of listing all names
+    7. NEVER list all drug names in a single question
+    8. For collections with many drugs, use phrases like "in this collection" or "among these medications"
+    
+    Return ONLY the questions as a JSON array of strings, nothing else.""")
+
+# Topic bits for the rule-based suggestions; _TOPIC_FOLLOW_UPS entries use the bits after these
+_INDICATION_TOPIC = 1 << 0
+_SAFETY_TOPIC = 1 << 1
+_COMPARISON_TOPIC = 1 << 2
+_FOLLOW_UP_TOPIC_SHIFT = 3
+
+
+def _topic_mask(last_response: str, multiple_drugs: bool) -> int:
+    """Bit mask of the suggestion topics found in the last response."""
+    mask = 0
+    if _INDICATION_TOPIC_RE.search(last_response):
+        mask |= _INDICATION_TOPIC
+    if _SAFETY_TOPIC_RE.search(last_response):
+        mask |= _SAFETY_TOPIC
+    for i, (topic_re, _) in enumerate(_TOPIC_FOLLOW_UPS):
+        if topic_re.search(last_response):
+            mask |= 1 << (_FOLLOW_UP_TOPIC_SHIFT + i)
+    # Comparison suggestions only make sense with several drugs selected
+    if multiple_drugs and _COMPARISON_TOPIC_RE.search(last_response):
+        mask |= _COMPARISON_TOPIC
+    return mask
+
+
+@functools.lru_cache(maxsize=2048)
+def _topic_suggestions(topic_mask: int, drug_names: Tuple[str, ...], has_many_drugs: bool) -> Tuple[str, ...]:
+    """
+    Up to 5 unique follow-up suggestions for the topics in topic_mask, in priority order.
+
+    Deterministic in its arguments, and the same drugs and topics come up across users of a
+    collection, so results are memoized.
+    """
+    suggestions = []
+    
+    if topic_mask & _INDICATION_TOPIC:
+        if has_many_drugs:
+            suggestions.extend(_INDICATION_MANY_DRUGS_FOLLOW_UPS)
+        elif len(drug_names) > 1:
+            suggestions.extend(_INDICATION_MULTI_DRUG_FOLLOW_UPS)
+        elif len(drug_names) == 1:
+            suggestions.extend([
+                f"What clinical trials support {drug_names[0]}'s indication?",
+                f"Are there any off-label uses for {drug_names[0]}?",
+                f"How does {drug_names[0]} compare to standard of care?",
+                f"What is the mechanism of action for {drug_names[0]}?"
+            ])
+        else:
+            suggestions.extend(_INDICATION_NO_DRUG_FOLLOW_UPS)
+    
+    if topic_mask & _SAFETY_TOPIC:
+        if len(drug_names) > 1:
+            joined_vs = ' vs '.join(drug_names)
+            suggestions.extend([
+                f"What are the contraindications for {joined_vs}?",
+                f"Do any of these drugs have black box warnings: {', '.join(drug_names)}?",
+                f"Which requires more monitoring: {' or '.join(drug_names)}?",
+                f"Compare adverse events between {' and '.join(drug_names)}",
+                f"Compare drug interactions for {joined_vs}"
+            ])
+        elif len(drug_names) == 1:
+            suggestions.extend([
+                f"What are the contraindications for {drug_names[0]}?",
+                f"Does {drug_names[0]} have any black box warnings?",
+                f"What monitoring is required for {drug_names[0]}?",
+                f"How common are adverse events with {drug_names[0]}?",
+                f"What drug interactions does {drug_names[0]} have?"
+            ])
+        else:
+            suggestions.extend(_SAFETY_NO_DRUG_FOLLOW_UPS)
+    
+    for i, (_, follow_ups) in enumerate(_TOPIC_FOLLOW_UPS):
+        if topic_mask & (1 << (_FOLLOW_UP_TOPIC_SHIFT + i)):
+            suggestions.extend(follow_ups)
+    
+    if topic_mask & _COMPARISON_TOPIC:
+        suggestions.extend(_COMPARISON_FOLLOW_UPS)
+    
+    return tuple(_first_unique(suggestions))
+
+
+# LRU of query embeddings keyed by the raw query string. Searches repeat a lot (suggested
+# questions, pagination, retries), and each miss is an embedding API round trip.
+QUERY_EMBEDDING_CACHE_SIZE = 256
+_query_embeddings: "collections.OrderedDict[str, List[float]]" = collections.OrderedDict()
+_query_embeddings_lock = threading.Lock()
+_embeddings_model = None
+
+
+@functools.lru_cache(maxsize=1)
+def _suggestion_llm():
+    """Chat model for follow-up suggestions, built once per process instead of per request."""
+    from utils.llm_util_gemini import get_llm
+    return get_llm()
+
+
+def _message_content(message: Any) -> str:
+    """Text of a chat history entry: a {"role", "content"} dict, a plain string or a message object."""
+    if isinstance(message, dict):
+        return message.get("content", "")
+    if isinstance(message, str):
+        return message
+    return getattr(message, "content", "") or ""
+
+
+def _last_message_content(chat_history: List[Any]) -> str:
+    """Text of the last chat history entry, or "" for an empty history."""
+    return _message_content(chat_history[-1]) if chat_history else ""
+
+
+# LLM suggestion parsing: a JSON array embedded in surrounding text, or else one match per
+# line containing a question, where group 1 is the line without the surrounding whitespace,
+# leading numbering/bullets/quotes and trailing quotes
+_JSON_ARRAY_RE = re.compile(r'\[.*?\]', re.DOTALL)
+_QUESTION_LINE_RE = re.compile(
+    r'^[^\S\n]*(?:[\d.\-*"\'`]+[^\S\n]*)?([^\n]*?\?[^\n]*?)["\'`]*[^\S\n]*$',
+    re.MULTILINE
+)
+
+
+def _parse_json_array(content: str) -> Optional[List[Any]]:
+    """
+    JSON array from an LLM response, or None.
+
+    The prompt asks for a bare JSON array, so the whole response is parsed first; the
+    regex scan for an array inside surrounding text only runs when that fails.
+    """
+    try:
+        parsed = _loads(content)
+        if isinstance(parsed, list):
+            return parsed
+    except orjson.JSONDecodeError:
+        pass
+    
+    match = _JSON_ARRAY_RE.search(content)
+    if not match:
+        return None
+    try:
+        parsed = _loads(match.group())
+    except orjson.JSONDecodeError as e:
+        logger.warning(f"Failed to parse JSON from LLM response: {e}")
+        return None
+    return parsed if isinstance(parsed, list) else None
+
+
+# Embeds search queries while the search's database queries run. A Session can't be shared
+# between threads, so the database work itself stays on the request's thread. Sized like the
+# request threadpool (see main.py) so concurrent searches never queue behind each other here.
+_query_embedding_executor = ThreadPoolExecutor(
+    max_workers=int(os.environ.get('THREADPOOL_MAX_WORKERS', 200)), thread_name_prefix="query-embedding"
+)
+
 class FDAChatManagementService:
     
     @staticmethod
@@ -31,124 +430,127 @@ class FDAChatManagementService:
         """Search for FDA documents using SourceFiles table with SQL first, then vector search fallback."""
         logger.info(f"Searching FDA documents with query: {search_query}, drug_name filter: {drug_name}, collection_id: {collection_id}, source_file_id: {source_file_id}")
         
+        # No query, drug filter or collection - this shouldn't happen due to frontend validation.
+        # Answer before touching the database and leave it out of search analytics.
+        if not (search_query.strip() or drug_name or collection_id):
+            logger.warning("Search called with no query, no drug filter, and no collection")
+            return {
+                "success": True,
+                "results": [],
+                "search_type": "SQL",
+                "total_results": 0
+            }
+        
         start_time = datetime.now()
         
+        # DB queries, the Qdrant search and LLM grading all block, so run them in the
+        # threadpool instead of stalling every other request on the event loop
+        response, results_count = await run_in_threadpool(
+            FDAChatManagementService._run_document_search,
+            search_query=search_query,
+            drug_name=drug_name,
+            collection_id=collection_id,
+            source_file_id=source_file_id,
+            limit=limit,
+            offset=offset,
+            db=db
+        )
+        
+        # Prepare filters for analytics tracking
+        filters = {}
+        if drug_name:
+            filters["drug_name"] = drug_name
+        if collection_id:
+            filters["collection_id"] = collection_id
+        if source_file_id:
+            filters["source_file_id"] = source_file_id
+        
+        # Track every search exactly once, whichever branch returned
+        try:
+            await AnalyticsService.track_search(
+                db=db,
+                username=str(user_id),
+                search_query=search_query,
+                search_type=response["search_type"],
+                filters=filters,
+                results_count=results_count,
+                execution_time_ms=int((datetime.now() - start_time).total_seconds() * 1000)
+            )
+        except Exception as e:
+            logger.error(f"Failed to track search: {str(e)}")
+        
+        return response
+    
+    @staticmethod
+    def _run_document_search(
+        search_query: str,
+        drug_name: Optional[str],
+        collection_id: Optional[int],
+        source_file_id: Optional[int],
+        limit: int,
+        offset: int,
+        db: Session
+    ) -> Tuple[Dict[str, Any], int]:
+        """
+        Blocking part of search_fda_documents.
+        
+        Returns:
+            Tuple of (response, result count to record in search analytics)
+        """
         try:
             # Get collection name for vector database operations
             vector_db_collection_name = "fda_documents"  # Default fallback
             if collection_id:
-                collection = db.query(Collection).filter(Collection.id == collection_id).first()
-                if collection and collection.vector_db_collection_name:
-                    vector_db_collection_name = collection.vector_db_collection_name
+                collection_name = FDAChatManagementService._get_vector_db_collection_name(collection_id, db)
+                if collection_name:
+                    vector_db_collection_name = collection_name
                     logger.info(f"Using vector database collection: {vector_db_collection_name}")
                 else:
                     logger.warning(f"Collection {collection_id} not found or has no vector_db_collection_name, using default")
             
-            # Prepare filters for analytics tracking
-            filters = {}
-            if drug_name:
-                filters["drug_name"] = drug_name
-            if collection_id:
-                filters["collection_id"] = collection_id
-            if source_file_id:
-                filters["source_file_id"] = source_file_id
-            
             # If source_file_id and query are provided, search within that specific document
             if source_file_id and search_query.strip():
                 logger.info(f"Source file ID and query provided - searching within specific document")
+                query_embedding = _query_embedding_executor.submit(FDAChatManagementService._embed_query, search_query)
                 
                 # Get the file details
-                source_file = db.query(SourceFiles).filter(SourceFiles.id == source_file_id).first()
+                source_file = db.get(SourceFiles, source_file_id)
                 
                 if not source_file:
                     logger.info(f"No file found with ID: {source_file_id}")
-                    # Track search with no results
-                    execution_time = (datetime.now() - start_time).total_seconds() * 1000
-                    await AnalyticsService.track_search(
-                        db=db,
-                        username=str(user_id),
-                        search_query=search_query,
-                        search_type="Vector",
-                        filters=filters,
-                        results_count=0,
-                        execution_time_ms=int(execution_time)
-                    )
-                    
                     return {
                         "success": True,
                         "results": [],
                         "search_type": "Vector",
                         "total_results": 0,
                         "message": f"No document found with ID {source_file_id}"
-                    }
+                    }, 0
                 
-                # Use search_with_grading with specific file filter
-                # For vector search, we get more results initially then paginate
-                vector_results = FDAChatManagementService.search_with_grading(
+                results, total_results = FDAChatManagementService._vector_search_and_hydrate(
                     query=search_query,
                     collection_name=vector_db_collection_name,
-                    n_results=max(100, limit + offset),  # Get enough results for pagination
+                    metadata_filter={"source": source_file.file_name},
+                    query_vector=query_embedding.result(),
+                    collection_id=None,
+                    limit=limit,
+                    offset=offset,
                     db=db,
-                    metadata_filter={"source": source_file.file_name}
+                    default_comment="Content match within specific document"
                 )
-                
-                # Transform vector results to match our standard format
-                results = []
-                for result in vector_results:
-                    # Ensure the result is from our target file
-                    if result.get("file_name") == source_file.file_name:
-                        # Ensure relevance score is between 0 and 100
-                        raw_score = result.get("relevance_score", 0)
-                        if raw_score > 1:  # Already in percentage
-                            relevance_score = min(raw_score, 100)
-                        else:  # Convert from decimal to percentage
-                            relevance_score = min(raw_score * 100, 100)
-                        
-                        results.append({
-                            "source_file_id": source_file.id,
-                            "file_name": source_file.file_name,
-                            "file_url": source_file.file_url,
-                            "drug_name": source_file.drug_name,
-                            "us_ma_date": source_file.us_ma_date,
-                            "relevance_score": round(relevance_score, 1),
-                            "relevance_comments": result.get("relevance_comments", "Content match within specific document"),
-                            "grade_weight": result.get('grade_weight', 0),
-                            "search_type": "Vector"
-                        })
-                
-                # Track search results
-                execution_time = (datetime.now() - start_time).total_seconds() * 1000
-                await AnalyticsService.track_search(
-                    db=db,
-                    username=str(user_id),
-                    search_query=search_query,
-                    search_type="Vector",
-                    filters=filters,
-                    results_count=len(results),
-                    execution_time_ms=int(execution_time)
-                )
-                
-                logger.info(f"Document-specific search returned {len(results)} results")
-                
-                # Sort by relevance score (highest first)
-                results.sort(key=lambda x: x['relevance_score'], reverse=True)
-                
-                # Store total before pagination
-                total_results = len(results)
-                
-                # Apply pagination to results
-                results = results[offset:offset + limit]
+                results_count = total_results
+                logger.info(f"Document-specific search returned {total_results} results")
                 
                 return {
                     "success": True,
                     "results": results,
                     "search_type": "Vector",
                     "total_results": total_results
-                }
+                }, results_count
             
             # If both drug_name and query are provided, go directly to vector search with metadata filter
             elif drug_name and search_query.strip():
                 logger.info(f"Both drug_name and query provided - using vector search with metadata filter")
+                query_embedding = _query_embedding_executor.submit(FDAChatManagementService._embed_query, search_query)
                 
                 # Get file names for the specific drug to use as metadata filter
                 drug_files_query = db.query(SourceFiles).filter(
@@ -168,107 +570,37 @@ class FDAChatManagementService:
                 
                 if not drug_files:
                     logger.info(f"No files found for drug: {drug_name}")
-                    # Track search with no results
-                    execution_time = (datetime.now() - start_time).total_seconds() * 1000
-                    await AnalyticsService.track_search(
-                        db=db,
-                        username=str(user_id),
-                        search_query=search_query,
-                        search_type="Vector",
-                        filters=filters,
-                        results_count=0,
-                        execution_time_ms=int(execution_time)
-                    )
-                    
                     return {
                         "success": True,
                         "results": [],
                         "search_type": "Vector",
                         "total_results": 0
-                    }
+                    }, 0
                 
-                # Use search_with_grading with drug filter
-                file_names = [f.file_name for f in drug_files]
-                vector_results = FDAChatManagementService.search_with_grading(
+                results, total_results = FDAChatManagementService._vector_search_and_hydrate(
                     query=search_query,
                     collection_name=vector_db_collection_name,
-                    n_results=max(100, limit + offset),  # Get enough results for pagination
-                    db=db,
-                    metadata_filter={"source": {"$in": file_names}}
-                )
-                
-                # Transform vector results to match our standard format
-                results = []
-                for result in vector_results:
-                    # Get source file details from SourceFiles table
-                    source_file = db.query(SourceFiles).filter(
-                        SourceFiles.file_name == result.get("file_name")
-                    ).first()
-                    
-                    if source_file:
-                        # If collection filter is applied, verify file is in collection and indexed
-                        if collection_id:
-                            file_in_collection = db.query(collection_document_association).filter(
-                                collection_document_association.c.document_id == source_file.id,
-                                collection_document_association.c.collection_id == collection_id,
-                                collection_document_association.c.indexing_status == 'indexed'
-                            ).first()
-                            
-                            if not file_in_collection:
-                                continue  # Skip files not in the collection or not indexed
-                        
-                        # Ensure relevance score is between 0 and 100
-                        raw_score = result.get("relevance_score", 0)
-                        if raw_score > 1:  # Already in percentage
-                            relevance_score = min(raw_score, 100)
-                        else:  # Convert from decimal to percentage
-                            relevance_score = min(raw_score * 100, 100)
-                        
-                        results.append({
-                            "source_file_id": source_file.id,
-                            "file_name": source_file.file_name,
-                            "file_url": source_file.file_url,
-                            "drug_name": source_file.drug_name,
-                            "us_ma_date": source_file.us_ma_date,
-                            "relevance_score": round(relevance_score, 1),
-                            "relevance_comments": result.get("relevance_comments", "Content match with drug filter"),
-                            "grade_weight": result.get('grade_weight', 0),
-                            "search_type": "Vector"
-                        })
-                
-                # Track search results
-                execution_time = (datetime.now() - start_time).total_seconds() * 1000
-                await AnalyticsService.track_search(
+                    metadata_filter={"source": {"$in": [f.file_name for f in drug_files]}},
+                    query_vector=query_embedding.result(),
+                    collection_id=collection_id,
+                    limit=limit,
+                    offset=offset,
                     db=db,
-                    username=str(user_id),
-                    search_query=search_query,
-                    search_type="Vector",
-                    filters=filters,
-                    results_count=len(results),
-                    execution_time_ms=int(execution_time)
+                    default_comment="Content match with drug filter"
                 )
-                
-                logger.info(f"Vector search with drug filter returned {len(results)} results")
-                
-                # Sort by relevance score (highest first)
-                results.sort(key=lambda x: x['relevance_score'], reverse=True)
-                
-                # Store total before pagination
-                total_results = len(results)
-                
-                # Apply pagination to results
-                results = results[offset:offset + limit]
+                results_count = total_results
+                logger.info(f"Vector search with drug filter returned {total_results} results")
                 
                 return {
                     "success": True,
                     "results": results,
                     "search_type": "Vector",
                     "total_results": total_results
-                }
+                }, results_count
             
             # Original SQL search logic for other cases
             logger.info(f"Executing SQL search - drug_name: {drug_name}, collection_id: {collection_id}, query empty: {not search_query.strip()}")
-            sql_query = db.query(SourceFiles)
+            sql_query = db.query(*_SOURCE_FILE_RESULT_COLUMNS)
             
             # Add collection filter if provided
             if collection_id:
@@ -286,26 +618,18 @@ class FDAChatManagementService:
                 logger.info(f"Adding drug name filter: {drug_name}")
                 sql_query = sql_query.filter(SourceFiles.drug_name == drug_name)
             elif search_query.strip() and not drug_name:
-                # Only search query, no drug filter - search drug names
-                sql_query = sql_query.filter(SourceFiles.drug_name.ilike(f"%{search_query}%"))
-            elif not search_query.strip() and not drug_name and collection_id:
-                # Only collection filter - this is allowed
-                pass
-            else:
-                # No drug filter, no search query, and no collection - this shouldn't happen due to frontend validation
-                logger.warning("Search called with no query, no drug filter, and no collection")
-                return {
-                    "success": True,
-                    "results": [],
-                    "search_type": "SQL",
-                    "total_results": 0
-                }
+                # Only search query, no drug filter - search drug names (FULLTEXT-assisted on MySQL)
+                sql_query = sql_query.filter(substring_filter(db, SourceFiles.drug_name, search_query))
+            # Otherwise only the collection filter applies (searches with nothing to
+            # filter on return early in search_fda_documents)
             
-            # Get total count before applying pagination
-            total_count = sql_query.count()
-            
-            # Apply pagination to SQL query
-            sql_results = sql_query.offset(offset).limit(limit).all()
+            # Fetch the page and the pre-pagination total in one query: COUNT(*) OVER ()
+            # repeats the total on every row (the association PK rules out duplicate rows)
+            page = sql_query.add_columns(
+                func.count().over().label("total_count")
+            ).offset(offset).limit(limit).all()
+            sql_results = page
+            total_count = page[0].total_count if page else 0
             logger.info(f"SQL query returned {len(sql_results)} results out of {total_count} total")
             
             if sql_results:
@@ -334,18 +658,7 @@ class FDAChatManagementService:
                         "search_type": "SQL"
                     })
                 
-                # Track SQL search results
-                execution_time = (datetime.now() - start_time).total_seconds() * 1000
-                await AnalyticsService.track_search(
-                    db=db,
-                    username=str(user_id),
-                    search_query=search_query,
-                    search_type="SQL",
-                    filters=filters,
-                    results_count=len(results),
-                    execution_time_ms=int(execution_time)
-                )
-                
+                results_count = len(results)
                 logger.info(f"SQL search returned {len(results)} results")
                 
                 return {
@@ -353,35 +666,23 @@ class FDAChatManagementService:
                     "results": results,
                     "search_type": "SQL",
                     "total_results": total_count
-                }
+                }, results_count
             
             # Check if we should skip vector search fallback
             if collection_id and drug_name and not search_query.strip():
                 # No fallback to vector search when looking for exact drug matches in a collection
                 logger.info(f"No documents found with drug_name '{drug_name}' in collection {collection_id}")
-                
-                # Track SQL search with no results
-                execution_time = (datetime.now() - start_time).total_seconds() * 1000
-                await AnalyticsService.track_search(
-                    db=db,
-                    username=str(user_id),
-                    search_query=search_query,
-                    search_type="SQL",
-                    filters=filters,
-                    results_count=0,
-                    execution_time_ms=int(execution_time)
-                )
-                
                 return {
                     "success": True,
                     "results": [],
                     "search_type": "SQL",
                     "total_results": 0,
                     "message": f"No documents found with drug name '{drug_name}' in the selected collection"
-                }
+                }, 0
             
             # Step 2: Vector search fallback (only for cases with actual search queries)
             logger.info("No SQL results found, falling back to vector search")
+            query_embedding = _query_embedding_executor.submit(FDAChatManagementService._embed_query, search_query)
             
             # Build metadata filter for vector search if collection is specified
             metadata_filter = None
@@ -406,92 +707,31 @@ class FDAChatManagementService:
                         "results": [],
                         "search_type": "Vector",
                         "total_results": 0
-                    }
+                    }, 0
             
-            # Use the existing search_with_grading method
-            vector_results = FDAChatManagementService.search_with_grading(
+            results, total_results = FDAChatManagementService._vector_search_and_hydrate(
                 query=search_query,
-                collection_name=chromadb_collection_name,
-                n_results=max(100, limit + offset),  # Get enough results for pagination
+                collection_name=vector_db_collection_name,
+                metadata_filter=metadata_filter,
+                query_vector=query_embedding.result(),
+                collection_id=collection_id,
+                limit=limit,
+                offset=offset,
                 db=db,
-                metadata_filter=metadata_filter
+                default_comment="Content similarity match"
             )
-            
-            # Transform vector results to match our standard format
-            results = []
-            for result in vector_results:
-                # Get source file details from SourceFiles table
-                source_file = db.query(SourceFiles).filter(
-                    SourceFiles.file_name == result.get("file_name")
-                ).first()
-                
-                if source_file:
-                    # If collection filter is applied, verify file is in collection and indexed
-                    if collection_id:
-                        file_in_collection = db.query(collection_document_association).filter(
-                            collection_document_association.c.document_id == source_file.id,
-                            collection_document_association.c.collection_id == collection_id,
-                            collection_document_association.c.indexing_status == 'indexed'
-                        ).first()
-                        
-                        if not file_in_collection:
-                            continue  # Skip files not in the collection or not indexed
-                    
-                    # Ensure relevance score is between 0 and 100
-                    raw_score = result.get("relevance_score", 0)
-                    if raw_score > 1:  # Already in percentage
-                        relevance_score = min(raw_score, 100)
-                    else:  # Convert from decimal to percentage
-                        relevance_score = min(raw_score * 100, 100)
-                    
-                    results.append({
-                        "source_file_id": source_file.id,
-                        "file_name": source_file.file_name,
-                        "file_url": source_file.file_url,
-                        "drug_name": source_file.drug_name,
-                        "us_ma_date": source_file.us_ma_date,
-                        "relevance_score": round(relevance_score, 1),
-                        "relevance_comments": result.get("relevance_comments", "Content similarity match"),
-                        "grade_weight": result.get('grade_weight', 0),
-                        "search_type": "Vector"
-                    })
-            
-            # Track vector search results
-            execution_time = (datetime.now() - start_time).total_seconds() * 1000
-            await AnalyticsService.track_search(
-                db=db,
-                username=str(user_id),
-                search_query=search_query,
-                search_type="Vector",
-                filters=filters,
-                results_count=len(results),
-                execution_time_ms=int(execution_time)
-            )
-            
-            logger.info(f"Vector search returned {len(results)} results")
+            results_count = total_results
+            logger.info(f"Vector search returned {total_results} results")
             
             return {
                 "success": True,
                 "results": results,
                 "search_type": "Vector",
-                "total_results": len(results)
-            }
+                "total_results": total_results
+            }, results_count
             
         except Exception as e:
             logger.error(f"Search error: {str(e)}")
-            # Still try to track failed search
-            try:
-                await AnalyticsService.track_search(
-                    db=db,
-                    username=str(user_id),
-                    search_query=search_query,
-                    search_type="Failed",
-                    filters=filters if 'filters' in locals() else {},
-                    results_count=0,
-                    execution_time_ms=int((datetime.now() - start_time).total_seconds() * 1000)
-                )
-            except:
-                pass
             
             return {
                 "success": False,
@@ -499,11 +739,186 @@ class FDAChatManagementService:
                 "results": [],
                 "search_type": "Failed",
                 "total_results": 0
-            }
+            }, 0
+    
+    @staticmethod
+    def _embed_query(query: str) -> Optional[List[float]]:
+        """
+        Embed a search query, reusing the embedding of a recent identical query.
+        
+        Returns None when embedding fails, so the vector search embeds the query itself.
+        """
+        global _embeddings_model
+        with _query_embeddings_lock:
+            if query in _query_embeddings:
+                _query_embeddings.move_to_end(query)
+                return _query_embeddings[query]
+        
+        try:
+            if _embeddings_model is None:
+                _embeddings_model = get_embeddings_model()
+            query_vector = _embeddings_model.embed_query(query)
+        except Exception as e:
+            logger.warning(f"Failed to embed search query, deferring to vector search: {str(e)}")
+            return None
+        
+        with _query_embeddings_lock:
+            _query_embeddings[query] = query_vector
+            if len(_query_embeddings) > QUERY_EMBEDDING_CACHE_SIZE:
+                _query_embeddings.popitem(last=False)
+        return query_vector
+    
+    @staticmethod
+    def _vector_search_and_hydrate(
+        query: str,
+        collection_name: str,
+        metadata_filter: Optional[Dict[str, Any]],
+        query_vector: Optional[List[float]],
+        collection_id: Optional[int],
+        limit: int,
+        offset: int,
+        db: Session,
+        default_comment: str
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Run a graded vector search and turn the hits into one page of file results.
+        
+        query_vector is the query's embedding, prefetched by the caller while it queried
+        the database (None makes the vector search embed the query itself). Hits are
+        matched to SourceFiles in one query and, when collection_id is given, restricted
+        to documents indexed in that collection.
+        
+        Returns:
+            Tuple of (results for the requested page, total number of results)
+        """
+        vector_results = FDAChatManagementService.search_with_grading(
+            query=query,
+            collection_name=collection_name,
+            n_results=FDAChatManagementService._vector_candidate_count(limit, offset),
+            db=db,
+            metadata_filter=metadata_filter,
+            query_vector=query_vector
+        )
+        
+        # Transform vector results to match our standard format
+        results = []
+        source_files_by_name = FDAChatManagementService._source_files_by_name(vector_results, db)
+        indexed_ids = FDAChatManagementService._indexed_document_ids(collection_id, db) if collection_id else None
+        
+        # Scale all relevance scores to 0-100 in one pass: scores above 1 are already
+        # percentages, the rest are fractions
+        raw_scores = np.fromiter(
+            (result.get("relevance_score", 0) for result in vector_results),
+            dtype=np.float64,
+            count=len(vector_results)
+        )
+        relevance_scores = np.minimum(np.where(raw_scores > 1, raw_scores, raw_scores * 100), 100).round(1).tolist()
+        
+        for result, relevance_score in zip(vector_results, relevance_scores):
+            get = result.get
+            source_file = source_files_by_name.get(get("file_name"))
+            if not source_file:
+                continue
+            
+            # If collection filter is applied, verify file is in collection and indexed
+            if collection_id and source_file.id not in indexed_ids:
+                continue  # Skip files not in the collection or not indexed
+            
+            results.append({
+                "source_file_id": source_file.id,
+                "file_name": source_file.file_name,
+                "file_url": source_file.file_url,
+                "drug_name": source_file.drug_name,
+                "us_ma_date": source_file.us_ma_date,
+                "relevance_score": relevance_score,
+                "relevance_comments": get("relevance_comments", default_comment),
+                "grade_weight": get('grade_weight', 0),
+                "search_type": "Vector"
+            })
+        
+        # search_with_grading already returns hits ordered by relevance, so no re-sort
+        return results[offset:offset + limit], len(results)
+    
+    @staticmethod
+    def _get_vector_db_collection_name(collection_id: int, db: Session) -> Optional[str]:
+        """Resolve a collection's vector database name, cached for a short TTL."""
+        cache = get_cache()
+        cache_key = COLLECTION_NAME_CACHE_KEY.format(collection_id=collection_id)
+        collection_name = cache.get(cache_key)
+        if collection_name is None:
+            collection_name = db.query(Collection.vector_db_collection_name).filter(
+                Collection.id == collection_id
+            ).scalar()
+            # Unnamed collections get a name on first indexing, so only cache a real one
+            if collection_name:
+                cache.set(cache_key, collection_name, COLLECTION_NAME_TTL_SECONDS)
+        return collection_name
+    
+    @staticmethod
+    def _document_vector_db_collection_name(source_file_id: int, db: Session) -> str:
+        """Vector database name of the first collection holding a document, or the default store."""
+        collection_name = (
+            db.query(Collection.vector_db_collection_name)
+            .join(collection_document_association, Collection.id == collection_document_association.c.collection_id)
+            .filter(
+                collection_document_association.c.document_id == source_file_id,
+                Collection.vector_db_collection_name.isnot(None)
+            )
+            .limit(1)
+            .scalar()
+        )
+        if collection_name:
+            logger.info(f"Using vector database collection: {collection_name} for document {source_file_id}")
+        return collection_name or "fda_documents"
+    
+    @staticmethod
+    def invalidate_vector_db_collection_name(collection_id: int) -> None:
+        """Drop the cached vector database name, e.g. after the collection is deleted."""
+        get_cache().delete(COLLECTION_NAME_CACHE_KEY.format(collection_id=collection_id))
+    
+    @staticmethod
+    def _vector_candidate_count(limit: int, offset: int) -> int:
+        """
+        Number of vector hits to fetch for one page of file results.
+        
+        Every hit is graded, so fetch twice the page end (chunks collapse into files),
+        at least 20 and never more than the previous flat 100.
+        """
+        return min(max(2 * (limit + offset), 20), 100)
+    
+    @staticmethod
+    def _source_files_by_name(vector_results: List[Dict[str, Any]], db: Session) -> Dict[str, Any]:
+        """Load the SourceFiles result columns for all vector hits in one IN query, keyed by file name."""
+        file_names = {result.get("file_name") for result in vector_results if result.get("file_name")}
+        if not file_names:
+            return {}
+        
+        source_files = db.query(*_SOURCE_FILE_RESULT_COLUMNS).filter(SourceFiles.file_name.in_(file_names)).all()
+        # Keep the first row per name, as the per-result .first() lookups did
+        source_files_by_name = {}
+        for source_file in source_files:
+            source_files_by_name.setdefault(source_file.file_name, source_file)
+        return source_files_by_name
+    
+    @staticmethod
+    def _indexed_document_ids(collection_id: int, db: Session) -> set:
+        """Ids of the documents indexed in a collection, for O(1) membership checks on vector hits."""
+        rows = db.query(collection_document_association.c.document_id).filter(
+            collection_document_association.c.collection_id == collection_id,
+            collection_document_association.c.indexing_status == 'indexed'
+        ).all()
+        return {row.document_id for row in rows}
     
     @staticmethod
     def get_unique_drug_names(db: Session, collection_id: Optional[int] = None) -> List[str]:
         """Get all unique drug names from SourceFiles for filter dropdown."""
+        cache = get_cache()
+        version = cache.get(DRUG_NAMES_VERSION_KEY) or 0
+        cache_key = DRUG_NAMES_CACHE_KEY.format(version=version, collection_id=collection_id or 0)
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
         try:
             if collection_id:
                 # Import necessary models
@@ -529,11 +944,20 @@ class FDAChatManagementService:
                     .order_by(SourceFiles.drug_name)\
                     .all()
             
-            return [name[0] for name in drug_names if name[0]]
+            result = [name[0] for name in drug_names if name[0]]
+            cache.set(cache_key, result, DRUG_NAMES_TTL_SECONDS)
+            return result
         except Exception as e:
             logger.error(f"Error getting unique drug names: {str(e)}")
             return []
     
+    @staticmethod
+    def invalidate_drug_names_cache() -> None:
+        """Retire all cached drug name lists after documents are added, renamed or deleted."""
+        cache = get_cache()
+        version = cache.get(DRUG_NAMES_VERSION_KEY) or 0
+        cache.set(DRUG_NAMES_VERSION_KEY, version + 1, DRUG_NAMES_VERSION_TTL_SECONDS)
+    
     @staticmethod
     def get_chat_history(
         session_id: str, 
@@ -542,32 +966,59 @@ class FDAChatManagementService:
         db: Session
     ) -> Optional[List[Tuple[str, str]]]:
         """Get chat history for a specific session and file."""
+        cache = get_cache()
+        cache_key = None
+        if cache.shared:
+            # The version is read before the database, so writes after this point retire the entry
+            version = cache.get(CHAT_HISTORY_VERSION_KEY.format(user_id=user_id, session_id=session_id)) or 0
+            cache_key = CHAT_HISTORY_CACHE_KEY.format(
+                user_id=user_id, session_id=session_id, version=version, source_file_id=source_file_id
+            )
+            cached = cache.get(cache_key)
+            if cached is not None:
+                return [tuple(message) for message in cached] or None
+        
         chat_history = []
         
+        # Only the last 5 exchanges (10 total messages) are used for conversational context,
+        # so filter on the document and limit in SQL instead of parsing the whole session
         result = (
-            db.query(ChatHistory)
+            db.query(ChatHistory.response_details)
             .filter(
                 ChatHistory.user_id == user_id,
-                ChatHistory.session_id == session_id
+                ChatHistory.session_id == session_id,
+                json_field(ChatHistory.response_details, '$.source_file_id') == source_file_id
             )
-            .order_by(ChatHistory.created_at.asc())
+            .order_by(ChatHistory.created_at.desc())
+            .limit(5)
             .all()
         )
         
-        for chat in result:
-            if chat.response_details:
-                try:
-                    response_details = json.loads(chat.response_details)
-                    
-                    if isinstance(response_details, dict) and response_details.get("source_file_id") == source_file_id:
-                        chat_history.append(("human", response_details.get("user_query", "")))
-                        chat_history.append(("ai", response_details.get("response", "")))
-                except (ValueError, json.JSONDecodeError):
-                    logger.error(f"Invalid format in response_details: {chat.response_details}")
-        
-        # Return last 5 exchanges (10 total messages) for conversational context
-        # Each exchange = user message + assistant response = 2 messages
-        return chat_history[-10:] if chat_history else None
+        # Oldest first; each exchange = user message + assistant response = 2 messages
+        for (details,) in reversed(result):
+            try:
+                response_details = _loads(details)
+                
+                if isinstance(response_details, dict):
+                    chat_history.append(("human", response_details.get("user_query", "")))
+                    chat_history.append(("ai", response_details.get("response", "")))
+            except (orjson.JSONDecodeError, TypeError):
+                logger.error(f"Invalid format in response_details: {details}")
+        
+        if cache_key is not None:
+            cache.set(cache_key, chat_history, CHAT_HISTORY_TTL_SECONDS)
+        
+        return chat_history if chat_history else None
+    
+    @staticmethod
+    def invalidate_chat_history(user_id: int, session_id: str) -> None:
+        """Retire the cached conversation context of a session after a chat in it changes."""
+        # A timestamp rather than an increment, so concurrent writes never store the same version
+        get_cache().set(
+            CHAT_HISTORY_VERSION_KEY.format(user_id=user_id, session_id=session_id),
+            time.time_ns(),
+            CHAT_HISTORY_VERSION_TTL_SECONDS
+        )
     
     @staticmethod
     async def query_fda_document(
@@ -581,22 +1032,16 @@ class FDAChatManagementService:
         logger.info(f"Querying FDA document with source_file_id: {source_file_id}")
         
         # Get document details
-        fda_doc = db.query(SourceFiles).filter(
-            SourceFiles.id == source_file_id
-        ).first()
+        fda_doc = db.get(SourceFiles, source_file_id)
         
         if not fda_doc:
             logger.warning(f"No FDA document found for source_file_id: {source_file_id}")
             return None
         
         # Get the collection name from the document's collections
-        vector_db_collection_name = "fda_documents"  # Default fallback
-        if fda_doc.collections:
-            # Use the first collection's vector database name
-            collection = fda_doc.collections[0]
-            if collection.vector_db_collection_name:
-                vector_db_collection_name = collection.vector_db_collection_name
-                logger.info(f"Using vector database collection: {vector_db_collection_name} for document {source_file_id}")
+        vector_db_collection_name = FDAChatManagementService._document_vector_db_collection_name(
+            source_file_id, db
+        )
         
         # Get chat history
         chat_history = FDAChatManagementService.get_chat_history(
@@ -613,7 +1058,7 @@ class FDAChatManagementService:
         
         response = vector_db_util.query_with_llm(
             query=query_string,
-            collection_name=chromadb_collection_name,
+            collection_name=vector_db_collection_name,
             n_results=5,
             filter_dict=metadata_filter,
             chat_history=chat_history
@@ -646,8 +1091,10 @@ class FDAChatManagementService:
         """Query multiple FDA documents using vector database."""
         logger.info(f"Querying FDA documents with source_file_ids: {source_file_ids}")
         
-        # Get document details for all source_file_ids
-        fda_docs = db.query(SourceFiles).filter(
+        # Get document details for all source_file_ids as plain rows (only the columns used below)
+        fda_docs = db.query(
+            SourceFiles.id, SourceFiles.file_name, SourceFiles.file_url, SourceFiles.drug_name
+        ).filter(
             SourceFiles.id.in_(source_file_ids)
         ).all()
         
@@ -660,16 +1107,10 @@ class FDAChatManagementService:
             session_id, user_id, source_file_ids[0], db
         )
         
-        # Get the collection name from the documents' collections
-        vector_db_collection_name = "fda_documents"  # Default fallback
-        if fda_docs:
-            # Check the first document's collections
-            first_doc = fda_docs[0]
-            if first_doc.collections:
-                collection = first_doc.collections[0]
-                if collection.vector_db_collection_name:
-                    vector_db_collection_name = collection.vector_db_collection_name
-                    logger.info(f"Using vector database collection: {vector_db_collection_name} for multiple documents")
+        # Get the collection name from the first document's collections
+        vector_db_collection_name = FDAChatManagementService._document_vector_db_collection_name(
+            fda_docs[0].id, db
+        )
         
         # Query vector database with multiple source filters
         vector_db_util = QdrantUtil.get_instance()
@@ -679,10 +1120,9 @@ class FDAChatManagementService:
             # Use the LLM-filtered file names if provided
             logger.info(f"Using LLM-filtered file names: {file_name_filter}")
             # Filter the fda_docs to only include those in the filter
-            filtered_docs = [doc for doc in fda_docs if doc.file_name in file_name_filter]
-            if filtered_docs:
-                file_names = [doc.file_name for doc in filtered_docs]
-            else:
+            filter_set = set(file_name_filter)
+            file_names = [doc.file_name for doc in fda_docs if doc.file_name in filter_set]
+            if not file_names:
                 # If no docs match the filter, use all docs as fallback
                 logger.warning("No documents matched the file filter, using all documents")
                 file_names = [doc.file_name for doc in fda_docs]
@@ -697,17 +1137,15 @@ class FDAChatManagementService:
         
         # Increase n_results for multiple documents to ensure we get content from all
         # For specific topics like side effects, we need more chunks
-        if any(keyword in query_string.lower() for keyword in ['side effect', 'adverse', 'safety', 'comparison', 'compare']):
-            n_results_per_doc = 10  # More chunks for detailed comparisons
-        else:
-            n_results_per_doc = 7  # Standard retrieval
+        # More chunks for detailed comparisons, 7 for standard retrieval
+        n_results_per_doc = 10 if _DETAILED_QUERY_RE.search(query_string) else 7
         
         logger.info(f"Using {n_results_per_doc} chunks per document for query: {query_string}")
         
         try:
             response = vector_db_util.query_with_llm_multi_doc(
                 query=query_string,
-                collection_name=chromadb_collection_name,
+                collection_name=vector_db_collection_name,
                 n_results_per_doc=n_results_per_doc,
                 filter_dict=metadata_filter,
                 chat_history=chat_history,
@@ -726,14 +1164,15 @@ class FDAChatManagementService:
             # fda_docs already contains the source files, no need to query again
             
             # Build response with all drug information
-            drugs_info = []
-            for doc in fda_docs:
-                drugs_info.append({
-                    "source_file_id": doc.id,  # Use doc.id instead of doc.source_file_id
+            drugs_info = [
+                {
+                    "source_file_id": doc.id,
                     "file_name": doc.file_name,
                     "file_url": doc.file_url,
                     "drug_name": doc.drug_name
-                })
+                }
+                for doc in fda_docs
+            ]
             
             query_response = {
                 "source_file_ids": source_file_ids,
@@ -759,11 +1198,12 @@ class FDAChatManagementService:
             user_id=user_id,
             user_query=user_query,
             session_id=session_id,
-            request_details=json.dumps(request_details)
+            request_details=_dumps(request_details)
         )
         db.add(chat)
         db.commit()
         db.refresh(chat)
+        FDAChatManagementService.invalidate_chat_history(user_id, session_id)
         return chat.id
     
     @staticmethod
@@ -773,10 +1213,16 @@ class FDAChatManagementService:
         db: Session
     ) -> None:
         """Update chat response in database."""
-        chat = db.query(ChatHistory).filter(ChatHistory.id == chat_id).first()
+        chat = db.get(ChatHistory, chat_id)
         if chat:
-            chat.response_details = json.dumps(response_details)
+            user_id, session_id = chat.user_id, chat.session_id
+            db.execute(
+                update(ChatHistory)
+                .where(ChatHistory.id == chat_id)
+                .values(response_details=_dumps(response_details))
+            )
             db.commit()
+            FDAChatManagementService.invalidate_chat_history(user_id, session_id)
     
     @staticmethod
     def retrieve_chat_history(
@@ -785,63 +1231,11 @@ class FDAChatManagementService:
         docx_chat_filter: Optional[bool] = None
     ) -> Dict[str, List[Dict[str, Any]]]:
         """Retrieve chat history for a user with optional docXChat filtering."""
-        # Get all chat entries for the user, ordered by most recent first
-        query = db.query(ChatHistory).filter(ChatHistory.user_id == user_id)
-        
-        # Apply docXChat filter if specified
-        if docx_chat_filter is not None:
-            if docx_chat_filter:
-                # Filter for chats where request_details contains "docXChat": true
-                query = query.filter(
-                    func.json_extract(ChatHistory.request_details, '$.docXChat') == True
-                )
-            else:
-                # Filter for chats where request_details contains "docXChat": false or doesn't have the field
-                query = query.filter(
-                    or_(
-                        func.json_extract(ChatHistory.request_details, '$.docXChat') == False,
-                        func.json_extract(ChatHistory.request_details, '$.docXChat').is_(None)
-                    )
-                )
-        
-        chats = query.order_by(desc(ChatHistory.created_at)).limit(50).all()  # Limit to last 50 chats
+        # Last 50 chat entries for the user, most recent first, optionally filtered by docXChat
+        stmt = _chat_summary_statement(db.get_bind().dialect.name, docx_chat_filter, False)
+        chats = db.execute(stmt, {'user_id': user_id}).all()
         
-        history = []
-        for chat in chats:
-            try:
-                # Parse response details to get response content
-                response_details = json.loads(chat.response_details) if chat.response_details else {}
-                response_content = response_details.get("response", "")
-            except (json.JSONDecodeError, TypeError):
-                response_content = ""
-            
-            # Parse request details to check docXChat
-            try:
-                request_details = json.loads(chat.request_details) if chat.request_details else {}
-                is_docx_chat = request_details.get("docXChat", False)
-            except (json.JSONDecodeError, TypeError):
-                request_details = {}
-                is_docx_chat = False
-            
-            # Extract source information from response details
-            source_info = response_details.get("source_info", {})
-            used_documents = response_details.get("used_documents", False)
-            search_results = response_details.get("search_results", [])
-            
-            history.append({
-                'id': chat.id,
-                'session_id': chat.session_id,
-                'query': chat.user_query,
-                'response': response_content,
-                'source_file_id': None,  # For compatibility
-                'source_file_ids': None,  # For compatibility
-                'created_at': chat.created_at.isoformat(),
-                'is_favorite': chat.is_favorite,
-                'source_info': source_info,
-                'used_documents': used_documents,
-                'search_results': search_results[:3] if search_results else [],  # Limit to 3 for UI
-                'is_docx_chat': is_docx_chat  # Include docXChat status
-            })
+        history = [FDAChatManagementService._format_chat_summary(chat) for chat in chats]
         
         return {'history': history}
     
@@ -859,27 +1253,17 @@ class FDAChatManagementService:
         
         # Apply docXChat filter if specified
         if docx_chat_filter is not None:
-            if docx_chat_filter:
-                # Filter for chats where request_details contains "docXChat": true
-                base_query = base_query.filter(
-                    func.json_extract(ChatHistory.request_details, '$.docXChat') == 'true'
-                )
-            else:
-                # Filter for chats where request_details contains "docXChat": false or doesn't have the field
-                base_query = base_query.filter(
-                    or_(
-                        func.json_extract(ChatHistory.request_details, '$.docXChat') == False,
-                        func.json_extract(ChatHistory.request_details, '$.docXChat').is_(None)
-                    )
-                )
+            base_query = base_query.filter(docx_chat_condition(db, docx_chat_filter))
         
-        # Get the first chat of each session with session info
+        # Get the first chat of each session with session info. has_favorite is 1 when any
+        # message in the session (respecting the filter) is a favorite.
         session_subquery = (
             base_query.with_entities(
                 ChatHistory.session_id,
                 func.min(ChatHistory.created_at).label('first_chat_time'),
                 func.max(ChatHistory.created_at).label('last_chat_time'),
-                func.count(ChatHistory.id).label('message_count')
+                func.count(ChatHistory.id).label('message_count'),
+                func.max(case((ChatHistory.is_favorite == True, 1), else_=0)).label('has_favorite')
             )
             .group_by(ChatHistory.session_id)
             .subquery()
@@ -887,7 +1271,16 @@ class FDAChatManagementService:
         
         # Get the first chat details for each session
         first_chats_query = (
-            db.query(ChatHistory, session_subquery.c.message_count, session_subquery.c.last_chat_time)
+            db.query(
+                ChatHistory.id,
+                ChatHistory.session_id,
+                ChatHistory.user_query,
+                ChatHistory.created_at,
+                _DOCX_CHAT_DETAILS,
+                session_subquery.c.message_count,
+                session_subquery.c.last_chat_time,
+                session_subquery.c.has_favorite
+            )
             .join(
                 session_subquery,
                 and_(
@@ -900,17 +1293,7 @@ class FDAChatManagementService:
         
         # Apply the same docXChat filter to the main query
         if docx_chat_filter is not None:
-            if docx_chat_filter:
-                first_chats_query = first_chats_query.filter(
-                    func.json_extract(ChatHistory.request_details, '$.docXChat') == 'true'
-                )
-            else:
-                first_chats_query = first_chats_query.filter(
-                    or_(
-                        func.json_extract(ChatHistory.request_details, '$.docXChat') == False,
-                        func.json_extract(ChatHistory.request_details, '$.docXChat').is_(None)
-                    )
-                )
+            first_chats_query = first_chats_query.filter(docx_chat_condition(db, docx_chat_filter))
         
         first_chats = (
             first_chats_query
@@ -920,46 +1303,17 @@ class FDAChatManagementService:
         )
         
         sessions = []
-        for chat, message_count, last_chat_time in first_chats:
-            # Check if any message in this session is favorite (respecting the filter)
-            favorite_query = db.query(ChatHistory).filter(
-                ChatHistory.session_id == chat.session_id,
-                ChatHistory.user_id == user_id,
-                ChatHistory.is_favorite == True
-            )
-            
-            # Apply docXChat filter to favorite check
-            if docx_chat_filter is not None:
-                if docx_chat_filter:
-                    favorite_query = favorite_query.filter(
-                        func.json_extract(ChatHistory.request_details, '$.docXChat') == 'true'
-                    )
-                else:
-                    favorite_query = favorite_query.filter(
-                        or_(
-                            func.json_extract(ChatHistory.request_details, '$.docXChat') == False,
-                            func.json_extract(ChatHistory.request_details, '$.docXChat').is_(None)
-                        )
-                    )
-            
-            has_favorite = favorite_query.first() is not None
-            
-            # Parse request details to check docXChat
-            try:
-                request_details = json.loads(chat.request_details) if chat.request_details else {}
-                is_docx_chat = request_details.get("docXChat", False)
-            except (json.JSONDecodeError, TypeError):
-                request_details = {}
-                is_docx_chat = False
+        for chat in first_chats:
+            is_docx_chat = bool(_loads(chat.details).get("docXChat"))
             
             sessions.append({
                 'id': chat.id,  # ID of the first message
                 'session_id': chat.session_id,
                 'query': chat.user_query,  # First query as session title
                 'created_at': chat.created_at.isoformat(),
-                'last_activity': last_chat_time.isoformat(),
-                'message_count': message_count,
-                'is_favorite': has_favorite,
+                'last_activity': chat.last_chat_time.isoformat(),
+                'message_count': chat.message_count,
+                'is_favorite': bool(chat.has_favorite),
                 'timestamp': chat.created_at.isoformat(),  # For compatibility
                 'is_docx_chat': is_docx_chat  # Include docXChat status
             })
@@ -973,8 +1327,16 @@ class FDAChatManagementService:
         db: Session
     ) -> List[Dict[str, Any]]:
         """Retrieve all chat details for a session."""
+        # Plain rows of the columns used below, no ORM objects tracked in the session
         chats = (
-            db.query(ChatHistory)
+            db.query(
+                ChatHistory.id,
+                ChatHistory.user_query,
+                ChatHistory.request_details,
+                ChatHistory.response_details,
+                ChatHistory.is_favorite,
+                ChatHistory.created_at
+            )
             .filter(
                 ChatHistory.user_id == user_id,
                 ChatHistory.session_id == session_id
@@ -986,9 +1348,9 @@ class FDAChatManagementService:
         chat_details = []
         for chat in chats:
             try:
-                request_details = json.loads(chat.request_details) if chat.request_details else {}
-                response_details = json.loads(chat.response_details) if chat.response_details else {}
-            except json.JSONDecodeError:
+                request_details = _loads(chat.request_details) if chat.request_details else {}
+                response_details = _loads(chat.response_details) if chat.response_details else {}
+            except orjson.JSONDecodeError:
                 request_details = {}
                 response_details = {}
             
@@ -1010,16 +1372,13 @@ class FDAChatManagementService:
         db: Session
     ) -> bool:
         """Mark a chat as favorite."""
-        chat = db.query(ChatHistory).filter(
-            ChatHistory.id == chat_id,
-            ChatHistory.user_id == user_id
-        ).first()
-        
-        if chat:
-            chat.is_favorite = True
-            db.commit()
-            return True
-        return False
+        result = db.execute(
+            update(ChatHistory)
+            .where(ChatHistory.id == chat_id, ChatHistory.user_id == user_id)
+            .values(is_favorite=True)
+        )
+        db.commit()
+        return result.rowcount > 0
     
     @staticmethod
     def remove_chat_from_favorites(
@@ -1028,16 +1387,13 @@ class FDAChatManagementService:
         db: Session
     ) -> bool:
         """Remove a chat from favorites."""
-        chat = db.query(ChatHistory).filter(
-            ChatHistory.id == chat_id,
-            ChatHistory.user_id == user_id
-        ).first()
-        
-        if chat:
-            chat.is_favorite = False
-            db.commit()
-            return True
-        return False
+        result = db.execute(
+            update(ChatHistory)
+            .where(ChatHistory.id == chat_id, ChatHistory.user_id == user_id)
+            .values(is_favorite=False)
+        )
+        db.commit()
+        return result.rowcount > 0
     
     @staticmethod
     def get_favorite_chats(
@@ -1046,74 +1402,35 @@ class FDAChatManagementService:
         docx_chat_filter: Optional[bool] = None
     ) -> Dict[str, List[Dict[str, Any]]]:
         """Get favorite chats for a user with optional docXChat filtering."""
-        query = db.query(ChatHistory).filter(
-            ChatHistory.user_id == user_id,
-            ChatHistory.is_favorite == True
-        )
+        # Optionally filtered by docXChat
+        stmt = _chat_summary_statement(db.get_bind().dialect.name, docx_chat_filter, True)
+        chats = db.execute(stmt, {'user_id': user_id}).all()
         
-        # Apply docXChat filter if specified
-        if docx_chat_filter is not None:
-            if docx_chat_filter:
-                # Filter for chats where request_details contains "docXChat": true
-                query = query.filter(
-                    func.json_extract(ChatHistory.request_details, '$.docXChat') == True
-                )
-            else:
-                # Filter for chats where request_details contains "docXChat": false or doesn't have the field
-                query = query.filter(
-                    or_(
-                        func.json_extract(ChatHistory.request_details, '$.docXChat') == False,
-                        func.json_extract(ChatHistory.request_details, '$.docXChat').is_(None)
-                    )
-                )
-        
-        chats = query.order_by(desc(ChatHistory.created_at)).all()
-        
-        favorites = []
-        for chat in chats:
-            try:
-                # Parse response details to get response content
-                response_details = json.loads(chat.response_details) if chat.response_details else {}
-                response_content = response_details.get("response", "")
-            except (json.JSONDecodeError, TypeError):
-                response_content = ""
-            
-            # Parse request details to check docXChat
-            try:
-                request_details = json.loads(chat.request_details) if chat.request_details else {}
-                is_docx_chat = request_details.get("docXChat", False)
-            except (json.JSONDecodeError, TypeError):
-                request_details = {}
-                is_docx_chat = False
-            
-            # Extract source information from response details
-            try:
-                response_details = json.loads(chat.response_details) if chat.response_details else {}
-                source_info = response_details.get("source_info", {})
-                used_documents = response_details.get("used_documents", False)
-                search_results = response_details.get("search_results", [])
-            except (json.JSONDecodeError, TypeError):
-                source_info = {}
-                used_documents = False
-                search_results = []
-            
-            favorites.append({
-                'id': chat.id,
-                'session_id': chat.session_id,
-                'query': chat.user_query,
-                'response': response_content,
-                'source_file_id': None,  # For compatibility
-                'source_file_ids': None,  # For compatibility
-                'created_at': chat.created_at.isoformat(),
-                'is_favorite': chat.is_favorite,
-                'source_info': source_info,
-                'used_documents': used_documents,
-                'search_results': search_results[:3] if search_results else [],  # Limit to 3 for UI
-                'is_docx_chat': is_docx_chat  # Include docXChat status
-            })
+        favorites = [FDAChatManagementService._format_chat_summary(chat) for chat in chats]
         
         return {'favorites': favorites}
     
+    @staticmethod
+    def _format_chat_summary(chat) -> Dict[str, Any]:
+        """Build a chat history/favorites entry from a row of _CHAT_SUMMARY_COLUMNS."""
+        details = _loads(chat.details)
+        
+        return {
+            'id': chat.id,
+            'session_id': chat.session_id,
+            'query': chat.user_query,
+            'response': details.get("response") or "",
+            'source_file_id': None,  # For compatibility
+            'source_file_ids': None,  # For compatibility
+            'created_at': chat.created_at.isoformat(),
+            'is_favorite': chat.is_favorite,
+            'source_info': details.get("source_info") or {},
+            'used_documents': bool(details.get("used_documents")),
+            # Missing entries come back as nulls
+            'search_results': [result for result in details["search_results"] if result is not None],
+            'is_docx_chat': bool(details.get("docXChat"))  # Include docXChat status
+        }
+    
     @staticmethod
     def delete_chat(
         chat_id: int,
@@ -1121,14 +1438,12 @@ class FDAChatManagementService:
         db: Session
     ) -> bool:
         """Delete a chat."""
-        chat = db.query(ChatHistory).filter(
-            ChatHistory.id == chat_id,
-            ChatHistory.user_id == user_id
-        ).first()
+        chat = db.get(ChatHistory, chat_id)
         
-        if chat:
+        if chat and chat.user_id == user_id:
             db.delete(chat)
             db.commit()
+            FDAChatManagementService.invalidate_chat_history(user_id, chat.session_id)
             return True
         return False
     
@@ -1152,7 +1467,8 @@ class FDAChatManagementService:
         collection_name: str = "fda_documents",
         n_results: int = 15,
         db: Session = None,
-        metadata_filter: Dict[str, Any] = None
+        metadata_filter: Dict[str, Any] = None,
+        query_vector: Optional[List[float]] = None
     ) -> List[Dict[str, Any]]:
         """
         Search documents using vector database and grade them for relevance.
@@ -1164,6 +1480,7 @@ class FDAChatManagementService:
             n_results: Number of initial results to retrieve for grading
             db: Database session (optional)
             metadata_filter: Metadata filter for vector database query (optional)
+            query_vector: Pre-computed query embedding (optional)
             
         Returns:
             List of graded and ranked documents
@@ -1175,8 +1492,9 @@ class FDAChatManagementService:
             search_results = vector_db_util.search_documents(
                 query=query,
                 collection_name=collection_name,
-                n_results=n_results,
-                filter_dict=metadata_filter
+                k=n_results,
+                filters=metadata_filter,
+                query_vector=query_vector
             )
             
             if not search_results:
@@ -1193,48 +1511,48 @@ class FDAChatManagementService:
                 logger.warning("No relevant documents after grading")
                 return []
             
-            # Get unique file names from grading results
-            relevant_files = grading_results['file_paths']
-            
             # If database session provided, fetch full document details
             if db:
-                # Get source files for relevant file names
-                source_files = db.query(SourceFiles).filter(
-                    SourceFiles.file_name.in_(relevant_files)
+                # Get source files for the unique relevant file names in one IN query
+                unique_files = set(grading_results['file_paths'])
+                source_files = db.query(*_SOURCE_FILE_RESULT_COLUMNS).filter(
+                    SourceFiles.file_name.in_(unique_files)
                 ).all()
                 
                 # Create mapping of file names to source files
                 file_to_source = {sf.file_name: sf for sf in source_files}
                 
-                # Prepare results with grading information
-                results = []
-                max_weight = max(grading_results['weights']) if grading_results['weights'] else 1
+                # Relevance score is the weight as a percentage of the max weight, capped at
+                # 100%. Weight represents how many relevant chunks were found.
+                weights = np.asarray(grading_results['weights'], dtype=np.float64)
+                max_weight = weights.max()
+                if max_weight > 0:
+                    scores = np.minimum(weights / max_weight * 100, 100).round(1)
+                else:
+                    scores = np.zeros(len(weights))
+                relevance_scores = scores.tolist()
                 
-                for file_path, weight, comment in zip(
-                    grading_results['file_paths'],
-                    grading_results['weights'],
-                    grading_results['comments']
-                ):
-                    if file_path in file_to_source:
-                        source_file = file_to_source[file_path]
-                        
-                        # Calculate relevance score as percentage based on max weight
-                        # Weight represents how many relevant chunks were found
-                        relevance_score = (weight / max_weight) * 100 if max_weight > 0 else 0.0
-                        
+                # Prepare results with grading information, walking files in descending score
+                # order (stable, so ties keep grading order) so the list comes out sorted
+                file_paths = grading_results['file_paths']
+                raw_weights = grading_results['weights']
+                comments = grading_results['comments']
+                results = []
+                for i in np.argsort(-scores, kind='stable').tolist():
+                    weight, comment, relevance_score = raw_weights[i], comments[i], relevance_scores[i]
+                    source_file = file_to_source.get(file_paths[i])
+                    if source_file is not None:
                         results.append({
                             "id": source_file.id,
                             "source_file_id": source_file.id,
                             "file_name": source_file.file_name,
                             "file_url": source_file.file_url,
                             "drug_name": source_file.drug_name,
-                            "relevance_score": round(min(relevance_score, 100), 1),  # Cap at 100%
+                            "relevance_score": relevance_score,
                             "relevance_comments": comment,
                             "grade_weight": weight  # Just the number, formatting will be done in frontend
                         })
                 
-                # Sort by relevance score (highest first)
-                results.sort(key=lambda x: x['relevance_score'], reverse=True)
                 return results
             else:
                 # Return grading results without database info
@@ -1275,54 +1593,25 @@ class FDAChatManagementService:
         )
         
         if not recent_queries:
-            # Default suggestions
-            return [
-                "What are the side effects?",
-                "What is the recommended dosage?",
-                "What are the contraindications?",
-                "What are the drug interactions?",
-                "What is the mechanism of action?"
-            ]
-        
-        # Extract common keywords
-        all_words = []
-        for query in recent_queries:
-            words = re.findall(r'\b\w+\b', query[0].lower())
-            all_words.extend(words)
-        
-        # Count word frequency
-        word_counts = collections.Counter(all_words)
+            return list(DEFAULT_CHAT_SUGGESTIONS)
         
-        # Filter out common words
-        common_words = {'what', 'is', 'the', 'are', 'of', 'a', 'an', 'and', 'or', 'for', 'in', 'to'}
-        filtered_counts = {word: count for word, count in word_counts.items() 
-                          if word not in common_words and len(word) > 3}
+        # Count keyword frequency, skipping common words
+        word_counts = collections.Counter()
+        for (query,) in recent_queries:
+            word_counts.update(
+                word for word in _KEYWORD_RE.findall(query.lower()) if word not in _COMMON_WORDS
+            )
         
         # Get top keywords
-        top_keywords = [word for word, _ in collections.Counter(filtered_counts).most_common(5)]
+        top_keywords = [word for word, _ in word_counts.most_common(5)]
         
         # Generate suggestions
-        suggestions = []
-        for keyword in top_keywords:
-            if keyword in ['effect', 'effects', 'side']:
-                suggestions.append("What are the side effects?")
-            elif keyword in ['dose', 'dosage', 'dosing']:
-                suggestions.append("What is the recommended dosage?")
-            elif keyword in ['interaction', 'interactions']:
-                suggestions.append("What are the drug interactions?")
-            elif keyword in ['contraindication', 'contraindications']:
-                suggestions.append("What are the contraindications?")
-            elif keyword in ['mechanism', 'action']:
-                suggestions.append("What is the mechanism of action?")
+        suggestions = [
+            _KEYWORD_SUGGESTIONS[keyword] for keyword in top_keywords if keyword in _KEYWORD_SUGGESTIONS
+        ]
         
         # Remove duplicates and limit to 5
-        return list(dict.fromkeys(suggestions))[:5] or [
-            "What are the side effects?",
-            "What is the recommended dosage?",
-            "What are the contraindications?",
-            "What are the drug interactions?",
-            "What is the mechanism of action?"
-        ]
+        return _first_unique(suggestions) or list(DEFAULT_CHAT_SUGGESTIONS)
     
     @staticmethod
     def generate_smart_suggestions(
@@ -1332,29 +1621,19 @@ class FDAChatManagementService:
         db: Session
     ) -> List[str]:
         """Generate intelligent suggestions based on conversation context using LLM."""
-        from utils.llm_util_gemini import get_llm
-        
-        suggestions = []
-        
         # If no chat history, return initial suggestions
         if not chat_history or len(chat_history) <= 1:
             if len(selected_drugs) > 5:
                 # For many drugs, use generic terms
-                return [
-                    "Compare the indications of drugs in this collection",
-                    "What are the safety differences among these medications?",
-                    "Which drugs have similar mechanisms of action?",
-                    "Show the most commonly prescribed drugs here",
-                    "What are the newest drugs in this collection?"
-                ]
+                return list(_INITIAL_MANY_DRUGS_SUGGESTIONS)
             elif len(selected_drugs) > 1:
                 drug_names = [drug.get("drug_name", "Drug") for drug in selected_drugs[:3]]  # Limit to 3
                 suffix = f" and {len(selected_drugs) - 3} others" if len(selected_drugs) > 3 else ""
                 return [
                     f"Compare the indications of {' and '.join(drug_names)}{suffix}",
-                    f"What are the safety differences between these drugs?",
-                    f"How do dosing regimens differ among them?",
-                    f"Which is most effective for common conditions?"
+                    "What are the safety differences between these drugs?",
+                    "How do dosing regimens differ among them?",
+                    "Which is most effective for common conditions?"
                 ]
             elif len(selected_drugs) == 1:
                 drug_name = selected_drugs[0].get("drug_name", "this drug")
@@ -1365,128 +1644,19 @@ class FDAChatManagementService:
                     f"Are there any contraindications for {drug_name}?"
                 ]
             else:
-                return [
-                    "Search for drugs by indication",
-                    "Compare multiple drugs",
-                    "Show recent FDA approvals",
-                    "Explain drug safety monitoring"
-                ]
-        
-        # Analyze the last response for context
-        last_response_lower = last_response.lower()
+                return list(_INITIAL_NO_DRUG_SUGGESTIONS)
         
         # Get drug names for personalized suggestions (limit for readability)
         all_drug_names = [drug.get("drug_name", "Drug") for drug in selected_drugs] if selected_drugs else []
-        drug_names = all_drug_names[:3] if len(all_drug_names) > 3 else all_drug_names
-        has_many_drugs = len(all_drug_names) > 5
-        
-        # Topic-specific suggestions
-        if any(term in last_response_lower for term in ["indication", "treat", "therapy", "condition"]):
-            if has_many_drugs:
-                suggestions.extend([
-                    "What clinical trials support these indications?",
-                    "Are there off-label uses in this collection?",
-                    "Which drugs are most effective for this condition?",
-                    "Compare mechanisms of action by drug class"
-                ])
-            elif len(drug_names) > 1:
-                suggestions.extend([
-                    f"What clinical trials support these indications?",
-                    f"Are there off-label uses for these drugs?",
-                    f"How does efficacy compare between them?",
-                    f"Compare mechanisms of action"
-                ])
-            elif len(drug_names) == 1:
-                suggestions.extend([
-                    f"What clinical trials support {drug_names[0]}'s indication?",
-                    f"Are there any off-label uses for {drug_names[0]}?",
-                    f"How does {drug_names[0]} compare to standard of care?",
-                    f"What is the mechanism of action for {drug_names[0]}?"
-                ])
-            else:
-                suggestions.extend([
-                    "What clinical trials support this indication?",
-                    "Are there any off-label uses?",
-                    "How does efficacy compare to standard of care?",
-                    "What is the mechanism of action for this indication?"
-                ])
-        
-        if any(term in last_response_lower for term in ["side effect", "adverse", "safety", "toxicity"]):
-            if len(drug_names) > 1:
-                suggestions.extend([
-                    f"What are the contraindications for {' vs '.join(drug_names)}?",
-                    f"Do any of these drugs have black box warnings: {', '.join(drug_names)}?",
-                    f"Which requires more monitoring: {' or '.join(drug_names)}?",
-                    f"Compare adverse events between {' and '.join(drug_names)}",
-                    f"Compare drug interactions for {' vs '.join(drug_names)}"
-                ])
-            elif len(drug_names) == 1:
-                suggestions.extend([
-                    f"What are the contraindications for {drug_names[0]}?",
-                    f"Does {drug_names[0]} have any black box warnings?",
-                    f"What monitoring is required for {drug_names[0]}?",
-                    f"How common are adverse events with {drug_names[0]}?",
-                    f"What drug interactions does {drug_names[0]} have?"
-                ])
-            else:
-                suggestions.extend([
-                    "What are the contraindications?",
-                    "Are there any black box warnings?",
-                    "What monitoring is required during treatment?",
-                    "How do adverse events compare between drugs?",
-                    "What are the drug-drug interactions?"
-                ])
-        
-        if any(term in last_response_lower for term in ["dose", "dosing", "administration", "frequency"]):
-            suggestions.extend([
-                "Are there dose adjustments for renal/hepatic impairment?",
-                "What about pediatric or geriatric dosing?",
-                "Can doses be split or crushed?",
-                "What is the pharmacokinetic profile?",
-                "How should missed doses be handled?"
-            ])
-        
-        if any(term in last_response_lower for term in ["efficacy", "effective", "clinical trial", "study", "endpoint"]):
-            suggestions.extend([
-                "What were the primary and secondary endpoints?",
-                "What was the study population size?",
-                "What was the duration of the trials?",
-                "Were there any subgroup analyses?",
-                "What about long-term efficacy data?"
-            ])
-        
-        if any(term in last_response_lower for term in ["pregnan", "nursing", "breastfeed", "pediatric", "geriatric"]):
-            suggestions.extend([
-                "What are the reproductive toxicity findings?",
-                "Is there data on use during lactation?",
-                "What about use in pediatric populations?",
-                "Are there special considerations for elderly patients?"
-            ])
+        drug_names = tuple(all_drug_names[:3])
         
-        # Comparison-specific suggestions if multiple drugs
-        if len(selected_drugs) > 1:
-            if any(term in last_response_lower for term in ["compar", "differ", "versus", "vs"]):
-                suggestions.extend([
-                    "Which drug has fewer drug interactions?",
-                    "Compare the onset of action",
-                    "Which is more cost-effective?",
-                    "Compare patient adherence rates",
-                    "Which has better quality of life outcomes?"
-                ])
-        
-        # Remove duplicates and limit to 5 suggestions
-        unique_suggestions = list(dict.fromkeys(suggestions))[:5]
+        # The suggestions depend only on the detected topics and the drugs, so they are cached
+        topic_mask = _topic_mask(last_response, multiple_drugs=len(all_drug_names) > 1)
+        unique_suggestions = list(_topic_suggestions(topic_mask, drug_names, len(all_drug_names) > 5))
         
         # If we don't have enough specific suggestions, add general ones
         if len(unique_suggestions) < 3:
-            general_suggestions = [
-                "Tell me more about the clinical development",
-                "What are the storage requirements?",
-                "Is there a REMS program?",
-                "What patient counseling is recommended?",
-                "Show the prescribing information highlights"
-            ]
-            unique_suggestions.extend(general_suggestions[:5-len(unique_suggestions)])
+            unique_suggestions.extend(GENERAL_FOLLOW_UPS[:5-len(unique_suggestions)])
         
         return unique_suggestions
     
@@ -1498,110 +1668,65 @@ class FDAChatManagementService:
     ) -> List[str]:
         """Generate intelligent suggestions using LLM based on full conversation context."""
         try:
+            # Without a meaningful chat history there is nothing for the LLM to build on;
+            # the rule-based initial suggestions don't need the API key check either
+            if not chat_history or len(chat_history) <= 1:
+                return FDAChatManagementService.generate_smart_suggestions(
+                    chat_history, selected_drugs, "", db
+                )
+            
             # Check if we have a valid API key
             if not settings.GOOGLE_API_KEY or settings.GOOGLE_API_KEY.strip() == "":
                 logger.warning("Google API key not configured, falling back to rule-based suggestions")
-                # Extract last response safely
-                last_response = ""
-                if chat_history:
-                    last_item = chat_history[-1]
-                    if isinstance(last_item, dict):
-                        last_response = last_item.get("content", "")
-                    elif isinstance(last_item, str):
-                        last_response = last_item
+                last_response = _last_message_content(chat_history)
                 
                 return FDAChatManagementService.generate_smart_suggestions(
                     chat_history, selected_drugs, last_response, db
                 )
-                
-            from utils.llm_util_gemini import get_llm
-            from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
-            
-            # If no meaningful chat history, return empty list
-            if not chat_history or len(chat_history) <= 1:
-                return FDAChatManagementService.generate_smart_suggestions(
-                    chat_history, selected_drugs, "", db
-                )
             
-            # Build conversation context
-            messages = [
-                SystemMessage(content="""You are an FDA drug information expert. Based on the conversation history, 
-                generate 4-5 highly relevant follow-up questions that the user might want to ask next.
-                
-                Guidelines:
-                1. Questions should be specific to the topic being discussed
-                2. Build upon information already provided in the conversation
-                3. Explore aspects not yet covered in detail
-                4. Keep questions concise - max 10-12 words each
-                5. Focus on practical, clinically relevant information
-                6. If comparing multiple drugs, use general terms like "these drugs" instead of listing all names
-                7. NEVER list all drug names in a single question
-                8. For collections with many drugs, use phrases like "in this collection" or "among these medications"
-                
-                Return ONLY the questions as a JSON array of strings, nothing else.""")
-            ]
+            # Static instructions first, then the conversation
+            messages = [_SUGGESTIONS_SYSTEM_MESSAGE]
             
-            # Add conversation history
-            for msg in chat_history:
-                if isinstance(msg, dict):
-                    if msg.get("role") == "user":
-                        messages.append(HumanMessage(content=msg.get("content", "")))
-                    elif msg.get("role") == "assistant":
-                        messages.append(AIMessage(content=msg.get("content", "")))
-                elif isinstance(msg, str):
-                    # If it's a string, assume it's user content
-                    messages.append(HumanMessage(content=msg))
+            # Add conversation history; plain strings are user content, other roles are skipped
+            messages.extend(
+                HumanMessage(content=msg) if isinstance(msg, str)
+                else _ROLE_MESSAGE_TYPES[msg["role"]](content=msg.get("content", ""))
+                for msg in chat_history
+                if isinstance(msg, str) or (isinstance(msg, dict) and msg.get("role") in _ROLE_MESSAGE_TYPES)
+            )
             
-            # Add context about selected drugs (limit to avoid overly long suggestions)
+            # Final request: context about selected drugs (limit to avoid overly long suggestions)
+            # and the instruction, in one trailing message
+            prompt = "Generate 4-5 relevant follow-up questions based on this conversation."
             if selected_drugs:
                 drug_names = [drug.get("drug_name", "Unknown") for drug in selected_drugs]
                 # Limit to first 5 drugs to avoid extremely long suggestions
                 if len(drug_names) > 5:
-                    context = f"\nDrugs being discussed: {', '.join(drug_names[:5])} and {len(drug_names) - 5} others"
+                    context = f"Drugs being discussed: {', '.join(drug_names[:5])} and {len(drug_names) - 5} others"
                 else:
-                    context = f"\nDrugs being discussed: {', '.join(drug_names)}"
-                messages.append(SystemMessage(content=context))
-            
-            # Add prompt for suggestions
-            messages.append(HumanMessage(content="Generate 4-5 relevant follow-up questions based on this conversation."))
+                    context = f"Drugs being discussed: {', '.join(drug_names)}"
+                prompt = f"{context}\n{prompt}"
+            messages.append(HumanMessage(content=prompt))
             
             # Get LLM response with timeout
             logger.info("Attempting to generate LLM-based suggestions")
-            llm = get_llm()
-            response = llm.invoke(messages)
+            response = _suggestion_llm().invoke(messages)
             
             # Parse response
-            import json
-            import re
-            
-            # Extract JSON array from response
             content = response.content.strip()
+            suggestions = _parse_json_array(content)
+            if suggestions is not None:
+                # Ensure we have strings and limit to 5
+                valid_suggestions = [str(s) for s in suggestions[:5] if isinstance(s, str) and s.strip()]
+                if valid_suggestions:
+                    logger.info(f"Successfully generated {len(valid_suggestions)} LLM suggestions")
+                    return valid_suggestions
             
-            # Try to find JSON array in response
-            json_match = re.search(r'\[.*?\]', content, re.DOTALL)
-            if json_match:
-                try:
-                    suggestions = json.loads(json_match.group())
-                    # Ensure we have strings and limit to 5
-                    valid_suggestions = [str(s) for s in suggestions[:5] if isinstance(s, str) and s.strip()]
-                    if valid_suggestions:
-                        logger.info(f"Successfully generated {len(valid_suggestions)} LLM suggestions")
-                        return valid_suggestions
-                except json.JSONDecodeError as e:
-                    logger.warning(f"Failed to parse JSON from LLM response: {e}")
-            
-            # Fallback: try to parse lines as questions
-            lines = content.split('\n')
-            questions = []
-            for line in lines:
-                line = line.strip()
-                # Remove numbering, bullets, quotes
-                line = re.sub(r'^[\d\.\-\*\"\'\`]+\s*', '', line)
-                line = re.sub(r'[\"\'\`]+$', '', line)
-                
-                # Check if it looks like a question
-                if line and '?' in line and len(line) > 10:
-                    questions.append(line)
+            # Fallback: try to parse lines as questions (long enough to be real ones)
+            questions = [
+                question for question in (match.group(1) for match in _QUESTION_LINE_RE.finditer(content))
+                if len(question) > 10
+            ]
             
             if questions:
                 logger.info(f"Generated {len(questions[:5])} LLM suggestions from parsed lines")
@@ -1609,14 +1734,7 @@ class FDAChatManagementService:
             
             # Final fallback to rule-based suggestions
             logger.warning("LLM response parsing failed, falling back to rule-based suggestions")
-            # Extract last response safely
-            last_response = ""
-            if chat_history:
-                last_item = chat_history[-1]
-                if isinstance(last_item, dict):
-                    last_response = last_item.get("content", "")
-                elif isinstance(last_item, str):
-                    last_response = last_item
+            last_response = _last_message_content(chat_history)
             
             return FDAChatManagementService.generate_smart_suggestions(
                 chat_history, selected_drugs, last_response, db
@@ -1624,28 +1742,14 @@ class FDAChatManagementService:
             
         except ImportError as e:
             logger.error(f"Failed to import LLM utilities: {e}")
-            # Extract last response safely
-            last_response = ""
-            if chat_history:
-                last_item = chat_history[-1]
-                if isinstance(last_item, dict):
-                    last_response = last_item.get("content", "")
-                elif isinstance(last_item, str):
-                    last_response = last_item
+            last_response = _last_message_content(chat_history)
             
             return FDAChatManagementService.generate_smart_suggestions(
                 chat_history, selected_drugs, last_response, db
             )
         except Exception as e:
             logger.error(f"Error generating LLM suggestions: {e}")
-            # Extract last response safely
-            last_response = ""
-            if chat_history:
-                last_item = chat_history[-1]
-                if isinstance(last_item, dict):
-                    last_response = last_item.get("content", "")
-                elif isinstance(last_item, str):
-                    last_response = last_item
+            last_response = _last_message_content(chat_history)
             
             # Fallback to rule-based suggestions
             return FDAChatManagementService.generate_smart_suggestions(
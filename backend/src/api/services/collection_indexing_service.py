@@ -12,6 +12,7 @@ from datetime import datetime
 from typing import Dict, List, Optional, Any
 from sqlalchemy.orm import Session
 from sqlalchemy import and_, or_
+from starlette.concurrency import run_in_threadpool
 
 # GCP Pub/Sub Client
 from google.cloud import pubsub_v1
@@ -29,6 +30,18 @@ logger = logging.getLogger(__name__)
 GCP_PROJECT_ID = os.getenv("GCP_PROJECT_ID")
 PUBSUB_TOPIC_ID = os.getenv("PUBSUB_TOPIC_ID")
 
+# Collection name sanitizing for vector database names
+_NON_NAME_CHARS_RE = re.compile(r'[^\w\-]')
+_REPEATED_UNDERSCORES_RE = re.compile(r'_+')
+
+# Jobs started together (e.g. bulk indexing requests) go out in one publish request
+# instead of one round trip each; a lone message waits at most max_latency seconds.
+PUBSUB_BATCH_SETTINGS = pubsub_v1.types.BatchSettings(
+    max_messages=100,
+    max_bytes=1024 * 1024,
+    max_latency=0.05,
+)
+
 
 class CollectionIndexingService:
     """
@@ -44,7 +57,7 @@ class CollectionIndexingService:
         
         # Initialize Pub/Sub publisher client
         if GCP_PROJECT_ID and PUBSUB_TOPIC_ID:
-            self.publisher = pubsub_v1.PublisherClient()
+            self.publisher = pubsub_v1.PublisherClient(batch_settings=PUBSUB_BATCH_SETTINGS)
             self.topic_path = self.publisher.topic_path(GCP_PROJECT_ID, PUBSUB_TOPIC_ID)
         else:
             self.publisher = None
@@ -70,6 +83,40 @@ class CollectionIndexingService:
         if not self.publisher:
             raise ConnectionError("Pub/Sub publisher is not initialized. Check GCP configuration.")
 
+        try:
+            # Database work is blocking; run it in the threadpool so the event loop stays free
+            job_id = await run_in_threadpool(
+                self._create_indexing_job, collection_id, document_ids, job_type, options, user_id, db
+            )
+            
+            # Publish a message to the Pub/Sub topic to trigger the background processor.
+            # The publish future is awaited, so the event loop keeps serving other requests.
+            message_data = json.dumps({"job_id": job_id}).encode("utf-8")
+            try:
+                await asyncio.wrap_future(self.publisher.publish(self.topic_path, message_data))
+            except Exception as e:
+                # Nothing will pick the job up; don't leave it pending forever
+                await run_in_threadpool(self._mark_job_failed, job_id, f"Failed to publish job: {e}", db)
+                raise
+
+            logger.info(f"Successfully created indexing job {job_id} and published to Pub/Sub topic '{PUBSUB_TOPIC_ID}'.")
+            
+            return job_id
+            
+        except Exception as e:
+            logger.error(f"Failed to start indexing job: {str(e)}", exc_info=True)
+            raise
+
+    def _create_indexing_job(
+        self,
+        collection_id: int,
+        document_ids: List[int],
+        job_type: str,
+        options: Optional[Dict],
+        user_id: Optional[int],
+        db: Session
+    ) -> str:
+        """Validate the collection and documents and store a pending job record; returns the job ID."""
         try:
             # Validate collection exists
             collection = db.query(Collection).filter_by(id=collection_id).first()
@@ -80,28 +127,32 @@ class CollectionIndexingService:
             if not collection.vector_db_collection_name:
                 sanitized_name = self._sanitize_name(collection.name)
                 collection.vector_db_collection_name = f"collection_{collection_id}_{sanitized_name}"
-                db.commit()
 
-            # Get all documents to index (including PENDING ones)
-            valid_docs = db.query(SourceFiles).filter(
-                SourceFiles.id.in_(document_ids)
-            ).all()
-
-            found_ids = {doc.id for doc in valid_docs}
-            if len(valid_docs) != len(document_ids):
-                missing_ids = set(document_ids) - found_ids
-                logger.warning(f"Skipping documents that were not found: {missing_ids}")
+            # Get the IDs of all documents to index (including PENDING ones)
+            found_ids = {
+                doc_id for (doc_id,) in db.query(SourceFiles.id).filter(
+                    SourceFiles.id.in_(document_ids)
+                ).all()
+            }
 
-            if not valid_docs:
+            if not found_ids:
                 raise ValueError("No valid documents found to index.")
 
-            valid_doc_ids = [doc.id for doc in valid_docs]
-            
+            if len(found_ids) == len(document_ids):
+                # Every requested document exists (the usual case), so no diff is needed
+                valid_doc_ids = list(document_ids)
+            else:
+                missing_ids = set(document_ids) - found_ids
+                if missing_ids:
+                    logger.warning(f"Skipping documents that were not found: {missing_ids}")
+                # Keep the requested order, without duplicates
+                valid_doc_ids = [doc_id for doc_id in dict.fromkeys(document_ids) if doc_id in found_ids]
+        
             # Create the job record in our database
-            job_id = str(uuid.uuid4())
             job_options = options or {}
             job_options['document_ids'] = valid_doc_ids
-            
+        
+            job_id = str(uuid.uuid4())
             job = IndexingJob(
                 job_id=job_id,
                 collection_id=collection_id,
@@ -112,27 +163,30 @@ class CollectionIndexingService:
                 options=job_options
             )
             db.add(job)
+            # One commit stores the collection name and the job together
             db.commit()
-            
-            # Publish a message to the Pub/Sub topic to trigger the background processor
-            message_data = json.dumps({"job_id": job_id}).encode("utf-8")
-            future = self.publisher.publish(self.topic_path, message_data)
-            future.result() # Wait for the message to be published
-
-            logger.info(f"Successfully created indexing job {job_id} and published to Pub/Sub topic '{PUBSUB_TOPIC_ID}'.")
-            
             return job_id
-            
-        except Exception as e:
-            logger.error(f"Failed to start indexing job: {str(e)}", exc_info=True)
+        except Exception:
+            # Don't leave a half-made change (e.g. the collection name) pending in the session
+            db.rollback()
             raise
 
+    @staticmethod
+    def _mark_job_failed(job_id: str, error: str, db: Session) -> None:
+        """Mark a job failed the way the background processor does."""
+        job = db.query(IndexingJob).filter_by(job_id=job_id).first()
+        if job:
+            job.status = 'failed'
+            job.completed_at = datetime.utcnow()
+            job.error_details = [{'error': error, 'timestamp': datetime.utcnow().isoformat()}]
+            db.commit()
+
     def _sanitize_name(self, name: str) -> str:
         """Sanitize collection names for vector database."""
         # Convert to lowercase and replace spaces/special chars with underscores
-        sanitized = re.sub(r'[^\w\-]', '_', name.lower())
+        sanitized = _NON_NAME_CHARS_RE.sub('_', name.lower())
         # Remove consecutive underscores
-        sanitized = re.sub(r'_+', '_', sanitized)
+        sanitized = _REPEATED_UNDERSCORES_RE.sub('_', sanitized)
         # Remove leading/trailing underscores
         sanitized = sanitized.strip('_')
         if not sanitized:
@@ -11,7 +11,7 @@ import sys
 import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '../..'))
 
-from database.database import database_session, FDAExtractionResults, SourceFiles, EntitySections
+from database.database import database_session, FDAExtractionResults, SourceFiles, DrugSections, substring_filter, like_term, escape_like, LIKE_ESCAPE
 
 logger = logging.getLogger(__name__)
 
@@ -31,6 +31,10 @@ class EnhancedSearchService:
         
         query = db.query(FDAExtractionResults)
         filter_conditions = []
+        # Empty, single-character and wildcard-only terms would scan for (nearly) every row
+        brand_term = like_term(brand_name)
+        therapeutic_term = like_term(therapeutic_area)
+        manufacturer_term = like_term((filters or {}).get("manufacturer"))
         
         # Filter by collection if specified
         if collection_id:
@@ -46,22 +50,27 @@ class EnhancedSearchService:
             query = query.filter(FDAExtractionResults.source_file_id.in_(collection_file_ids))
         
         # Brand name search
-        if brand_name:
+        if brand_term:
             filter_conditions.append(
-                FDAExtractionResults.entity_name.ilike(f"%{brand_name}%")
+                substring_filter(db, FDAExtractionResults.drug_name, brand_term)
             )
         
-        # Therapeutic area search (use EntitySections for indication)
-        if therapeutic_area:
-            entity_ids = [s.source_file_id for s in db.query(EntitySections).filter(EntitySections.section_type == "indication", EntitySections.section_content.ilike(f"%{therapeutic_area}%")).all()]
-            if entity_ids:
-                filter_conditions.append(FDAExtractionResults.source_file_id.in_(entity_ids))
+        # Therapeutic area search (use DrugSections for indication), filtered in the
+        # database with a correlated EXISTS instead of shipping matching IDs back as IN (...)
+        if therapeutic_term:
+            filter_conditions.append(
+                db.query(DrugSections).filter(
+                    DrugSections.source_file_id == FDAExtractionResults.source_file_id,
+                    DrugSections.section_type == "indication",
+                    DrugSections.section_content.ilike(f"%{escape_like(therapeutic_term)}%", escape=LIKE_ESCAPE)
+                ).exists()
+            )
         
         # Apply additional filters
         if filters:
-            if filters.get("manufacturer"):
+            if manufacturer_term:
                 filter_conditions.append(
-                    FDAExtractionResults.manufacturer.ilike(f"%{filters['manufacturer']}%")
+                    substring_filter(db, FDAExtractionResults.manufacturer, manufacturer_term)
                 )
             # Skip approval_status filter since field doesn't exist
             if filters.get("document_type"):
@@ -83,16 +92,26 @@ class EnhancedSearchService:
                 username, search_query, "dual_search", filters, len(results), execution_time, db
             )
         
+        # Get the indication of every result from DrugSections in one query
+        indications = {}
+        source_file_ids = {result.source_file_id for result in results}
+        if source_file_ids:
+            for source_file_id, section_content in db.query(
+                DrugSections.source_file_id, DrugSections.section_content
+            ).filter(
+                DrugSections.source_file_id.in_(source_file_ids),
+                DrugSections.section_type == "indication"
+            ).order_by(DrugSections.section_order):
+                indications.setdefault(source_file_id, section_content)
+        
         # Format results
         formatted_results = []
         for result in results:
-            # Get indication from EntitySections
-            indication_section = db.query(EntitySections).filter(EntitySections.source_file_id == result.source_file_id, EntitySections.section_type == "indication").first()
             formatted_results.append({
                 "id": result.id,
                 "source_file_id": result.source_file_id,
-                "entity_name": result.entity_name or "Unknown",
-                "therapeutic_area": indication_section.section_content if indication_section else "Not specified",
+                "entity_name": result.drug_name or "Unknown",
+                "therapeutic_area": indications.get(result.source_file_id, "Not specified"),
                 "manufacturer": result.manufacturer or "Unknown",
                 "approval_status": "Approved",  # Default since field doesn't exist
                 "approval_date": result.approval_date,
@@ -118,16 +137,18 @@ class EnhancedSearchService:
     @staticmethod
     def get_search_suggestions(query: str, search_type: str, db: Session) -> List[str]:
         """Get search suggestions for autocomplete."""
+        query = like_term(query)
+        if not query:
+            return []
         if search_type == "brand":
-            results = db.query(distinct(FDAExtractionResults.entity_name)).filter(
-                FDAExtractionResults.entity_name.ilike(f"%{query}%")
+            results = db.query(distinct(FDAExtractionResults.drug_name)).filter(
+                substring_filter(db, FDAExtractionResults.drug_name, query)
             ).limit(10).all()
         elif search_type == "therapeutic":
-            # Get therapeutic suggestions from EntitySections indication content
-            from database.database import EntitySections
-            results = db.query(distinct(EntitySections.section_content)).filter(
-                EntitySections.section_type == "indication",
-                EntitySections.section_content.ilike(f"%{query}%")
+            # Get therapeutic suggestions from DrugSections indication content
+            results = db.query(distinct(DrugSections.section_content)).filter(
+                DrugSections.section_type == "indication",
+                DrugSections.section_content.ilike(f"%{escape_like(query)}%", escape=LIKE_ESCAPE)
             ).limit(10).all()
         else:
             return []
@@ -3,12 +3,14 @@ Service layer for metadata configuration management.
 Handles business logic for configuration CRUD operations within groups.
 """
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
-from typing import List, Dict, Any, Optional
+from sqlalchemy import and_, or_, tuple_
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime
+import base64
+import json
 import logging
 
-from database.database import MetadataConfiguration, MetadataGroup, metadata_group_configs
+from database.database import MetadataConfiguration, MetadataGroup, metadata_group_configs, substring_filter_any, like_term
 
 logger = logging.getLogger(__name__)
 
@@ -24,10 +26,14 @@ class MetadataConfigurationService:
         search: Optional[str] = None,
         data_type: Optional[str] = None,
         skip: int = 0,
-        limit: int = 100
+        limit: int = 100,
+        after_name: Optional[str] = None,
+        after_id: Optional[int] = None
     ) -> List[MetadataConfiguration]:
         """
         List configurations with optional filters.
+        Pass the (metadata_name, id) of the previous page's last row as after_name/after_id
+        to page by key; deep pages then cost the same as the first, unlike skip.
         """
         query = db.query(MetadataConfiguration)
         
@@ -42,12 +48,11 @@ class MetadataConfigurationService:
             query = query.filter(MetadataConfiguration.is_active == True)
         
         # Search in name and description
+        search = like_term(search)
         if search:
-            search_term = f"%{search}%"
             query = query.filter(
-                or_(
-                    MetadataConfiguration.metadata_name.ilike(search_term),
-                    MetadataConfiguration.description.ilike(search_term)
+                substring_filter_any(
+                    db, (MetadataConfiguration.metadata_name, MetadataConfiguration.description), search
                 )
             )
         
@@ -55,13 +60,37 @@ class MetadataConfigurationService:
         if data_type:
             query = query.filter(MetadataConfiguration.data_type == data_type)
         
-        # Order by name (display_order is now per-group)
+        # Order by name (display_order is now per-group), id breaks ties so keyset pages are stable
         query = query.order_by(
-            MetadataConfiguration.metadata_name
+            MetadataConfiguration.metadata_name,
+            MetadataConfiguration.id
         )
         
         # Apply pagination
-        return query.offset(skip).limit(limit).all()
+        if after_name is not None and after_id is not None:
+            query = query.filter(
+                tuple_(MetadataConfiguration.metadata_name, MetadataConfiguration.id) > (after_name, after_id)
+            )
+        else:
+            query = query.offset(skip)
+        return query.limit(limit).all()
+    
+    @staticmethod
+    def encode_cursor(config: MetadataConfiguration) -> str:
+        """Encode a configuration's sort key as an opaque page cursor"""
+        key = json.dumps([config.metadata_name, config.id]).encode()
+        return base64.urlsafe_b64encode(key).decode()
+    
+    @staticmethod
+    def decode_cursor(cursor: str) -> Tuple[str, int]:
+        """Decode a page cursor into (metadata_name, id); raises ValueError if malformed"""
+        try:
+            name, config_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Invalid cursor: {cursor}") from e
+        if not isinstance(name, str) or not isinstance(config_id, int):
+            raise ValueError(f"Invalid cursor: {cursor}")
+        return name, config_id
     
     @staticmethod
     def create_configuration(
@@ -382,7 +382,7 @@ class VertexAIBatchProcessor:
         # --- Load results from GCS into Qdrant ---
         logger.info(f"Job {job.job_id}: Loading results from GCS into Qdrant.")
         
-        collection = db.query(Collection).filter(Collection.id == job.collection_id).first()
+        collection = db.get(Collection, job.collection_id)
         if not collection:
             raise ValueError(f"Collection {job.collection_id} not found for job {job.job_id}")
 
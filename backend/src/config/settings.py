@@ -55,6 +55,11 @@ class Settings(BaseSettings):
     QDRANT_HTTPS: bool = os.getenv("QDRANT_HTTPS", "false").lower() == "true"
     QDRANT_COLLECTION_REPLICATION_FACTOR: int = int(os.getenv("QDRANT_COLLECTION_REPLICATION_FACTOR", "1"))
     QDRANT_PREFER_GRPC: bool = os.getenv("QDRANT_PREFER_GRPC", "false").lower() == "true"
+    # Vector quantization for new collections: "scalar" (int8), "binary" or "none"
+    QDRANT_QUANTIZATION: str = os.getenv("QDRANT_QUANTIZATION", "scalar").lower()
+    
+    # Cache Configuration (in-process cache is used when unset)
+    REDIS_URL: Optional[str] = os.getenv("REDIS_URL", None)
     
     # Output directories
     @property
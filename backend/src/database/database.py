@@ -3,11 +3,13 @@ import sys
 import json
 import logging
 from contextlib import contextmanager
-from sqlalchemy import create_engine, Column, Integer, Text, String, DateTime, func, JSON, Boolean, Float, ForeignKey, Table
+from sqlalchemy import create_engine, Column, Integer, Text, String, DateTime, func, JSON, Boolean, Float, ForeignKey, Table, Index, and_, or_, case, inspect, text
+from sqlalchemy.dialects.mysql import match as mysql_match
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
+from sqlalchemy.pool import QueuePool
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
 # Add parent directory to path to import settings
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -19,14 +21,16 @@ DATABASE_URL = settings.DATABASE_URL
 # Configure engine with connection pooling settings to prevent timeout
 engine = create_engine(
     DATABASE_URL,
-    pool_size=int(os.environ.get('SQLALCHEMY_POOL_SIZE', 15)),           # Increase pool size
+    poolclass=QueuePool,
+    pool_size=int(os.environ.get('SQLALCHEMY_POOL_SIZE', 20)),           # Sized for concurrent threadpool requests
     max_overflow=int(os.environ.get('SQLALCHEMY_MAX_OVERFLOW', 30)),     # Increase overflow
-    pool_timeout=int(os.environ.get('SQLALCHEMY_POOL_TIMEOUT', 60)),     # Pool timeout
-    pool_recycle=int(os.environ.get('SQLALCHEMY_POOL_RECYCLE', 3600)),   # Recycle connections after 1 hour
+    pool_timeout=int(os.environ.get('SQLALCHEMY_POOL_TIMEOUT', 30)),     # Fail fast instead of queueing requests for a minute
+    pool_recycle=int(os.environ.get('SQLALCHEMY_POOL_RECYCLE', 1800)),   # Recycle well inside MySQL's wait_timeout (3600s)
     pool_pre_ping=bool(os.environ.get('SQLALCHEMY_POOL_PRE_PING', 'true').lower() == 'true'),  # Validate connections before use
     echo_pool=bool(os.environ.get('SQLALCHEMY_ECHO_POOL', 'false').lower() == 'true')          # Enable pool debugging if needed
 )
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# expire_on_commit=False avoids reloading every attribute with a SELECT after each commit (matches database_prod)
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
 Base = declarative_base()
 
 # Configure logging for database operations
@@ -42,7 +46,10 @@ collection_document_association = Table(
     Column('indexing_status', String(50), default='pending'),
     Column('indexing_progress', Integer, default=0),
     Column('error_message', Text, nullable=True),
-    Column('vector_doc_id', String(255), nullable=True)
+    Column('vector_doc_id', String(255), nullable=True),
+    # Collection searches filter on (collection_id, indexing_status) and read document_id;
+    # covering all three avoids touching the table rows
+    Index('idx_assoc_coll_status_doc', 'collection_id', 'indexing_status', 'document_id')
 )
 
 # Association table for many-to-many relationship between MetadataGroups and MetadataConfiguration
@@ -110,6 +117,11 @@ class MetadataConfiguration(Base):
     creator = relationship("Users", backref="metadata_configs")
     groups = relationship("MetadataGroup", secondary="metadata_group_configs", back_populates="configurations")
 
+    __table_args__ = (
+        # Serves the name/description search in list_configurations (see substring_filter_any)
+        Index("ft_metadata_config_search", "metadata_name", "description", mysql_prefix="FULLTEXT", mysql_with_parser="ngram"),
+    )
+
 class FileMetadataMapping(Base):
     __tablename__ = "FileMetadataMapping"
 
@@ -152,6 +164,14 @@ class SourceFiles(Base):
     # Relationship to Collections
     collections = relationship("Collection", secondary=collection_document_association, back_populates="documents")
 
+    __table_args__ = (
+        # Exact drug name filters and file name lookups (both TEXT, so prefix indexes)
+        Index("idx_sourcefiles_drug_name", "drug_name", mysql_length=255),
+        Index("idx_sourcefiles_file_name", "file_name", mysql_length=255),
+        # Serves substring search on drug_name (see substring_filter); a plain index on other backends
+        Index("ft_sourcefiles_drug_name", "drug_name", mysql_prefix="FULLTEXT", mysql_with_parser="ngram"),
+    )
+
 class DrugMetadata(Base):
     __tablename__ = "DrugMetadata"
 
@@ -192,6 +212,26 @@ class FDAExtractionResults(Base):
     updated_at = Column(DateTime, nullable=False, default=func.now(), onupdate=func.now())
 
     creator = relationship("Users", backref="extraction_results")
+    # source_file_id carries no FK constraint, so both joins are spelled out and read-only
+    source_file = relationship(
+        "SourceFiles",
+        primaryjoin="foreign(FDAExtractionResults.source_file_id) == SourceFiles.id",
+        viewonly=True
+    )
+    sections = relationship(
+        "DrugSections",
+        primaryjoin="FDAExtractionResults.source_file_id == foreign(DrugSections.source_file_id)",
+        order_by="DrugSections.section_order",
+        viewonly=True
+    )
+
+    __table_args__ = (
+        # Serves substring search on drug_name (see substring_filter); a plain index on other backends
+        Index("ft_fda_drug_name", "drug_name", mysql_prefix="FULLTEXT", mysql_with_parser="ngram"),
+        Index("ft_fda_manufacturer", "manufacturer", mysql_prefix="FULLTEXT", mysql_with_parser="ngram"),
+        # Newest-first listing (dual_search ORDER BY created_at DESC LIMIT n) reads the index and stops early
+        Index("idx_fda_created_at_desc", created_at.desc()),
+    )
 
 class DocumentData(Base):
     __tablename__ = "DocumentData"
@@ -222,6 +262,11 @@ class ChatHistory(Base):
     created_at = Column(DateTime, nullable=False, default=func.now())
     updated_at = Column(DateTime, nullable=False, default=func.now(), onupdate=func.now())
 
+    __table_args__ = (
+        # Session history lookups filter on user and session and read the newest rows first
+        Index("idx_chathistory_user_session_created", "user_id", "session_id", "created_at"),
+    )
+
 class ShareChat(Base):
     __tablename__ = "ShareChat"
     
@@ -249,7 +294,8 @@ class SearchHistory(Base):
     search_type = Column(String(50))
     filters_applied = Column(JSON)
     results_count = Column(Integer)
-    search_timestamp = Column(DateTime, default=func.now())
+    # Stamped by the database (NOW() in the INSERT, or the column default on new tables)
+    search_timestamp = Column(DateTime, default=func.now(), server_default=func.now())
     session_id = Column(String(255))
     execution_time_ms = Column(Integer)
 
@@ -506,6 +552,133 @@ def monitor_session_usage():
     except Exception as e:
         logger.error(f"Session monitoring failed: {e}")
 
+# MySQL's ngram_token_size (default 2); shorter terms yield no ngrams and cannot use a FULLTEXT index
+NGRAM_TOKEN_SIZE = int(os.environ.get('MYSQL_NGRAM_TOKEN_SIZE', 2))
+# The ngram parser drops every token containing a stopword (the default list has 'a' and 'i'),
+# so MATCH can reject rows the LIKE would return. Only narrow with MATCH once the FULLTEXT
+# indexes were built with stopwords disabled (the migrations do this) and results are verified
+FULLTEXT_SUBSTRING_SEARCH = os.environ.get('FULLTEXT_SUBSTRING_SEARCH', 'false').lower() == 'true'
+
+# Shorter terms (or terms made only of wildcards) match nearly every row, so they are not filtered on
+MIN_LIKE_TERM_LENGTH = 2
+
+def like_term(term: Optional[str]) -> Optional[str]:
+    """Return the stripped search term, or None when it is too short or only wildcards to be worth a LIKE"""
+    term = (term or "").strip()
+    if len(term) < MIN_LIKE_TERM_LENGTH or not term.strip("%_ "):
+        return None
+    return term
+
+LIKE_ESCAPE = "\\"
+
+def escape_like(term: str) -> str:
+    """Escape LIKE wildcards in user input so ``%`` and ``_`` match literally (use with escape=LIKE_ESCAPE)"""
+    return term.replace(LIKE_ESCAPE, LIKE_ESCAPE * 2).replace("%", LIKE_ESCAPE + "%").replace("_", LIKE_ESCAPE + "_")
+
+def _has_fulltext_index(*columns) -> bool:
+    """Check whether the model declares an ngram FULLTEXT index on exactly these columns"""
+    # MATCH() must name the same column list as a FULLTEXT index, not just a subset of one
+    return any(
+        index.dialect_options["mysql"]["prefix"] == "FULLTEXT"
+        and len(index.columns) == len(columns)
+        and all(index.columns.contains_column(column) for column in columns)
+        for index in columns[0].table.indexes
+    )
+
+def _use_fulltext(db, phrase: str, *columns) -> bool:
+    """Check whether a substring search on these columns may be narrowed with MATCH ... AGAINST"""
+    return (
+        FULLTEXT_SUBSTRING_SEARCH
+        and db.get_bind().dialect.name == "mysql"
+        and len(phrase) >= NGRAM_TOKEN_SIZE
+        and _has_fulltext_index(*columns)
+    )
+
+def substring_filter(db, attribute, term: str):
+    """
+    Build a case-insensitive ``%term%`` filter for a model attribute.
+
+    A leading wildcard cannot use a B-tree index. On MySQL with FULLTEXT_SUBSTRING_SEARCH
+    set, columns with an ngram FULLTEXT index are first narrowed with MATCH ... AGAINST
+    (served by the index); the LIKE then keeps exact substring semantics on the remaining
+    candidates.
+    """
+    condition = attribute.ilike(f"%{escape_like(term)}%", escape=LIKE_ESCAPE)
+    phrase = term.replace('"', ' ').strip()
+    if _use_fulltext(db, phrase, attribute.property.columns[0]):
+        condition = and_(attribute.match(f'"{phrase}"'), condition)
+    return condition
+
+def substring_filter_any(db, attributes, term: str):
+    """
+    Build a case-insensitive ``%term%`` filter matching any of several attributes.
+
+    An OR of per-column MATCH clauses cannot be served by a FULLTEXT index, so on MySQL
+    a single MATCH over a FULLTEXT index spanning all the columns narrows the candidates
+    and the OR of LIKEs keeps exact substring semantics.
+    """
+    pattern = f"%{escape_like(term)}%"
+    condition = or_(*(attribute.ilike(pattern, escape=LIKE_ESCAPE) for attribute in attributes))
+    phrase = term.replace('"', ' ').strip()
+    if _use_fulltext(db, phrase, *(attribute.property.columns[0] for attribute in attributes)):
+        condition = and_(mysql_match(*attributes, against=f'"{phrase}"').in_boolean_mode(), condition)
+    return condition
+
+def json_field(column, path: str):
+    """
+    JSON_EXTRACT(column, path) for a JSON document stored in a Text column.
+
+    JSON_EXTRACT raises on text that is not valid JSON (older rows can hold e.g. NaN), which
+    fails the whole query; such rows yield NULL instead. The CASE sits inside JSON_EXTRACT so
+    the result keeps MySQL's JSON type when nested in JSON_OBJECT/JSON_ARRAY.
+    """
+    return func.json_extract(case((func.json_valid(column), column)), path)
+
+def docx_chat_condition(db, docx_chat: bool):
+    """
+    Build a filter on the docXChat flag stored in ChatHistory.request_details.
+
+    docx_chat=False matches chats where the flag is false or missing. On MySQL the flag is
+    read with JSON_UNQUOTE(JSON_EXTRACT(...)), the expression of the indexed generated
+    column added by migrations/add_chat_docx_index.py, so the optimizer can use that index.
+    """
+    return docx_chat_dialect_condition(db.get_bind().dialect.name, docx_chat)
+
+def docx_chat_dialect_condition(dialect_name: str, docx_chat: bool):
+    """docx_chat_condition for a known dialect, for statements built once and reused."""
+    flag = json_field(ChatHistory.request_details, '$.docXChat')
+    if dialect_name == "mysql":
+        flag, true_value = func.json_unquote(flag), 'true'
+    else:
+        # SQLite's json_extract returns JSON true as 1
+        true_value = 1
+    if docx_chat:
+        return flag == true_value
+    return or_(flag != true_value, flag.is_(None))
+
+# Below this many rows an exact COUNT(*) is cheap enough, and InnoDB's TABLE_ROWS estimate is
+# both imprecise (often off by tens of percent) and cached for information_schema_stats_expiry
+ESTIMATED_ROW_COUNT_MIN = int(os.environ.get('ESTIMATED_ROW_COUNT_MIN', 1_000_000))
+
+def estimated_row_count(db, model) -> int:
+    """
+    Row count of a model's table for dashboard totals.
+
+    Exact COUNT(*) unless InnoDB statistics put the table above ESTIMATED_ROW_COUNT_MIN
+    rows; only then is the statistics estimate returned instead of scanning the table.
+    """
+    if db.get_bind().dialect.name == "mysql":
+        estimate = db.execute(text(
+            """SELECT TABLE_ROWS FROM information_schema.TABLES
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table_name"""
+        ), {"table_name": model.__tablename__}).scalar()
+        if estimate is not None and estimate >= ESTIMATED_ROW_COUNT_MIN:
+            return int(estimate)
+    return db.query(func.count()).select_from(model).scalar()
+
+# Cache key for the dashboard totals; cleared whenever new extraction rows are committed
+DASHBOARD_COUNTS_CACHE_KEY = "dashboard:counts"
+
 def save_extraction_results(db, file_id: int, file_name: str, metadata: dict, elements_count: int) -> int:
     """Save extraction results to the database"""
     try:
@@ -527,6 +700,8 @@ def save_extraction_results(db, file_id: int, file_name: str, metadata: dict, el
         db.add(extraction_result)
         db.commit()
         db.refresh(extraction_result)
+        from utils.cache import get_cache
+        get_cache().delete(DASHBOARD_COUNTS_CACHE_KEY)
         return extraction_result.id
     except Exception as e:
         db.rollback()
@@ -577,4 +752,34 @@ def save_documents_to_db(db, source_file_id: int, file_name: str, documents: Lis
 
 def create_tables():
     """Create all tables"""
-    Base.metadata.create_all(bind=engine) 
\ No newline at end of file
+    Base.metadata.create_all(bind=engine)
+    # Off by default: every worker would run the ALTERs at boot, and a first FULLTEXT index
+    # rebuilds the table. Indexes are built ahead of a deploy by the scripts in migrations/
+    if os.environ.get('ENSURE_INDEXES_ON_STARTUP', 'false').lower() == 'true':
+        ensure_indexes()
+
+def ensure_indexes():
+    """
+    Create model-declared indexes that are missing on pre-existing tables.
+
+    create_all() only emits indexes together with a new table, so indexes added to
+    models later would otherwise never reach existing databases.
+    """
+    inspector = inspect(engine)
+    for table in Base.metadata.sorted_tables:
+        if not table.indexes or not inspector.has_table(table.name):
+            continue
+        existing = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name in existing:
+                continue
+            try:
+                logger.info(f"Creating missing index {index.name} on {table.name}")
+                with engine.begin() as connection:
+                    if engine.dialect.name == "mysql":
+                        # Read at FULLTEXT index creation; see FULLTEXT_SUBSTRING_SEARCH
+                        connection.execute(text("SET SESSION innodb_ft_enable_stopword = OFF"))
+                    index.create(bind=connection)
+            except Exception as e:
+                logger.error(f"Failed to create index {index.name} on {table.name}: {e}")
+ 
\ No newline at end of file
@@ -0,0 +1,112 @@
+"""
+Shared TTL cache for hot read paths.
+
+Uses Redis when REDIS_URL is configured, so all gunicorn workers share one cache;
+otherwise falls back to a per-process in-memory cache. Values must be JSON-serializable.
+"""
+import time
+import logging
+import threading
+from typing import Any, Optional
+
+import orjson
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+
+class TTLCache:
+    """Thread-safe in-process cache with per-entry expiry and a size bound."""
+
+    # Each worker process has its own copy, so deletes don't reach the other workers
+    shared = False
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            with self._lock:
+                self._data.pop(key, None)
+            return None
+        return value
+
+    def set(self, key: str, value: Any, ttl: int) -> None:
+        with self._lock:
+            if len(self._data) >= self.maxsize and key not in self._data:
+                self._evict()
+            self._data[key] = (time.monotonic() + ttl, value)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def _evict(self) -> None:
+        """Drop expired entries, or the oldest inserted one if none have expired (caller holds the lock)."""
+        now = time.monotonic()
+        expired = [key for key, (expires_at, _) in self._data.items() if expires_at < now]
+        for key in expired:
+            del self._data[key]
+        if not expired:
+            del self._data[next(iter(self._data))]
+
+
+class RedisCache:
+    """Redis-backed cache; connection errors are logged and treated as cache misses."""
+
+    shared = True
+
+    def __init__(self, url: str):
+        self._client = redis.Redis.from_url(url, socket_timeout=0.25, socket_connect_timeout=0.25)
+
+    def get(self, key: str) -> Optional[Any]:
+        try:
+            raw = self._client.get(key)
+        except redis.RedisError as e:
+            logger.warning(f"Redis get failed for {key}: {e}")
+            return None
+        return orjson.loads(raw) if raw is not None else None
+
+    def set(self, key: str, value: Any, ttl: int) -> None:
+        try:
+            self._client.setex(key, ttl, orjson.dumps(value))
+        except redis.RedisError as e:
+            logger.warning(f"Redis set failed for {key}: {e}")
+
+    def delete(self, key: str) -> None:
+        try:
+            self._client.delete(key)
+        except redis.RedisError as e:
+            logger.warning(f"Redis delete failed for {key}: {e}")
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    """Return the process-wide cache, creating it on first use."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                if settings.REDIS_URL and redis is not None:
+                    _cache = RedisCache(settings.REDIS_URL)
+                    logger.info("Using Redis cache")
+                else:
+                    if settings.REDIS_URL:
+                        logger.warning("REDIS_URL is set but the redis package is not installed; using in-process cache")
+                    _cache = TTLCache()
+    return _cache
@@ -4,6 +4,7 @@ Mirrors the functionality of ChromaDBUtil but for Qdrant
 """
 
 import re
+import time
 import uuid
 import logging
 import hashlib
@@ -11,13 +12,16 @@ import threading
 from typing import List, Dict, Any, Optional, Tuple, Iterator
 from datetime import datetime
 import json
+import orjson
 
 from qdrant_client import QdrantClient
 from qdrant_client.http import models
 from qdrant_client.http.models import (
     Distance, VectorParams, PointStruct, Filter, FieldCondition, 
     MatchValue, Range, PointIdsList, SearchParams,
-    UpdateStatus, CountResult, ScrollResult, MatchAny
+    UpdateStatus, CountResult, ScrollResult, MatchAny,
+    ScalarQuantization, ScalarQuantizationConfig, ScalarType,
+    BinaryQuantization, BinaryQuantizationConfig, QuantizationSearchParams
 )
 
 from langchain_core.documents import Document
@@ -25,10 +29,24 @@ from langchain_core.prompts import ChatPromptTemplate
 from textwrap import wrap
 
 from utils.qdrant_singleton import get_qdrant_client
+from utils.cache import get_cache
 from config.settings import settings
 
 logger = logging.getLogger(__name__)
 
+# Multi-document answers are cached for a short TTL: a few questions (suggested questions,
+# comparisons of the same drugs) make up most of the traffic, and each miss is a vector
+# search plus a long LLM call.
+MULTI_DOC_CACHE_KEY = "multi_doc_answer:{digest}"
+MULTI_DOC_CACHE_TTL_SECONDS = 600
+# Every write to a collection (here or in the collection indexer worker) stores a new version,
+# and the version is part of the answer's cache key, so answers built from replaced or removed
+# chunks are never served. Answers are only cached when the cache is shared: a per-process
+# cache would never see the indexer's writes. The version only has to outlive the answers
+# cached under it.
+COLLECTION_VERSION_KEY = "collection_version:{collection}"
+COLLECTION_VERSION_TTL_SECONDS = 24 * 3600
+
 
 class QdrantUtil:
     """
@@ -60,6 +78,27 @@ class QdrantUtil:
         
         logger.info(f"QdrantUtil initialized with host={self.host}, port={self.port}")
     
+    @staticmethod
+    def quantization_config():
+        """
+        Quantization config for collections, from settings.QDRANT_QUANTIZATION.
+        
+        Quantized vectors are kept in RAM and searched first; the original vectors are
+        only used to rescore the oversampled candidates (see search_params).
+        """
+        if settings.QDRANT_QUANTIZATION == "scalar":
+            return ScalarQuantization(scalar=ScalarQuantizationConfig(type=ScalarType.INT8, always_ram=True))
+        if settings.QDRANT_QUANTIZATION == "binary":
+            return BinaryQuantization(binary=BinaryQuantizationConfig(always_ram=True))
+        return None
+    
+    @staticmethod
+    def search_params() -> Optional[SearchParams]:
+        """Search params that rescore quantized candidates with the original vectors."""
+        if settings.QDRANT_QUANTIZATION not in ("scalar", "binary"):
+            return None
+        return SearchParams(quantization=QuantizationSearchParams(rescore=True, oversampling=2.0))
+    
     @classmethod
     def get_instance(cls, host: str = None, port: int = None, use_persistent_client: bool = True) -> "QdrantUtil":
         """Get or create a singleton instance of QdrantUtil."""
@@ -115,7 +154,8 @@ class QdrantUtil:
                     ),
                     replication_factor=settings.QDRANT_COLLECTION_REPLICATION_FACTOR,
                     shard_number=1,
-                    on_disk_payload=True
+                    on_disk_payload=True,
+                    quantization_config=self.quantization_config()
                 )
                 logger.info(f"Created new collection: {sanitized_name}")
             else:
@@ -309,6 +349,7 @@ class QdrantUtil:
                             points=points_to_upsert,
                             wait=True
                         )
+                        self.record_collection_write(collection_name)
                         total_added += len(points_to_upsert)
                         points_to_upsert = []
                         
@@ -323,6 +364,7 @@ class QdrantUtil:
                     points=points_to_upsert,
                     wait=True
                 )
+                self.record_collection_write(collection_name)
                 total_added += len(points_to_upsert)
             
             logger.info(f"Added {total_added} documents to {collection_name}")
@@ -345,7 +387,8 @@ class QdrantUtil:
         k: int = 5,
         filters: Optional[Dict[str, Any]] = None,
         embedding_function=None,
-        include_metadata: bool = True
+        include_metadata: bool = True,
+        query_vector: Optional[List[float]] = None
     ) -> List[Dict[str, Any]]:
         """
         Search for relevant documents in the collection.
@@ -357,6 +400,7 @@ class QdrantUtil:
             filters: Metadata filters
             embedding_function: Function to generate query embedding
             include_metadata: Whether to include metadata in results
+            query_vector: Pre-computed query embedding; skips embedding the query
             
         Returns:
             List of search results with content, metadata, and scores
@@ -364,13 +408,15 @@ class QdrantUtil:
         try:
             collection_name = self.sanitize_collection_name(collection_name)
             
-            # Get embedding function if not provided
-            if embedding_function is None:
-                from utils.llm_util import get_embeddings_function
-                embedding_function = get_embeddings_function()
-            
-            # Generate query embedding
-            query_vector = embedding_function.embed_query(query)
+            if query_vector is None:
+                # Get embedding function if not provided (the ChromaDB-style
+                # get_embeddings_function() has no embed_query)
+                if embedding_function is None:
+                    from utils.llm_util import get_embeddings_model
+                    embedding_function = get_embeddings_model()
+                
+                # Generate query embedding
+                query_vector = embedding_function.embed_query(query)
             
             # Convert filters to Qdrant format
             qdrant_filter = None
@@ -382,27 +428,14 @@ class QdrantUtil:
                 collection_name=collection_name,
                 query_vector=query_vector,
                 query_filter=qdrant_filter,
+                search_params=self.search_params(),
                 limit=k,
                 with_payload=include_metadata,
                 with_vectors=False
             )
             
             # Format results - expect Agno format only
-            results = []
-            for hit in search_result:
-                payload = hit.payload
-                
-                # Extract from Agno format
-                content = payload.get("content", "")
-                metadata = payload.get("meta_data", {})
-                
-                result = {
-                    "content": content,
-                    "metadata": metadata,
-                    "score": hit.score,
-                    "id": str(hit.id)
-                }
-                results.append(result)
+            results = [self._format_search_hit(hit) for hit in search_result]
             
             logger.info(f"Found {len(results)} documents for query in {collection_name}")
             return results
@@ -411,6 +444,74 @@ class QdrantUtil:
             logger.error(f"Error searching documents: {e}")
             return []
     
+    def search_documents_batch(
+        self,
+        queries: List[str],
+        filters_list: List[Optional[Dict[str, Any]]],
+        collection_name: str = "fda_documents",
+        k: int = 5,
+        embedding_function=None,
+        include_metadata: bool = True
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Run several searches in one Qdrant round trip (query_batch_points).
+        
+        Each query is paired with the filter at the same position; identical query
+        strings are embedded only once.
+        
+        Args:
+            queries: Search queries
+            filters_list: Metadata filters, one per query (None for no filter)
+            collection_name: Name of the collection
+            k: Number of results to return per query
+            embedding_function: Function to generate query embeddings
+            include_metadata: Whether to include metadata in results
+            
+        Returns:
+            One result list per query, in the same format as search_documents
+        """
+        try:
+            collection_name = self.sanitize_collection_name(collection_name)
+            
+            if embedding_function is None:
+                # The ChromaDB-style get_embeddings_function() has no embed_query
+                from utils.llm_util import get_embeddings_model
+                embedding_function = get_embeddings_model()
+            
+            vectors = {query: embedding_function.embed_query(query) for query in set(queries)}
+            
+            requests = [
+                models.QueryRequest(
+                    query=vectors[query],
+                    filter=self._convert_filters_to_qdrant(filters) if filters else None,
+                    params=self.search_params(),
+                    limit=k,
+                    with_payload=include_metadata,
+                    with_vector=False
+                )
+                for query, filters in zip(queries, filters_list)
+            ]
+            batch_results = self.client.query_batch_points(collection_name=collection_name, requests=requests)
+            
+            results = [[self._format_search_hit(hit) for hit in response.points] for response in batch_results]
+            logger.info(f"Found {sum(len(r) for r in results)} documents for {len(requests)} batched searches in {collection_name}")
+            return results
+            
+        except Exception as e:
+            logger.error(f"Error in batched document search: {e}")
+            return [[] for _ in queries]
+    
+    @staticmethod
+    def _format_search_hit(hit) -> Dict[str, Any]:
+        """Convert a Qdrant hit in Agno payload format to our result dict."""
+        payload = hit.payload or {}
+        return {
+            "content": payload.get("content", ""),
+            "metadata": payload.get("meta_data", {}),
+            "score": hit.score,
+            "id": str(hit.id)
+        }
+    
     def _convert_filters_to_qdrant(self, filters: Dict[str, Any]) -> Filter:
         """Convert filter dictionary to Qdrant Filter format.
         Adds meta_data prefix for Agno compatibility."""
@@ -480,6 +581,7 @@ class QdrantUtil:
                 ),
                 wait=True
             )
+            self.record_collection_write(collection_name)
             
             return {
                 "status": "success",
@@ -553,6 +655,7 @@ class QdrantUtil:
         try:
             sanitized_name = self.sanitize_collection_name(collection_name)
             self.client.delete_collection(collection_name=sanitized_name)
+            self.record_collection_write(sanitized_name)
             logger.info(f"Deleted collection: {sanitized_name}")
             return True
         except Exception as e:
@@ -705,6 +808,7 @@ class QdrantUtil:
                     points=points,
                     wait=True
                 )
+                self.record_collection_write(target_collection)
                 
                 total_copied += len(points)
                 offset = next_offset
@@ -986,6 +1090,7 @@ class QdrantUtil:
                     points=points,
                     wait=True
                 )
+                self.record_collection_write(target_collection_name)
                 
                 total_copied += len(points)
                 offset = next_offset
@@ -1022,6 +1127,18 @@ class QdrantUtil:
         Enhanced query for multiple documents with token limit handling and intelligent chunking.
         Adapted for Qdrant vector database.
         """
+        cache = get_cache()
+        cache_key = None
+        if cache.shared:
+            cache_key = self._multi_doc_cache_key(
+                query, collection_name, n_results_per_doc, filter_dict, chat_history, expected_sources,
+                self._collection_version(collection_name)
+            )
+        cached_response = cache.get(cache_key) if cache_key is not None else None
+        if cached_response is not None:
+            logger.info(f"Multi-doc answer served from cache for query: {query[:50]}")
+            return cached_response
+        
         try:
             from utils.llm_util import get_llm
             
@@ -1050,18 +1167,16 @@ class QdrantUtil:
                         drug_name = source_file.split('_')[0].upper()
                         drug_names.append(drug_name)
                 
-                # Retrieve documents for each drug with reduced chunk count
+                # Retrieve documents for each drug with reduced chunk count, one search per
+                # source file sent as a single batch (the query is embedded once)
                 adjusted_chunks_per_doc = min(n_results_per_doc, 3)  # Limit chunks per doc
-                for source_file in source_files:
-                    # Search with specific source filter
-                    source_filter = {"source": source_file}
-                    search_results = self.search_documents(
-                        query=query,
-                        collection_name=collection_name,
-                        k=adjusted_chunks_per_doc,
-                        filters=source_filter
-                    )
-                    
+                batch_results = self.search_documents_batch(
+                    queries=[query] * len(source_files),
+                    filters_list=[{"source": source_file} for source_file in source_files],
+                    collection_name=collection_name,
+                    k=adjusted_chunks_per_doc
+                )
+                for source_file, search_results in zip(source_files, batch_results):
                     # Convert search results to Document-like objects for compatibility
                     docs = []
                     for result in search_results:
@@ -1156,6 +1271,9 @@ class QdrantUtil:
                     response_text = str(response)
                 
                 logger.info(f"Generated response length: {len(response_text)} characters")
+                # Only full answers are cached; summaries and error messages are retried next time
+                if cache_key is not None:
+                    cache.set(cache_key, response_text, MULTI_DOC_CACHE_TTL_SECONDS)
                 return response_text
                 
             except Exception as llm_error:
@@ -1185,6 +1303,56 @@ class QdrantUtil:
             else:
                 return "I'm experiencing a technical issue with document processing. Please try again later."
     
+    @staticmethod
+    def _multi_doc_cache_key(
+        query: str,
+        collection_name: str,
+        n_results_per_doc: int,
+        filter_dict: Optional[Dict[str, Any]],
+        chat_history: Optional[List[Tuple[str, str]]],
+        expected_sources: Optional[List[str]],
+        collection_version: str
+    ) -> str:
+        """
+        Cache key for a multi-document answer.
+        
+        The answer depends on the conversation, so the chat history is part of the key,
+        and on the collection's contents, so its version is too.
+        Queries are compared case- and whitespace-insensitively.
+        """
+        normalized_query = " ".join(query.lower().split())
+        payload = orjson.dumps(
+            [
+                collection_name,
+                collection_version,
+                normalized_query,
+                n_results_per_doc,
+                filter_dict,
+                chat_history,
+                sorted(expected_sources) if expected_sources else None
+            ],
+            option=orjson.OPT_SORT_KEYS
+        )
+        return MULTI_DOC_CACHE_KEY.format(digest=hashlib.blake2b(payload, digest_size=16).hexdigest())
+    
+    def _collection_version(self, collection_name: str) -> str:
+        """Current version of a collection's contents ("0" until its first write is recorded)"""
+        version = get_cache().get(COLLECTION_VERSION_KEY.format(collection=self.sanitize_collection_name(collection_name)))
+        return version if version is not None else "0"
+    
+    def record_collection_write(self, collection_name: str) -> None:
+        """
+        Record a write to a collection, retiring the answers cached for its previous contents.
+        
+        Callers writing through the raw Qdrant client (e.g. the collection indexer) must call
+        this after each upsert or delete.
+        """
+        get_cache().set(
+            COLLECTION_VERSION_KEY.format(collection=self.sanitize_collection_name(collection_name)),
+            str(time.time_ns()),
+            COLLECTION_VERSION_TTL_SECONDS
+        )
+    
     def _sample_documents_intelligently(
         self, 
         all_docs: List[Any], 
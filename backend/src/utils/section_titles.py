@@ -0,0 +1,9 @@
+"""Display titles for drug label section types."""
+
+# Section types come from a small closed set, so their fallback titles are memoized
+_TITLE_CACHE: dict[str, str] = {}
+
+def section_display_title(section_type: str) -> str:
+    """Return the display title for a section type, e.g. ``boxed_warning`` -> ``Boxed Warning``."""
+    title = _TITLE_CACHE.get(section_type)
+    return title if title is not None else _TITLE_CACHE.setdefault(section_type, section_type.replace('_', ' ').title())
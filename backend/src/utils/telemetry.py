@@ -0,0 +1,136 @@
+"""
+Request tracing and latency histograms.
+
+OpenTelemetry and prometheus_client are optional: when either package is
+missing the corresponding instrumentation is skipped and the helpers become no-ops.
+"""
+import time
+import logging
+from contextlib import contextmanager, nullcontext
+
+logger = logging.getLogger(__name__)
+
+try:
+    from opentelemetry import trace
+except ImportError:
+    trace = None
+
+try:
+    from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
+except ImportError:
+    FastAPIInstrumentor = None
+
+try:
+    from prometheus_client import Histogram, CONTENT_TYPE_LATEST, generate_latest
+except ImportError:
+    Histogram = None
+
+# Buckets tuned for API latencies: fast DB lookups up to slow LLM round trips
+_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+if Histogram is not None:
+    REQUEST_LATENCY = Histogram(
+        "http_request_duration_seconds",
+        "HTTP request latency by route template",
+        ["method", "route", "status"],
+        buckets=_LATENCY_BUCKETS
+    )
+    OPERATION_LATENCY = Histogram(
+        "operation_duration_seconds",
+        "Latency of instrumented operations (DB queries, vector search, LLM calls)",
+        ["operation"],
+        buckets=_LATENCY_BUCKETS
+    )
+else:
+    REQUEST_LATENCY = None
+    OPERATION_LATENCY = None
+
+_tracer = trace.get_tracer(__name__) if trace is not None else None
+
+
+class OperationTimer:
+    """Holds the measured duration of a ``timed_span`` block."""
+
+    __slots__ = ("elapsed",)
+
+    def __init__(self):
+        self.elapsed = 0.0
+
+    @property
+    def elapsed_ms(self) -> int:
+        return int(self.elapsed * 1000)
+
+
+@contextmanager
+def timed_span(name: str):
+    """
+    Trace a block as an OpenTelemetry span and record its duration in the operation histogram.
+
+    Usage:
+        with timed_span("qdrant.query_with_llm") as timer:
+            ...
+        timer.elapsed_ms
+    """
+    timer = OperationTimer()
+    span = _tracer.start_as_current_span(name) if _tracer is not None else nullcontext()
+    start = time.perf_counter()
+    try:
+        with span:
+            yield timer
+    finally:
+        timer.elapsed = time.perf_counter() - start
+        if OPERATION_LATENCY is not None:
+            OPERATION_LATENCY.labels(name).observe(timer.elapsed)
+
+
+class LatencyHistogramMiddleware:
+    """ASGI middleware recording per-route latency, labelled by route template rather than raw path."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            REQUEST_LATENCY.labels(
+                scope["method"],
+                getattr(route, "path", "unmatched"),
+                status_code
+            ).observe(time.perf_counter() - start)
+
+
+async def metrics_endpoint(request):
+    """Expose collected histograms in the Prometheus text format."""
+    from starlette.responses import Response
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+
+def setup_telemetry(app):
+    """Attach tracing and the /metrics endpoint to the FastAPI app, as far as the installed packages allow."""
+    if FastAPIInstrumentor is not None:
+        FastAPIInstrumentor.instrument_app(app, excluded_urls="metrics")
+        logger.info("OpenTelemetry FastAPI instrumentation enabled")
+    else:
+        logger.info("opentelemetry-instrumentation-fastapi not installed, tracing disabled")
+
+    if REQUEST_LATENCY is not None:
+        app.add_middleware(LatencyHistogramMiddleware)
+        app.add_route("/metrics", metrics_endpoint, include_in_schema=False)
+        logger.info("Prometheus latency histograms exposed at /metrics")
+    else:
+        logger.info("prometheus_client not installed, latency histograms disabled")
@@ -0,0 +1,185 @@
+"""
+Tests for FDA document search and single-document query collection handling
+"""
+
+import pytest
+from collections import OrderedDict
+from unittest.mock import Mock, patch, AsyncMock
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from api.services.chat_management_service import FDAChatManagementService
+from api.services.analytics_service import AnalyticsService
+from database.database import Base, ChatHistory, Collection, SourceFiles
+
+
+@pytest.fixture
+def db():
+    """In-memory database with one collection holding one indexed document."""
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine, autoflush=False)()
+
+    source_file = SourceFiles(id=1, file_name="foo_label.pdf", file_url="http://files/foo_label.pdf", drug_name="Foo")
+    collection = Collection(id=1, name="Labels", vector_db_collection_name="labels_collection")
+    collection.documents.append(source_file)
+    session.add_all([source_file, collection])
+    session.commit()
+
+    yield session
+
+    session.close()
+    engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_search_vector_fallback_returns_results(db):
+    """A query with no SQL matches falls back to vector search in the collection's vector store."""
+    vector_hits = [{"file_name": "foo_label.pdf", "relevance_score": 0.8, "grade_weight": 2}]
+
+    query_vector = [0.1] * 768
+
+    with patch.object(FDAChatManagementService, "_embed_query", return_value=query_vector), \
+         patch.object(FDAChatManagementService, "search_with_grading", return_value=vector_hits) as mock_search, \
+         patch.object(AnalyticsService, "track_search", new_callable=AsyncMock) as mock_track:
+        response = await FDAChatManagementService.search_fda_documents(
+            search_query="hepatotoxicity",
+            user_id=1,
+            db=db
+        )
+
+    assert response["success"] is True
+    assert response["search_type"] == "Vector"
+    assert response["total_results"] == 1
+    assert response["results"][0]["source_file_id"] == 1
+    assert response["results"][0]["relevance_score"] == 80.0
+    assert mock_search.call_args.kwargs["collection_name"] == "fda_documents"
+    assert mock_search.call_args.kwargs["query_vector"] is query_vector
+    assert mock_track.call_args.kwargs["search_type"] == "Vector"
+
+
+@pytest.mark.asyncio
+async def test_search_without_filters_skips_database_and_analytics():
+    """A search with no query, drug name or collection returns empty without any work."""
+    mock_db = Mock(spec=Session)
+
+    with patch.object(AnalyticsService, "track_search", new_callable=AsyncMock) as mock_track:
+        response = await FDAChatManagementService.search_fda_documents(
+            search_query="   ",
+            user_id=1,
+            source_file_id=1,
+            db=mock_db
+        )
+
+    assert response["results"] == []
+    assert response["total_results"] == 0
+    mock_db.query.assert_not_called()
+    mock_track.assert_not_called()
+
+
+def test_embed_query_reuses_cached_embedding():
+    """Repeated queries are embedded once."""
+    mock_model = Mock()
+    mock_model.embed_query.return_value = [0.2] * 768
+
+    with patch("api.services.chat_management_service.get_embeddings_model", return_value=mock_model), \
+         patch("api.services.chat_management_service._embeddings_model", None), \
+         patch("api.services.chat_management_service._query_embeddings", OrderedDict()):
+        first = FDAChatManagementService._embed_query("boxed warning")
+        second = FDAChatManagementService._embed_query("boxed warning")
+
+    assert first == second == [0.2] * 768
+    mock_model.embed_query.assert_called_once_with("boxed warning")
+
+
+def test_chat_history_summarizes_stored_details(db):
+    """History entries carry the response, source info and the first 3 search results."""
+    chat_id = FDAChatManagementService.save_chat_request(
+        user_id=7,
+        user_query="What is Foo?",
+        session_id="session-1",
+        request_details={"docXChat": True},
+        db=db
+    )
+    FDAChatManagementService.update_chat_response(
+        chat_id=chat_id,
+        response_details={
+            "response": "Foo is a drug.",
+            "source_info": {"files": ["foo_label.pdf"]},
+            "used_documents": True,
+            "search_results": [{"rank": rank} for rank in range(5)]
+        },
+        db=db
+    )
+
+    history = FDAChatManagementService.retrieve_chat_history(7, db)["history"]
+
+    assert len(history) == 1
+    assert history[0]["response"] == "Foo is a drug."
+    assert history[0]["source_info"] == {"files": ["foo_label.pdf"]}
+    assert history[0]["used_documents"] is True
+    assert history[0]["search_results"] == [{"rank": 0}, {"rank": 1}, {"rank": 2}]
+    assert history[0]["is_docx_chat"] is True
+
+
+@pytest.mark.asyncio
+async def test_query_fda_document_uses_document_collection(db):
+    """query_fda_document queries the vector store of the document's collection."""
+    mock_util = Mock()
+    mock_util.query_with_llm.return_value = "Foo is indicated for X."
+
+    with patch("api.services.chat_management_service.QdrantUtil.get_instance", return_value=mock_util):
+        await FDAChatManagementService.query_fda_document(
+            source_file_id=1,
+            query_string="What is Foo indicated for?",
+            session_id="session-1",
+            user_id=1,
+            db=db
+        )
+
+    assert mock_util.query_with_llm.call_args.kwargs["collection_name"] == "labels_collection"
+
+
+def test_chat_history_tolerates_rows_that_are_not_json(db):
+    """A stored row with invalid JSON is listed with empty details instead of failing the query."""
+    db.add(ChatHistory(
+        user_id=7, session_id="session-1", user_query="Broken?", is_favorite=True,
+        request_details="not json", response_details='{"response": "x", "score": NaN}'
+    ))
+    db.commit()
+
+    history = FDAChatManagementService.retrieve_chat_history(7, db)["history"]
+    favorites = FDAChatManagementService.get_favorite_chats(7, db)["favorites"]
+
+    for entries in (history, favorites):
+        assert len(entries) == 1
+        assert entries[0]["query"] == "Broken?"
+        assert entries[0]["response"] == ""
+        assert entries[0]["search_results"] == []
+        assert entries[0]["is_docx_chat"] is False
+
+    assert FDAChatManagementService.retrieve_chat_history(7, db, docx_chat_filter=True)["history"] == []
+    assert len(FDAChatManagementService.retrieve_chat_history(7, db, docx_chat_filter=False)["history"]) == 1
+
+
+def test_get_chat_history_skips_rows_that_are_not_json(db):
+    """A malformed row in the session does not fail the conversational context query."""
+    db.add_all([
+        ChatHistory(
+            user_id=7, session_id="session-1", user_query="What is the dose?",
+            response_details='{"source_file_id": 1, "user_query": "What is the dose?", "response": "10 mg"}'
+        ),
+        ChatHistory(user_id=7, session_id="session-1", user_query="Broken?", response_details="not json"),
+        ChatHistory(
+            user_id=7, session_id="session-1", user_query="Other file?",
+            response_details='{"source_file_id": 2, "user_query": "Other file?", "response": "n/a"}'
+        ),
+    ])
+    db.commit()
+
+    history = FDAChatManagementService.get_chat_history("session-1", 7, 1, db)
+
+    assert history == [("human", "What is the dose?"), ("ai", "10 mg")]
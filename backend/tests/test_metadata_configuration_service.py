@@ -0,0 +1,82 @@
+"""
+Tests for metadata configuration listing with keyset (cursor) pagination
+"""
+
+import pytest
+from fastapi import HTTPException, Response
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from api.services.metadata_configuration_service import MetadataConfigurationService
+from database.database import Base, MetadataConfiguration
+
+
+@pytest.fixture
+def db():
+    """In-memory database with five configurations, two pairs sharing a name."""
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine, autoflush=False)()
+
+    for name in ["Dosage", "Boxed Warning", "Dosage", "Boxed Warning", "Indication"]:
+        session.add(MetadataConfiguration(metadata_name=name, extraction_prompt=f"Extract {name}", created_by=1))
+    session.commit()
+
+    yield session
+
+    session.close()
+    engine.dispose()
+
+
+def _keys(configs):
+    return [(config.metadata_name, config.id) for config in configs]
+
+
+def test_cursor_round_trip():
+    """A cursor decodes back to the (metadata_name, id) of the row it was built from."""
+    config = MetadataConfiguration(id=42, metadata_name='Dose "max" / día')
+
+    cursor = MetadataConfigurationService.encode_cursor(config)
+
+    assert MetadataConfigurationService.decode_cursor(cursor) == ('Dose "max" / día', 42)
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", "e30=", "WyJhIl0=", "WzEsICJhIl0="])
+def test_decode_cursor_rejects_malformed_cursors(cursor):
+    """Garbage, a JSON object, a one-element list and swapped types are all rejected."""
+    with pytest.raises(ValueError):
+        MetadataConfigurationService.decode_cursor(cursor)
+
+
+@pytest.mark.asyncio
+async def test_list_endpoint_returns_400_for_malformed_cursor(db):
+    """The listing endpoint answers a malformed cursor with 400 before querying."""
+    from api.routers.metadata_configurations import list_configurations
+
+    with pytest.raises(HTTPException) as exc_info:
+        await list_configurations(
+            response=Response(), group_id=None, active_only=True, search=None, data_type=None,
+            skip=0, limit=2, cursor="not-a-cursor", db=db, current_user=None
+        )
+
+    assert exc_info.value.status_code == 400
+
+
+def test_keyset_pages_continue_across_duplicate_names(db):
+    """Consecutive keyset pages split a duplicate name without repeating or skipping rows."""
+    everything = _keys(MetadataConfigurationService.list_configurations(db, limit=10))
+
+    first_page = MetadataConfigurationService.list_configurations(db, limit=3)
+    after_name, after_id = MetadataConfigurationService.decode_cursor(
+        MetadataConfigurationService.encode_cursor(first_page[-1])
+    )
+    second_page = MetadataConfigurationService.list_configurations(
+        db, limit=3, after_name=after_name, after_id=after_id
+    )
+
+    assert everything == [("Boxed Warning", 2), ("Boxed Warning", 4), ("Dosage", 1), ("Dosage", 3), ("Indication", 5)]
+    assert _keys(first_page) == everything[:3]
+    assert _keys(second_page) == everything[3:]
@@ -0,0 +1,62 @@
+"""
+Tests for the LIKE search term helpers in database.database
+"""
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from database.database import Base, MetadataConfiguration, LIKE_ESCAPE, escape_like, like_term, substring_filter
+
+
+@pytest.mark.parametrize("term, expected", [
+    ("50%", "50\\%"),
+    ("a_b", "a\\_b"),
+    ("c\\d", "c\\\\d"),
+    ("\\%_", "\\\\\\%\\_"),
+    ("plain", "plain"),
+])
+def test_escape_like(term, expected):
+    """Backslash, % and _ are escaped with LIKE_ESCAPE; other text is unchanged."""
+    assert LIKE_ESCAPE == "\\"
+    assert escape_like(term) == expected
+
+
+@pytest.mark.parametrize("term, expected", [
+    (None, None),
+    ("", None),
+    ("   ", None),
+    ("a", None),
+    (" a ", None),
+    ("%%", None),
+    ("_%_", None),
+    ("% _", None),
+    ("ab", "ab"),
+    ("  keytruda ", "keytruda"),
+    ("50%", "50%"),
+])
+def test_like_term(term, expected):
+    """Blank, single-character and wildcard-only terms are dropped; others are stripped."""
+    assert like_term(term) == expected
+
+
+def test_escaped_wildcards_match_literally():
+    """A substring search for '%' or '_' only matches rows containing that character."""
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    for name in ["50% off", "5000 off", "a_b", "axb"]:
+        db.add(MetadataConfiguration(metadata_name=name, extraction_prompt="x", created_by=1))
+    db.commit()
+
+    def search(term):
+        return [config.metadata_name for config in db.query(MetadataConfiguration).filter(
+            substring_filter(db, MetadataConfiguration.metadata_name, term)
+        )]
+
+    assert search("0%") == ["50% off"]
+    assert search("a_b") == ["a_b"]
+
+    db.close()
+    engine.dispose()